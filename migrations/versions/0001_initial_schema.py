@@ -0,0 +1,64 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-04-20 12:00:00
+
+Uses IF NOT EXISTS so databases created by the former init_db() script
+are adopted as-is.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            username VARCHAR(255) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS authors (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) UNIQUE NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS books (
+            id SERIAL PRIMARY KEY,
+            title VARCHAR(255) UNIQUE NOT NULL,
+            published_year INT NOT NULL,
+            genre VARCHAR(50) NOT NULL CHECK (genre IN (
+                'Fiction', 'Non-Fiction', 'Science', 'History', 'Fantasy',
+                'Biography', 'Romance', 'Thriller', 'Mystery', 'Philosophy'
+            )),
+            author_id INTEGER NOT NULL REFERENCES authors(id)
+        );
+
+        CREATE TABLE IF NOT EXISTS user_history (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id),
+            book_id INTEGER NOT NULL REFERENCES books(id),
+            action VARCHAR(50) CHECK (action IN ('viewed')) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        DROP TABLE IF EXISTS user_history;
+        DROP TABLE IF EXISTS books;
+        DROP TABLE IF EXISTS authors;
+        DROP TABLE IF EXISTS users;
+    """)
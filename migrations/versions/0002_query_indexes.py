@@ -0,0 +1,67 @@
+"""Indexes for hot query predicates
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-04-20 12:30:00
+
+Indexes are built CONCURRENTLY so large tables stay writable while the
+migration runs. Duplicate (user_id, book_id) views are removed before the
+unique constraint is added, keeping the earliest view.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS books_genre_idx ON books (genre)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS books_author_id_idx ON books (author_id, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS books_published_year_idx ON books (published_year, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS authors_lower_name_idx ON authors (LOWER(name))",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS user_history_book_id_idx ON user_history (book_id)",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for statement in INDEXES:
+            op.execute(statement)
+
+        op.execute("""
+            DELETE FROM user_history h
+            USING user_history earlier
+            WHERE h.user_id = earlier.user_id
+              AND h.book_id = earlier.book_id
+              AND h.id > earlier.id
+        """)
+        op.execute("""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS user_history_user_book_key
+            ON user_history (user_id, book_id)
+        """)
+
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'user_history_user_book_key') THEN
+                ALTER TABLE user_history
+                    ADD CONSTRAINT user_history_user_book_key UNIQUE USING INDEX user_history_user_book_key;
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE user_history DROP CONSTRAINT IF EXISTS user_history_user_book_key")
+    op.execute("DROP INDEX IF EXISTS user_history_book_id_idx")
+    op.execute("DROP INDEX IF EXISTS authors_lower_name_idx")
+    op.execute("DROP INDEX IF EXISTS books_published_year_idx")
+    op.execute("DROP INDEX IF EXISTS books_author_id_idx")
+    op.execute("DROP INDEX IF EXISTS books_genre_idx")
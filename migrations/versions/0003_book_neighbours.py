@@ -0,0 +1,37 @@
+"""Precomputed co-view neighbours per book
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-04-22 10:00:00
+
+Holds the top-K most similar books for each book, rebuilt from
+user_history by ``python -m src.db.recommendation_engine``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS book_neighbours (
+            book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+            neighbour_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+            score REAL NOT NULL,
+            PRIMARY KEY (book_id, neighbour_id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS book_neighbours_neighbour_id_idx ON book_neighbours (neighbour_id)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS book_neighbours")
@@ -0,0 +1,67 @@
+"""Per-user taste profiles
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-04-23 09:00:00
+
+Genre and author view counts plus the viewed book ids of every user,
+maintained incrementally by add_book_view. Existing history is backfilled;
+``python -m src.db.user_profiles`` rebuilds the profiles later on.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS user_profiles (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            genre_counts JSONB NOT NULL DEFAULT '{}',
+            author_counts JSONB NOT NULL DEFAULT '{}',
+            viewed_book_ids INTEGER[] NOT NULL DEFAULT '{}',
+            view_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("""
+        INSERT INTO user_profiles (user_id, genre_counts, author_counts, viewed_book_ids, view_count)
+        SELECT v.user_id, g.counts, a.counts, v.book_ids, v.views
+        FROM (
+            SELECT user_id, array_agg(book_id ORDER BY created_at, id) AS book_ids, COUNT(*) AS views
+            FROM user_history
+            GROUP BY user_id
+        ) v
+        JOIN (
+            SELECT user_id, jsonb_object_agg(genre, views) AS counts
+            FROM (
+                SELECT h.user_id, b.genre, COUNT(*) AS views
+                FROM user_history h JOIN books b ON b.id = h.book_id
+                GROUP BY h.user_id, b.genre
+            ) per_genre
+            GROUP BY user_id
+        ) g ON g.user_id = v.user_id
+        JOIN (
+            SELECT user_id, jsonb_object_agg(author_id::text, views) AS counts
+            FROM (
+                SELECT h.user_id, b.author_id, COUNT(*) AS views
+                FROM user_history h JOIN books b ON b.id = h.book_id
+                GROUP BY h.user_id, b.author_id
+            ) per_author
+            GROUP BY user_id
+        ) a ON a.user_id = v.user_id
+        ON CONFLICT (user_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS user_profiles")
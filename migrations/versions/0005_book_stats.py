@@ -0,0 +1,42 @@
+"""Per-book view statistics for recommendation ranking
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-04-24 09:00:00
+
+Popularity (distinct viewers) and recency (last view) of every viewed
+book, maintained by the view writers and backfilled from user_history.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS book_stats (
+            book_id INTEGER PRIMARY KEY REFERENCES books(id) ON DELETE CASCADE,
+            view_count INTEGER NOT NULL DEFAULT 0,
+            last_viewed_at TIMESTAMP
+        )
+    """)
+    op.execute("""
+        INSERT INTO book_stats (book_id, view_count, last_viewed_at)
+        SELECT book_id, COUNT(*), MAX(created_at)
+        FROM user_history
+        GROUP BY book_id
+        ON CONFLICT (book_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS book_stats")
@@ -0,0 +1,66 @@
+"""Decaying trending scores of books
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-04-28 09:00:00
+
+Checkpoint of the in-memory trending counters: one exponentially decaying
+view score per window (1h, 24h, 7d) as of updated_at, backfilled from
+user_history. book_trending_decay() brings a stored score to the current
+time.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS book_trending (
+            book_id INTEGER PRIMARY KEY REFERENCES books(id) ON DELETE CASCADE,
+            score_1h DOUBLE PRECISION NOT NULL DEFAULT 0,
+            score_24h DOUBLE PRECISION NOT NULL DEFAULT 0,
+            score_7d DOUBLE PRECISION NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP
+        )
+    """)
+    # Elapsed windows are capped so exp() cannot underflow for long idle rows
+    op.execute("""
+        CREATE OR REPLACE FUNCTION book_trending_decay(
+            score DOUBLE PRECISION, updated_at TIMESTAMP, window_seconds DOUBLE PRECISION
+        ) RETURNS DOUBLE PRECISION
+        LANGUAGE sql STABLE
+        AS $$
+            SELECT score * exp(-LEAST(
+                GREATEST(EXTRACT(EPOCH FROM (LOCALTIMESTAMP - updated_at))::double precision, 0) / window_seconds,
+                700
+            ))
+        $$
+    """)
+    op.execute("""
+        INSERT INTO book_trending (book_id, score_1h, score_24h, score_7d, updated_at)
+        SELECT book_id,
+               SUM(book_trending_decay(1, created_at, 3600)),
+               SUM(book_trending_decay(1, created_at, 86400)),
+               SUM(book_trending_decay(1, created_at, 604800)),
+               LOCALTIMESTAMP
+        FROM user_history
+        WHERE created_at IS NOT NULL
+        GROUP BY book_id
+        HAVING SUM(book_trending_decay(1, created_at, 604800)) >= 0.01
+        ON CONFLICT (book_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS book_trending")
+    op.execute("DROP FUNCTION IF EXISTS book_trending_decay(DOUBLE PRECISION, TIMESTAMP, DOUBLE PRECISION)")
@@ -0,0 +1,102 @@
+"""Full-text and trigram search over book titles and author names
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-04-30 09:00:00
+
+books.search_vector holds the title (weight A) and the author's name
+(weight B). A generated column cannot read the author's name from another
+table, so the vector is maintained by triggers on books and authors.
+
+pg_trgm is installed when the server provides it and the migrating role may
+create extensions; its indexes are then created inside a DO block, so they
+are not built CONCURRENTLY. Without it search falls back to full-text
+prefix matching.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector TSVECTOR")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION books_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce((SELECT name FROM authors WHERE id = NEW.author_id), '')), 'B');
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS books_search_vector_trigger ON books")
+    op.execute("""
+        CREATE TRIGGER books_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF title, author_id ON books
+        FOR EACH ROW EXECUTE FUNCTION books_search_vector_update()
+    """)
+    # Renaming an author re-indexes their books through the books trigger
+    op.execute("""
+        CREATE OR REPLACE FUNCTION authors_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            UPDATE books SET author_id = author_id WHERE author_id = NEW.id;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("DROP TRIGGER IF EXISTS authors_search_vector_trigger ON authors")
+    op.execute("""
+        CREATE TRIGGER authors_search_vector_trigger
+        AFTER UPDATE OF name ON authors
+        FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+        EXECUTE FUNCTION authors_search_vector_update()
+    """)
+    op.execute("UPDATE books SET author_id = author_id WHERE search_vector IS NULL")
+
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+            END IF;
+        EXCEPTION WHEN insufficient_privilege THEN
+            RAISE NOTICE 'pg_trgm could not be created, fuzzy search is disabled';
+        END $$;
+    """)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                EXECUTE 'CREATE INDEX IF NOT EXISTS books_title_trgm_idx ON books USING GIN (title gin_trgm_ops)';
+                EXECUTE 'CREATE INDEX IF NOT EXISTS authors_name_trgm_idx ON authors USING GIN (name gin_trgm_ops)';
+            END IF;
+        END $$;
+    """)
+
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS books_search_vector_idx ON books USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS authors_name_trgm_idx")
+    op.execute("DROP INDEX IF EXISTS books_title_trgm_idx")
+    op.execute("DROP INDEX IF EXISTS books_search_vector_idx")
+    op.execute("DROP TRIGGER IF EXISTS authors_search_vector_trigger ON authors")
+    op.execute("DROP TRIGGER IF EXISTS books_search_vector_trigger ON books")
+    op.execute("DROP FUNCTION IF EXISTS authors_search_vector_update()")
+    op.execute("DROP FUNCTION IF EXISTS books_search_vector_update()")
+    op.execute("ALTER TABLE books DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,36 @@
+"""Denylist of revoked access tokens
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-05-06 09:00:00
+
+SHA-256 digests of access tokens revoked before their expiry (e.g. on
+logout). Rows are only needed until the token expires and are purged by
+the workers that load the list into memory.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            token_hash BYTEA PRIMARY KEY,
+            expires_at TIMESTAMPTZ NOT NULL
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS revoked_tokens_expires_at_idx ON revoked_tokens (expires_at)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS revoked_tokens")
@@ -0,0 +1,563 @@
+import asyncpg
+from src.db.async_connections import get_async_connection, logger
+from src.dependencies import EXPORT_FETCH_SIZE, BOOK_LOADER_WINDOW, BOOK_LOADER_MAX_BATCH
+from src.db.cache import book_cache, ainvalidate_book, ainvalidate_books, ainvalidate_recommendations
+from src.db.trending import trending
+from src.db.autocomplete import autocomplete
+from src.utils.pagination import SORT_COLUMNS
+from src.utils.search_query import prefix_tsquery
+from src.utils.batch_loader import BatchLoader
+from src.utils.metrics import timed_query
+
+# Whether pg_trgm is installed; looked up on the first search
+_trigram_search = None
+
+# Full-text matches on the title and author name, every query word as a
+# prefix; $8 (raw query text) adds typo-tolerant trigram matches when pg_trgm
+# is available. Results are ranked by relevance, then id, and paged with a
+# (rank, id) keyset.
+SEARCH_MATCHES_SQL = """
+    SELECT b.id FROM books b, q WHERE b.search_vector @@ q.query
+"""
+
+TRIGRAM_MATCHES_SQL = """
+    UNION
+    SELECT id FROM books WHERE $8 <% title
+    UNION
+    SELECT b.id FROM books b WHERE b.author_id IN (SELECT id FROM authors WHERE $8 <% name)
+"""
+
+SEARCH_SQL = """
+    WITH q AS (
+        SELECT to_tsquery('simple', $1) AS query
+    ), matches AS (
+        {matches}
+    ), ranked AS (
+        SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author,
+               {rank}::float8 AS rank
+        FROM matches m
+        JOIN books b ON b.id = m.id
+        JOIN authors a ON a.id = b.author_id
+        CROSS JOIN q
+        WHERE ($2::varchar IS NULL OR b.genre = $2)
+          AND ($3::int IS NULL OR b.published_year >= $3)
+          AND ($4::int IS NULL OR b.published_year <= $4)
+    )
+    SELECT * FROM ranked
+    WHERE $5::float8 IS NULL OR rank < $5 OR (rank = $5 AND id > $6)
+    ORDER BY rank DESC, id
+    LIMIT $7
+"""
+
+# The author is found or created in the same statement as the book write.
+# ON CONFLICT DO NOTHING returns no row for an existing author, so it is read
+# back from the table; an author inserted concurrently by another transaction
+# is visible to neither, which the callers detect and retry.
+CREATE_BOOK_SQL = """
+    WITH new_author AS (
+        INSERT INTO authors (name) VALUES ($4)
+        ON CONFLICT (name) DO NOTHING
+        RETURNING id, name
+    ), author AS (
+        SELECT id, name, TRUE AS created FROM new_author
+        UNION ALL
+        SELECT id, name, FALSE FROM authors WHERE name = $4
+        LIMIT 1
+    ), book AS (
+        INSERT INTO books (title, published_year, genre, author_id)
+        SELECT $1, $2, $3, id FROM author
+        ON CONFLICT (title) DO NOTHING
+        RETURNING id, title, published_year, genre, author_id
+    )
+    SELECT b.id, b.title, b.published_year, b.genre, a.id AS author_id, a.name AS author, a.created AS author_created
+    FROM author a
+    LEFT JOIN book b ON TRUE
+"""
+
+UPDATE_BOOK_SQL = """
+    WITH new_author AS (
+        INSERT INTO authors (name) SELECT $5::varchar WHERE $5 IS NOT NULL
+        ON CONFLICT (name) DO NOTHING
+        RETURNING id, name
+    ), author AS (
+        SELECT id, name, TRUE AS created FROM new_author
+        UNION ALL
+        SELECT id, name, FALSE FROM authors WHERE name = $5
+        LIMIT 1
+    ), updated AS (
+        UPDATE books b SET
+            title = COALESCE($2, b.title),
+            published_year = COALESCE($3, b.published_year),
+            genre = COALESCE($4, b.genre),
+            author_id = COALESCE((SELECT id FROM author), b.author_id)
+        WHERE b.id = $1
+        RETURNING b.id, b.title, b.published_year, b.genre, b.author_id
+    )
+    SELECT u.id, u.title, u.published_year, u.genre, u.author_id,
+           COALESCE(a.name, (SELECT name FROM authors WHERE id = u.author_id)) AS author,
+           COALESCE(a.created, FALSE) AS author_created
+    FROM updated u
+    LEFT JOIN author a ON a.id = u.author_id
+"""
+
+async def _fetch_books(book_ids):
+    """Load books by ID with one query and cache them; returns ``{id: book}``."""
+    try:
+        async with get_async_connection() as conn:
+            rows = await conn.fetch("""
+                SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author
+                FROM books b
+                JOIN authors a ON b.author_id = a.id
+                WHERE b.id = ANY($1::int[])
+            """, book_ids)
+    except Exception as e:
+        logger.error(f"Error fetching books with IDs {book_ids}: {e}")
+        raise
+    books = {}
+    for row in rows:
+        await book_cache.aset(row["id"], dict(row))
+        books[row["id"]] = dict(row)
+    return books
+
+# Concurrent get_book cache misses within BOOK_LOADER_WINDOW share one query
+book_loader = BatchLoader(_fetch_books, BOOK_LOADER_WINDOW, BOOK_LOADER_MAX_BATCH)
+
+async def _write_book(sql, args, missed_author):
+    """
+    Run a book write statement in its own transaction and return its row.
+
+    The transaction is committed only if the row stores a book; otherwise it
+    is rolled back, undoing any author it created. A statement that missed a
+    concurrently created author (``missed_author(row)``) is retried once.
+    """
+    async with get_async_connection() as conn:
+        for _ in range(2):
+            tx = conn.transaction()
+            await tx.start()
+            try:
+                row = await conn.fetchrow(sql, *args)
+            except BaseException:
+                await tx.rollback()
+                raise
+            if row is not None and row["id"] is not None and not missed_author(row):
+                await tx.commit()
+                return row
+            await tx.rollback()
+            if not missed_author(row):
+                return row
+    raise ValueError("Could not resolve the author")
+
+@timed_query
+async def create_book_with_author(title, published_year, genre, author_name):
+    """
+    Create a book and, if needed, its author in one statement.
+
+    Returns the stored book as a ``BookRead`` row, or None if a book with
+    this title already exists (no author is created then).
+    """
+    try:
+        row = await _write_book(
+            CREATE_BOOK_SQL, (title, published_year, genre, author_name),
+            lambda row: row is None,
+        )
+    except Exception as e:
+        logger.error(f"Error creating book: {e}")
+        raise ValueError(f"Error creating book: {e}")
+    if row is None or row["id"] is None:
+        logger.warning(f"Book with title {title} already exists.")
+        return None
+
+    if row["author_created"]:
+        autocomplete.add_author(row["author_id"], author_name)
+    autocomplete.add_book(row["id"], title)
+    logger.info(f"Book created with ID: {row['id']}")
+    return _book_from_row(row)
+
+@timed_query
+async def update_book_with_author(book_id, title=None, published_year=None, genre=None, author_name=None):
+    """
+    Update the given fields of a book (None keeps the current value),
+    creating the author if needed, in one statement.
+
+    Returns the stored book as a ``BookRead`` row, or None if the book does
+    not exist. Raises ValueError if another book already has the title.
+    """
+    try:
+        row = await _write_book(
+            UPDATE_BOOK_SQL, (book_id, title, published_year, genre, author_name),
+            lambda row: row is not None and author_name is not None and row["author"] != author_name,
+        )
+    except asyncpg.UniqueViolationError:
+        logger.warning(f"Book with title {title} already exists.")
+        raise ValueError("Book with this title already exists")
+    except Exception as e:
+        logger.error(f"Error updating book with ID {book_id}: {e}")
+        raise ValueError(f"Error updating book: {e}")
+    if row is None:
+        return None
+
+    if row["author_created"]:
+        autocomplete.add_author(row["author_id"], author_name)
+    await ainvalidate_book(book_id)
+    await ainvalidate_recommendations()
+    autocomplete.add_book(book_id, row["title"])
+    logger.info(f"Book with ID {book_id} updated successfully.")
+    return _book_from_row(row)
+
+@timed_query
+async def get_book(book_id):
+    """Fetch a specific book by its ID."""
+    cached = await book_cache.aget(book_id)
+    if cached is not None:
+        return dict(cached)
+    try:
+        book = await book_loader.load(book_id)
+        if not book:
+            raise ValueError(f"Book with ID {book_id} not found")
+        return dict(book)
+    except Exception as e:
+        logger.error(f"Error fetching book with ID {book_id}: {e}")
+        raise
+
+@timed_query
+async def get_books_by_ids(book_ids):
+    """
+    Fetch several books by ID, in the given order, with one query for the
+    ones not cached. IDs of books that do not exist are skipped.
+    """
+    book_ids = list(dict.fromkeys(book_ids))
+    books = {}
+    missing = []
+    for book_id in book_ids:
+        cached = await book_cache.aget(book_id)
+        if cached is not None:
+            books[book_id] = dict(cached)
+        else:
+            missing.append(book_id)
+    if missing:
+        books.update(await _fetch_books(missing))
+    return [books[book_id] for book_id in book_ids if book_id in books]
+
+@timed_query
+async def get_books(skip=0, limit=10, sort_by="title", after=None):
+    """
+    Fetch a page of books ordered by ``sort_by`` and id.
+
+    When ``after`` holds the ``(sort value, id)`` of the last book of the
+    previous page, the page is located with a keyset seek instead of OFFSET.
+    """
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "title"
+    try:
+        async with get_async_connection() as conn:
+            if after is None:
+                books = await conn.fetch(f"""
+                    SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author
+                    FROM books b
+                    JOIN authors a ON b.author_id = a.id
+                    ORDER BY b.{sort_by}, b.id
+                    OFFSET $1 LIMIT $2
+                """, skip, limit)
+            else:
+                books = await conn.fetch(f"""
+                    SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author
+                    FROM books b
+                    JOIN authors a ON b.author_id = a.id
+                    WHERE (b.{sort_by}, b.id) > ($1, $2)
+                    ORDER BY b.{sort_by}, b.id
+                    LIMIT $3
+                """, after[0], after[1], limit)
+            return [dict(book) for book in books]
+    except Exception as e:
+        logger.error(f"Error fetching books with pagination: {e}")
+        raise
+
+@timed_query
+async def search_books(text, genre=None, year_from=None, year_to=None, limit=20, after=None):
+    """
+    Search books by title and author name.
+
+    Every word of ``text`` matches as a prefix; with pg_trgm installed,
+    titles and names within a few typos of the text match too. ``after``
+    holds the ``(rank, id)`` of the last result of the previous page.
+    Raises ValueError if ``text`` contains no words.
+    """
+    global _trigram_search
+    query = prefix_tsquery(text)
+    after_rank, after_id = after if after is not None else (None, None)
+    try:
+        async with get_async_connection() as conn:
+            if _trigram_search is None:
+                _trigram_search = await conn.fetchval("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+                if not _trigram_search:
+                    logger.warning("pg_trgm is not installed; search is not typo tolerant.")
+            args = [query, genre, year_from, year_to, after_rank, after_id, limit]
+            if _trigram_search:
+                sql = SEARCH_SQL.format(
+                    matches=SEARCH_MATCHES_SQL + TRIGRAM_MATCHES_SQL,
+                    rank="GREATEST(ts_rank(b.search_vector, q.query), word_similarity($8, b.title), word_similarity($8, a.name))",
+                )
+                args.append(text)
+            else:
+                sql = SEARCH_SQL.format(matches=SEARCH_MATCHES_SQL, rank="ts_rank(b.search_vector, q.query)")
+            rows = await conn.fetch(sql, *args)
+            return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error searching books for {text!r}: {e}")
+        raise
+
+@timed_query
+async def delete_book(book_id):
+    """Delete a book from the database."""
+    try:
+        async with get_async_connection() as conn:
+            async with conn.transaction():
+                await conn.execute("DELETE FROM user_history WHERE book_id=$1", book_id)
+                deleted = await conn.fetchval("DELETE FROM books WHERE id=$1 RETURNING id", book_id)
+
+                if deleted is None:
+                    raise ValueError("Book not found")
+            await ainvalidate_book(book_id)
+            await ainvalidate_recommendations()
+            trending.discard(book_id)
+            autocomplete.remove_book(book_id)
+
+            logger.info(f"Book with ID {book_id} deleted successfully.")
+    except Exception as e:
+        logger.error(f"Error deleting book with ID {book_id}: {e}")
+        raise ValueError(f"Error deleting book: {e}")
+
+@timed_query(rows=len)
+async def bulk_import_books(books):
+    """
+    Import a batch of books in a single transaction.
+
+    Rows are staged with COPY into a temporary table. Rows whose title
+    already exists, in the table or earlier in the batch, are dropped before
+    missing authors are created set-wise, and books are inserted with
+    ON CONFLICT (title) DO NOTHING. Authors created for a book that a
+    concurrent insert made conflict anyway are removed before commit.
+    Returns a ``{title: id}`` mapping of the books that were actually inserted.
+    """
+    if not books:
+        return {}
+    try:
+        async with get_async_connection() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    CREATE TEMP TABLE books_import (
+                        position INT NOT NULL,
+                        title VARCHAR(255) NOT NULL,
+                        published_year INT NOT NULL,
+                        genre VARCHAR(50) NOT NULL,
+                        author VARCHAR(255) NOT NULL
+                    ) ON COMMIT DROP
+                """)
+                await conn.copy_records_to_table(
+                    "books_import",
+                    records=[
+                        (position, book["title"], book["published_year"], book["genre"], book["author"])
+                        for position, book in enumerate(books)
+                    ],
+                    columns=["position", "title", "published_year", "genre", "author"],
+                )
+                # The first row of a title wins; rows that can not be inserted
+                # must not create their author
+                await conn.execute("""
+                    DELETE FROM books_import i
+                    WHERE EXISTS (SELECT 1 FROM books b WHERE b.title = i.title)
+                       OR EXISTS (SELECT 1 FROM books_import e WHERE e.title = i.title AND e.position < i.position)
+                """)
+                authors = await conn.fetch("""
+                    INSERT INTO authors (name)
+                    SELECT DISTINCT author FROM books_import
+                    ON CONFLICT (name) DO NOTHING
+                    RETURNING id, name
+                """)
+                rows = await conn.fetch("""
+                    INSERT INTO books (title, published_year, genre, author_id)
+                    SELECT i.title, i.published_year, i.genre, a.id
+                    FROM books_import i
+                    JOIN authors a ON a.name = i.author
+                    ORDER BY i.position
+                    ON CONFLICT (title) DO NOTHING
+                    RETURNING id, title
+                """)
+                if authors and len(rows) < len(books):
+                    orphans = await conn.fetch("""
+                        DELETE FROM authors a
+                        WHERE a.id = ANY($1::int[])
+                          AND NOT EXISTS (SELECT 1 FROM books b WHERE b.author_id = a.id)
+                        RETURNING id
+                    """, [row["id"] for row in authors])
+                    orphan_ids = {row["id"] for row in orphans}
+                    authors = [row for row in authors if row["id"] not in orphan_ids]
+
+        for row in authors:
+            autocomplete.add_author(row["id"], row["name"])
+        for row in rows:
+            autocomplete.add_book(row["id"], row["title"])
+        inserted = {row["title"]: row["id"] for row in rows}
+        logger.info(f"Bulk import batch: inserted {len(inserted)} of {len(books)} books.")
+        return inserted
+    except Exception as e:
+        logger.error(f"Error bulk importing books: {e}")
+        raise
+
+@timed_query
+async def update_books(books):
+    """
+    Update a batch of books in a single transaction.
+
+    Each item holds an ``id`` and the fields to change (None keeps the
+    current value); missing authors are created set-wise. Returns a list
+    with, per item, ``("updated", book)``, ``("not_found", None)`` or
+    ``("conflict", detail)`` when the new title belongs to another book or
+    the item repeats an id or title of an earlier item.
+    """
+    results = [None] * len(books)
+    seen_ids, seen_titles = set(), set()
+    for position, book in enumerate(books):
+        if book["id"] in seen_ids:
+            results[position] = ("conflict", "Book appears more than once in the batch")
+        elif book["title"] is not None and book["title"] in seen_titles:
+            results[position] = ("conflict", "Another book in the batch has this title")
+        seen_ids.add(book["id"])
+        if book["title"] is not None:
+            seen_titles.add(book["title"])
+    try:
+        async with get_async_connection() as conn:
+            async with conn.transaction():
+                taken = await conn.fetch(
+                    "SELECT id, title FROM books WHERE title = ANY($1::varchar[])",
+                    [book["title"] for book in books if book["title"] is not None],
+                )
+                owners = {row["title"]: row["id"] for row in taken}
+                for position, book in enumerate(books):
+                    if results[position] is None and owners.get(book["title"], book["id"]) != book["id"]:
+                        results[position] = ("conflict", "Book with this title already exists")
+                pending = [book for position, book in enumerate(books) if results[position] is None]
+
+                authors = await conn.fetch("""
+                    INSERT INTO authors (name)
+                    SELECT DISTINCT name FROM unnest($1::varchar[]) AS n(name) WHERE name IS NOT NULL
+                    ON CONFLICT (name) DO NOTHING
+                    RETURNING id, name
+                """, [book["author"] for book in pending])
+                rows = await conn.fetch("""
+                    UPDATE books b SET
+                        title = COALESCE(i.title, b.title),
+                        published_year = COALESCE(i.published_year, b.published_year),
+                        genre = COALESCE(i.genre, b.genre),
+                        author_id = COALESCE(a.id, b.author_id)
+                    FROM unnest($1::int[], $2::varchar[], $3::int[], $4::varchar[], $5::varchar[])
+                        AS i(id, title, published_year, genre, author)
+                    LEFT JOIN authors a ON a.name = i.author
+                    WHERE b.id = i.id
+                    RETURNING b.id, b.title, b.published_year, b.genre, b.author_id,
+                              (SELECT name FROM authors WHERE id = b.author_id) AS author
+                """, *([book[field] for book in pending] for field in ("id", "title", "published_year", "genre", "author")))
+
+        updated = {row["id"]: row for row in rows}
+        for row in authors:
+            autocomplete.add_author(row["id"], row["name"])
+        for row in rows:
+            autocomplete.add_book(row["id"], row["title"])
+        if rows:
+            await ainvalidate_books(rows)
+            await ainvalidate_recommendations()
+
+        for position, book in enumerate(books):
+            if results[position] is None:
+                row = updated.get(book["id"])
+                results[position] = ("updated", _book_from_row(row)) if row else ("not_found", None)
+        logger.info(f"Batch update: updated {len(rows)} of {len(books)} books.")
+        return results
+    except Exception as e:
+        logger.error(f"Error updating a batch of {len(books)} books: {e}")
+        raise
+
+@timed_query
+async def delete_books(book_ids):
+    """
+    Delete a batch of books, with their view history, in a single transaction.
+    Returns the set of IDs that existed and were deleted.
+    """
+    try:
+        async with get_async_connection() as conn:
+            async with conn.transaction():
+                await conn.execute("DELETE FROM user_history WHERE book_id = ANY($1::int[])", book_ids)
+                rows = await conn.fetch("DELETE FROM books WHERE id = ANY($1::int[]) RETURNING id", book_ids)
+
+        for row in rows:
+            trending.discard(row["id"])
+            autocomplete.remove_book(row["id"])
+        if rows:
+            await ainvalidate_books(rows)
+            await ainvalidate_recommendations()
+        logger.info(f"Batch delete: deleted {len(rows)} of {len(book_ids)} books.")
+        return {row["id"] for row in rows}
+    except Exception as e:
+        logger.error(f"Error deleting a batch of {len(book_ids)} books: {e}")
+        raise
+
+def _book_from_row(row):
+    return {key: row[key] for key in ("id", "title", "published_year", "genre", "author")}
+
+@timed_query(rows=lambda page_end: int(page_end is not None))
+async def get_page_end(skip=0, limit=10, sort_by="title", after=None):
+    """
+    ``(sort value, id)`` of the last book of a full page in ``iter_books``
+    order, or None when fewer than ``limit`` books follow. Reads the keys only.
+    """
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "title"
+    where, args = ("", (skip + limit - 1,)) if after is None else (f"WHERE (b.{sort_by}, b.id) > ($2, $3)", (skip + limit - 1, after[0], after[1]))
+    try:
+        async with get_async_connection() as conn:
+            row = await conn.fetchrow(f"""
+                SELECT b.{sort_by} AS value, b.id FROM books b
+                {where}
+                ORDER BY b.{sort_by}, b.id
+                OFFSET $1 LIMIT 1
+            """, *args)
+            return (row["value"], row["id"]) if row else None
+    except Exception as e:
+        logger.error(f"Error locating the end of a page of books: {e}")
+        raise
+
+async def iter_books(skip=0, limit=None, sort_by="title", after=None, until=None, fetch_size=EXPORT_FETCH_SIZE):
+    """
+    Yield books one at a time from a server-side cursor.
+
+    Rows are fetched from Postgres ``fetch_size`` at a time, so the whole
+    catalogue can be streamed without materializing it. ``limit=None`` means
+    no limit; ``after`` resumes after a ``(sort value, id)`` keyset position
+    and ``until`` stops at one, inclusive.
+    """
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "title"
+    conditions, args = [], [skip, limit]
+    if after is not None:
+        args += after
+        conditions.append(f"(b.{sort_by}, b.id) > (${len(args) - 1}, ${len(args)})")
+    if until is not None:
+        args += until
+        conditions.append(f"(b.{sort_by}, b.id) <= (${len(args) - 1}, ${len(args)})")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    try:
+        async with get_async_connection() as conn:
+            async with conn.transaction():
+                cursor = conn.cursor(f"""
+                    SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author
+                    FROM books b
+                    JOIN authors a ON b.author_id = a.id
+                    {where}
+                    ORDER BY b.{sort_by}, b.id
+                    OFFSET $1 LIMIT $2
+                """, *args, prefetch=fetch_size)
+                async for book in cursor:
+                    yield dict(book)
+    except Exception as e:
+        logger.error(f"Error streaming books: {e}")
+        raise
@@ -0,0 +1,140 @@
+import time
+import asyncio
+import asyncpg
+from contextlib import asynccontextmanager
+from src.dependencies import (
+    DATABASE_URL,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MAX_LIFETIME,
+    DB_POOL_MAX_IDLE,
+    DB_POOL_TIMEOUT,
+    SLOW_QUERY_LOG_ENABLED,
+    logger,
+)
+from src.utils.metrics import DB_CONNECTION_ACQUIRE
+from src.db.slow_query_log import slow_query_log
+
+_pool_task = None
+_pool_loop = None
+
+_acquire_stats = {
+    "checkouts": 0,
+    "wait_time_total": 0.0,
+    "wait_time_max": 0.0,
+    "timeouts": 0,
+}
+
+
+class _PooledConnection(asyncpg.Connection):
+    """asyncpg connection that remembers when it was opened."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened_at = time.monotonic()
+
+
+async def _init_connection(conn):
+    conn.add_query_logger(slow_query_log.log_asyncpg_query)
+
+
+async def _create_pool() -> asyncpg.Pool:
+    pool = await asyncpg.create_pool(
+        DATABASE_URL,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        # Idle connections are closed after DB_POOL_MAX_IDLE seconds; asyncpg has
+        # no max lifetime, so get_async_connection retires old connections itself
+        max_inactive_connection_lifetime=DB_POOL_MAX_IDLE,
+        connection_class=_PooledConnection,
+        # Report slow statements when the slow query log is enabled
+        init=_init_connection if SLOW_QUERY_LOG_ENABLED else None,
+    )
+    logger.info(f"Async connection pool opened (min_size={DB_POOL_MIN_SIZE}, max_size={DB_POOL_MAX_SIZE}).")
+    return pool
+
+
+def _discard_pool(task):
+    """Drop a pool that belongs to an event loop which is no longer running."""
+    if task.done() and not task.cancelled() and task.exception() is None:
+        try:
+            task.result().terminate()
+        except Exception as e:
+            logger.warning(f"Failed to terminate stale async pool: {e}")
+
+
+async def get_async_pool() -> asyncpg.Pool:
+    """
+    Return the asyncpg pool bound to the running event loop, creating it on first use.
+    """
+    global _pool_task, _pool_loop
+    loop = asyncio.get_running_loop()
+    stale = _pool_task is not None and _pool_loop is not loop
+    failed = (
+        _pool_task is not None and _pool_task.done()
+        and (_pool_task.cancelled() or _pool_task.exception() is not None)
+    )
+    if _pool_task is None or stale or failed:
+        if stale:
+            _discard_pool(_pool_task)
+        _pool_loop = loop
+        _pool_task = loop.create_task(_create_pool())
+    return await asyncio.shield(_pool_task)
+
+
+async def close_async_pool():
+    """Close the asyncpg pool if it was opened on the running event loop."""
+    global _pool_task, _pool_loop
+    if _pool_task is None:
+        return
+    task, _pool_task = _pool_task, None
+    if _pool_loop is not asyncio.get_running_loop():
+        _discard_pool(task)
+        return
+    try:
+        pool = await task
+    except Exception:
+        return
+    await pool.close()
+    logger.info("Async connection pool closed.")
+
+
+def acquire_stats() -> dict:
+    """Snapshot of connection acquisition wait-time metrics."""
+    stats = dict(_acquire_stats)
+    checkouts = stats["checkouts"]
+    stats["wait_time_avg"] = stats["wait_time_total"] / checkouts if checkouts else 0.0
+    return stats
+
+
+@asynccontextmanager
+async def get_async_connection():
+    pool = await get_async_pool()
+    started = time.monotonic()
+    try:
+        conn = await pool.acquire(timeout=DB_POOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        _acquire_stats["timeouts"] += 1
+        logger.error(f"Timed out after {DB_POOL_TIMEOUT}s waiting for a database connection")
+        raise
+    except Exception as e:
+        logger.error(f"Failed to connect to DB: {e}")
+        raise
+    waited = time.monotonic() - started
+    _acquire_stats["checkouts"] += 1
+    _acquire_stats["wait_time_total"] += waited
+    _acquire_stats["wait_time_max"] = max(_acquire_stats["wait_time_max"], waited)
+    DB_CONNECTION_ACQUIRE.labels("async").observe(waited)
+    try:
+        yield conn
+    finally:
+        if time.monotonic() - conn.opened_at >= DB_POOL_MAX_LIFETIME:
+            # Closing a pooled connection hands its slot back to the pool,
+            # which opens a fresh connection on the next acquire
+            try:
+                await conn.close(timeout=DB_POOL_TIMEOUT)
+                logger.info(f"Closed async connection older than {DB_POOL_MAX_LIFETIME}s")
+            except Exception as e:
+                logger.warning(f"Failed to close expired async connection: {e}")
+        else:
+            await pool.release(conn)
@@ -0,0 +1,276 @@
+from typing import List, Dict, Tuple
+from src.db.async_connections import get_async_connection, logger
+from src.dependencies import RECOMMENDATION_HISTORY_WINDOW
+from src.db.cache import aget_cached_recommendations, acache_recommendations, ainvalidate_recommendations
+from src.db.trending import trending
+from src.utils.metrics import timed_query
+
+# Seen books are excluded with NOT EXISTS anti-joins on the
+# (user_id, book_id) unique index, and candidates are ranked by their
+# trending score over the last 24 hours (checkpointed in book_trending), then
+# popularity (distinct viewers), then recency of the last view, then id, so
+# results are deterministic. Each recommendation is a single statement.
+GENRE_RECOMMENDATIONS_SQL = """
+    SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author_name
+    FROM books b
+    JOIN authors a ON a.id = b.author_id
+    LEFT JOIN book_stats s ON s.book_id = b.id
+    LEFT JOIN book_trending t ON t.book_id = b.id
+    WHERE b.genre = $1
+      AND NOT EXISTS (
+          SELECT 1 FROM user_history h
+          WHERE h.user_id = $2 AND h.book_id = b.id
+      )
+    ORDER BY COALESCE(book_trending_decay(t.score_24h, t.updated_at, 86400), 0) DESC,
+             COALESCE(s.view_count, 0) DESC, s.last_viewed_at DESC NULLS LAST, b.id
+    LIMIT $3
+"""
+
+AUTHOR_RECOMMENDATIONS_SQL = """
+    WITH author AS (
+        SELECT id, name FROM authors
+        WHERE LOWER(name) = LOWER($1)
+        ORDER BY id
+        LIMIT 1
+    )
+    SELECT b.id, b.title, b.published_year, b.genre, b.author_id, author.name AS author_name
+    FROM author
+    JOIN books b ON b.author_id = author.id
+    LEFT JOIN book_stats s ON s.book_id = b.id
+    LEFT JOIN book_trending t ON t.book_id = b.id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM user_history h
+        WHERE h.user_id = $2 AND h.book_id = b.id
+    )
+    ORDER BY COALESCE(book_trending_decay(t.score_24h, t.updated_at, 86400), 0) DESC,
+             COALESCE(s.view_count, 0) DESC, s.last_viewed_at DESC NULLS LAST, b.id
+    LIMIT $3
+"""
+
+# Co-viewed neighbours of the user's $2 most recent views come first, by
+# summed similarity, then trending score; the rest is filled with trending
+# unseen books from the user's top genres and authors, read from their
+# taste profile.
+HISTORY_RECOMMENDATIONS_SQL = """
+    WITH profile AS (
+        SELECT viewed_book_ids, genre_counts, author_counts
+        FROM user_profiles
+        WHERE user_id = $1
+    ), co_viewed AS (
+        SELECT n.neighbour_id AS book_id, SUM(n.score) AS score
+        FROM profile p
+        CROSS JOIN LATERAL unnest(
+            p.viewed_book_ids[GREATEST(cardinality(p.viewed_book_ids) - $2 + 1, 1):]
+        ) AS recent(book_id)
+        JOIN book_neighbours n ON n.book_id = recent.book_id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM user_history h
+            WHERE h.user_id = $1 AND h.book_id = n.neighbour_id
+        )
+        GROUP BY n.neighbour_id
+        ORDER BY score DESC, n.neighbour_id
+        LIMIT $3
+    ), top_genres AS (
+        SELECT g.key AS genre
+        FROM profile p CROSS JOIN LATERAL jsonb_each_text(p.genre_counts) g
+        ORDER BY g.value::int DESC, g.key
+        LIMIT 3
+    ), top_authors AS (
+        SELECT a.key::int AS author_id
+        FROM profile p CROSS JOIN LATERAL jsonb_each_text(p.author_counts) a
+        ORDER BY a.value::int DESC, a.key
+        LIMIT 3
+    ), related AS (
+        SELECT b.id AS book_id, COALESCE(book_trending_decay(t.score_24h, t.updated_at, 86400), 0) AS trend,
+               COALESCE(s.view_count, 0) AS popularity, s.last_viewed_at
+        FROM (
+            SELECT id FROM books WHERE genre IN (SELECT genre FROM top_genres)
+            UNION
+            SELECT id FROM books WHERE author_id IN (SELECT author_id FROM top_authors)
+        ) r
+        JOIN books b ON b.id = r.id
+        LEFT JOIN book_stats s ON s.book_id = b.id
+        LEFT JOIN book_trending t ON t.book_id = b.id
+        WHERE NOT EXISTS (
+            SELECT 1 FROM user_history h
+            WHERE h.user_id = $1 AND h.book_id = b.id
+        )
+          AND NOT EXISTS (SELECT 1 FROM co_viewed cv WHERE cv.book_id = b.id)
+        ORDER BY trend DESC, popularity DESC, s.last_viewed_at DESC NULLS LAST, b.id
+        LIMIT $3
+    ), candidates AS (
+        SELECT book_id, 1 AS tier, score, 0 AS popularity, NULL::timestamp AS last_viewed_at FROM co_viewed
+        UNION ALL
+        SELECT book_id, 2 AS tier, 0, popularity, last_viewed_at FROM related
+    )
+    SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author_name
+    FROM candidates c
+    JOIN books b ON b.id = c.book_id
+    JOIN authors a ON a.id = b.author_id
+    LEFT JOIN book_trending t ON t.book_id = b.id
+    ORDER BY c.tier, c.score DESC, COALESCE(book_trending_decay(t.score_24h, t.updated_at, 86400), 0) DESC,
+             c.popularity DESC, c.last_viewed_at DESC NULLS LAST, b.id
+    LIMIT $3
+"""
+
+def _rows_to_books(rows) -> List[Dict]:
+    result = []
+    for row in rows:
+        book = dict(row)
+        book["author"] = {
+            "id": book.pop("author_id"),
+            "name": book.pop("author_name")
+        }
+        result.append(book)
+    return result
+
+@timed_query
+async def add_book_views(views: List[Tuple[int, int]]) -> List[int]:
+    """
+    Record a batch of (user_id, book_id) views and fold the new ones into the
+    users' taste profiles and the books' view statistics, in one statement,
+    and count them towards the books' trending scores.
+
+    Views that were already recorded, or of books deleted in the meantime,
+    are skipped. Returns the ids of users
+    that had at least one new view.
+    """
+    views = list(dict.fromkeys(views))
+    if not views:
+        return []
+    user_ids, book_ids = zip(*sorted(views))
+    try:
+        async with get_async_connection() as conn:
+            # Rows are written in (user_id, book_id) order so concurrent batches lock profiles in the same order
+            rows = await conn.fetch("""
+                WITH viewed AS (
+                    INSERT INTO user_history (user_id, book_id, action)
+                    SELECT v.user_id, v.book_id, 'viewed'
+                    FROM unnest($1::int[], $2::int[]) AS v(user_id, book_id)
+                    WHERE EXISTS (SELECT 1 FROM books b WHERE b.id = v.book_id)
+                    ORDER BY v.user_id, v.book_id
+                    ON CONFLICT (user_id, book_id) DO NOTHING
+                    RETURNING id, user_id, book_id
+                ), views AS (
+                    SELECT v.id, v.user_id, v.book_id, b.genre, b.author_id
+                    FROM viewed v
+                    JOIN books b ON b.id = v.book_id
+                ), genres AS (
+                    SELECT user_id, jsonb_object_agg(genre, views) AS counts
+                    FROM (SELECT user_id, genre, COUNT(*) AS views FROM views GROUP BY user_id, genre) g
+                    GROUP BY user_id
+                ), authors AS (
+                    SELECT user_id, jsonb_object_agg(author_id::text, views) AS counts
+                    FROM (SELECT user_id, author_id, COUNT(*) AS views FROM views GROUP BY user_id, author_id) a
+                    GROUP BY user_id
+                ), per_user AS (
+                    SELECT user_id, array_agg(book_id ORDER BY id) AS book_ids, COUNT(*) AS views
+                    FROM views
+                    GROUP BY user_id
+                ), book_counts AS (
+                    INSERT INTO book_stats (book_id, view_count, last_viewed_at)
+                    SELECT book_id, COUNT(*), CURRENT_TIMESTAMP
+                    FROM views
+                    GROUP BY book_id
+                    ORDER BY book_id
+                    ON CONFLICT (book_id) DO UPDATE SET
+                        view_count = book_stats.view_count + EXCLUDED.view_count,
+                        last_viewed_at = EXCLUDED.last_viewed_at
+                )
+                INSERT INTO user_profiles (user_id, genre_counts, author_counts, viewed_book_ids, view_count)
+                SELECT p.user_id, g.counts, a.counts, p.book_ids, p.views
+                FROM per_user p
+                JOIN genres g ON g.user_id = p.user_id
+                JOIN authors a ON a.user_id = p.user_id
+                ORDER BY p.user_id
+                ON CONFLICT (user_id) DO UPDATE SET
+                    genre_counts = user_profiles.genre_counts || (
+                        SELECT jsonb_object_agg(key, value::int + COALESCE((user_profiles.genre_counts ->> key)::int, 0))
+                        FROM jsonb_each_text(EXCLUDED.genre_counts)
+                    ),
+                    author_counts = user_profiles.author_counts || (
+                        SELECT jsonb_object_agg(key, value::int + COALESCE((user_profiles.author_counts ->> key)::int, 0))
+                        FROM jsonb_each_text(EXCLUDED.author_counts)
+                    ),
+                    viewed_book_ids = user_profiles.viewed_book_ids || EXCLUDED.viewed_book_ids,
+                    view_count = user_profiles.view_count + EXCLUDED.view_count,
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING user_id, (SELECT p.book_ids FROM per_user p WHERE p.user_id = user_profiles.user_id) AS book_ids
+            """, list(user_ids), list(book_ids))
+
+            # New views count towards trending in memory; no extra query
+            trending.record(book_id for row in rows for book_id in row["book_ids"])
+            updated_users = [row["user_id"] for row in rows]
+            for user_id in updated_users:
+                await ainvalidate_recommendations(user_id)
+            return updated_users
+    except Exception as e:
+        logger.error(f"Error adding {len(views)} book views: {e}")
+        raise
+
+@timed_query
+async def add_book_view(user_id: int, book_id: int):
+    """Record a book view by a user and fold it into their taste profile and the book's statistics."""
+    if not await add_book_views([(user_id, book_id)]):
+        logger.info(f"User {user_id} has already viewed book {book_id}. No new record added.")
+        return
+    logger.info(f"Recorded book view for user {user_id}, book {book_id}")
+
+@timed_query
+async def recommend_books_by_genre(user_id: int, genre_input: str, limit: int = 10) -> List[Dict]:
+    """Recommend popular books of a genre that the user has not yet viewed."""
+    query = f"genre:{genre_input}"
+    cached = await aget_cached_recommendations(user_id, query)
+    if cached is not None:
+        return cached
+    try:
+        async with get_async_connection() as conn:
+            rows = await conn.fetch(GENRE_RECOMMENDATIONS_SQL, genre_input, user_id, limit)
+            books = _rows_to_books(rows)
+            await acache_recommendations(user_id, query, books)
+            return books
+    except Exception as e:
+        logger.error(f"Error recommending books by genre for user {user_id}, genre {genre_input}: {e}")
+        raise
+
+@timed_query
+async def recommend_books_by_author(user_id: int, author_name: str, limit: int = 10) -> List[Dict]:
+    """Recommend popular books by a specific author that the user has not yet viewed."""
+    query = f"author:{author_name.lower()}"
+    cached = await aget_cached_recommendations(user_id, query)
+    if cached is not None:
+        return cached
+    try:
+        async with get_async_connection() as conn:
+            rows = await conn.fetch(AUTHOR_RECOMMENDATIONS_SQL, author_name, user_id, limit)
+            books = _rows_to_books(rows)
+            await acache_recommendations(user_id, query, books)
+            return books
+    except Exception as e:
+        logger.error(f"Error recommending books by author for user {user_id}, author {author_name}: {e}")
+        raise
+
+@timed_query
+async def recommend_books_based_on_history(user_id: int, limit: int = 15) -> List[Dict]:
+    """
+    Recommend books similar to the ones the user viewed most recently.
+
+    Candidates are ranked by the summed co-view similarity stored in
+    ``book_neighbours``. When that yields fewer than ``limit`` books (new
+    users, rarely co-viewed books, neighbours not built yet) the rest is
+    filled with popular unseen books from the user's top genres and
+    authors.
+    """
+    query = "history"
+    cached = await aget_cached_recommendations(user_id, query)
+    if cached is not None:
+        return cached
+    try:
+        async with get_async_connection() as conn:
+            rows = await conn.fetch(HISTORY_RECOMMENDATIONS_SQL, user_id, RECOMMENDATION_HISTORY_WINDOW, limit)
+            books = _rows_to_books(rows)
+            await acache_recommendations(user_id, query, books)
+            return books
+    except Exception as e:
+        logger.error(f"Error recommending books based on history for user {user_id}: {e}")
+        raise
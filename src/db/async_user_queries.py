@@ -0,0 +1,23 @@
+from src.db.async_connections import get_async_connection, logger
+from src.utils.metrics import timed_query
+
+@timed_query
+async def get_user_by_username(username: str):
+    try:
+        async with get_async_connection() as conn:
+            user = await conn.fetchrow("SELECT id, username, password FROM users WHERE username = $1", username)
+            return dict(user) if user else None
+    except Exception as e:
+        logger.error(f"Error fetching user by username {username}: {e}")
+        raise
+
+@timed_query
+async def create_user(username: str, hashed_password: str):
+    try:
+        async with get_async_connection() as conn:
+            user_id = await conn.fetchval("INSERT INTO users (username, password) VALUES ($1, $2) RETURNING id", username, hashed_password)
+            logger.info(f"User created with ID: {user_id}")
+            return user_id
+    except Exception as e:
+        logger.error(f"Error creating user with username {username}: {e}")
+        raise
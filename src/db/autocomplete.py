@@ -0,0 +1,116 @@
+import asyncio
+import time
+from src.db.async_connections import get_async_connection, logger
+from src.utils.prefix_index import PrefixIndex, PrefixIndexBuilder, BUILD_CHUNK_SIZE
+from src.dependencies import AUTOCOMPLETE_REFRESH_INTERVAL, AUTOCOMPLETE_MERGE_THRESHOLD
+
+
+class Autocomplete:
+    """
+    In-process prefix indexes of book titles and author names for type-ahead.
+
+    ``start()`` builds both indexes from the database; the book and author
+    writers keep them current through ``add_book``, ``remove_book`` and
+    ``add_author``. Changes made by other workers show up after the next
+    rebuild, every ``refresh_interval`` seconds (0 disables it).
+    """
+
+    def __init__(self, refresh_interval=600.0, merge_threshold=10000):
+        self.refresh_interval = refresh_interval
+        self.books = PrefixIndex(merge_threshold)
+        self.authors = PrefixIndex(merge_threshold)
+        self._task = None
+        self._builds = 0
+        self._build_seconds = None
+
+    def add_book(self, book_id: int, title: str):
+        self.books.add(book_id, title)
+
+    def remove_book(self, book_id: int):
+        self.books.remove(book_id)
+
+    def add_author(self, author_id: int, name: str):
+        self.authors.add(author_id, name)
+
+    def search(self, prefix: str, limit: int = 10) -> dict:
+        return {
+            "books": [{"id": book_id, "title": title} for book_id, title in self.books.search(prefix, limit)],
+            "authors": [{"id": author_id, "name": name} for author_id, name in self.authors.search(prefix, limit)],
+        }
+
+    async def rebuild(self):
+        """Rebuild both indexes from the database without blocking lookups."""
+        started = time.perf_counter()
+        merge_threshold = self.books.merge_threshold
+        for index, sql in (
+            (self.books, "SELECT id, title FROM books ORDER BY id"),
+            (self.authors, "SELECT id, name FROM authors ORDER BY id"),
+        ):
+            index.begin_rebuild()
+            try:
+                # Rows are packed a chunk at a time, so the build never holds
+                # them all as Python objects; sorting and merging the chunks
+                # would stall the event loop, so they run in a thread
+                builder = PrefixIndexBuilder()
+                async for chunk in _fetch_chunks(sql):
+                    await asyncio.to_thread(builder.add, chunk)
+                rebuilt = await asyncio.to_thread(builder.build, merge_threshold)
+            except BaseException:
+                index.abort_rebuild()
+                raise
+            index.finish_rebuild(rebuilt)
+        self._build_seconds = time.perf_counter() - started
+        self._builds += 1
+        stats = self.stats()
+        logger.info(
+            f"Autocomplete index built: {stats['books']} titles, {stats['authors']} authors, "
+            f"{stats['memory_bytes'] / 2**20:.1f} MiB in {self._build_seconds:.2f}s"
+        )
+
+    async def start(self):
+        if self._task is None:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Error building autocomplete index: {e}")
+            if self.refresh_interval > 0:
+                self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        books, authors = self.books.stats(), self.authors.stats()
+        return {
+            "books": books["entries"],
+            "authors": authors["entries"],
+            "memory_bytes": books["memory_bytes"] + authors["memory_bytes"],
+            "builds": self._builds,
+            "build_seconds": self._build_seconds,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Error rebuilding autocomplete index: {e}")
+
+
+async def _fetch_chunks(sql):
+    """Yield the ``(id, text)`` rows of ``sql`` in lists of up to ``BUILD_CHUNK_SIZE``."""
+    async with get_async_connection() as conn:
+        async with conn.transaction():
+            cursor = await conn.cursor(sql)
+            while rows := await cursor.fetch(BUILD_CHUNK_SIZE):
+                yield [(row[0], row[1]) for row in rows]
+
+
+autocomplete = Autocomplete(AUTOCOMPLETE_REFRESH_INTERVAL, AUTOCOMPLETE_MERGE_THRESHOLD)
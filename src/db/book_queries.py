@@ -1,36 +1,15 @@
 from psycopg2.extras import RealDictCursor
 from src.db.connections import get_db_connection, logger
+from src.db.cache import book_cache
+from src.utils.pagination import SORT_COLUMNS
+from src.utils.metrics import timed_query
 
-def get_book_by_title(title: str):
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute("SELECT id, title, published_year, genre, author_id FROM books WHERE title = %s", (title,))
-                book = cursor.fetchone()
-                return book
-    except Exception as e:
-        logger.error(f"Error fetching book by title {title}: {e}")
-        raise
-
-def create_book(title, published_year, genre, author_id):
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO books (title, published_year, genre, author_id)
-                    VALUES (%s, %s, %s, %s)
-                    RETURNING id
-                """, (title, published_year, genre, author_id))
-                book_id = cursor.fetchone()[0]
-                conn.commit()
-                logger.info(f"Book created with ID: {book_id}")
-                return book_id
-    except Exception as e:
-        logger.error(f"Error creating book: {e}")
-        raise ValueError(f"Error creating book: {e}")
-
+@timed_query
 def get_book(book_id):
     """Fetch a specific book by its ID."""
+    cached = book_cache.get(book_id)
+    if cached is not None:
+        return dict(cached)
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
@@ -43,66 +22,45 @@ def get_book(book_id):
                 book = cursor.fetchone()
                 if not book:
                     raise ValueError(f"Book with ID {book_id} not found")
-                    
+
+                book_cache.set(book_id, dict(book))
                 return book
     except Exception as e:
         logger.error(f"Error fetching book with ID {book_id}: {e}")
         raise
 
-def get_books(skip=0, limit=10, sort_by="title"):
-    if sort_by not in ["title", "published_year", "author_id"]:
+@timed_query
+def get_books(skip=0, limit=10, sort_by="title", after=None):
+    """
+    Fetch a page of books ordered by ``sort_by`` and id.
+
+    When ``after`` holds the ``(sort value, id)`` of the last book of the
+    previous page, the page is located with a keyset seek instead of OFFSET.
+    """
+    if sort_by not in SORT_COLUMNS:
         sort_by = "title"
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(f"""
-                    SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author
-                    FROM books b
-                    JOIN authors a ON b.author_id = a.id
-                    ORDER BY {sort_by}
-                    OFFSET %s LIMIT %s
-                """, (skip, limit))
+                if after is None:
+                    cursor.execute(f"""
+                        SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author
+                        FROM books b
+                        JOIN authors a ON b.author_id = a.id
+                        ORDER BY b.{sort_by}, b.id
+                        OFFSET %s LIMIT %s
+                    """, (skip, limit))
+                else:
+                    cursor.execute(f"""
+                        SELECT b.id, b.title, b.published_year, b.genre, b.author_id, a.name AS author
+                        FROM books b
+                        JOIN authors a ON b.author_id = a.id
+                        WHERE (b.{sort_by}, b.id) > (%s, %s)
+                        ORDER BY b.{sort_by}, b.id
+                        LIMIT %s
+                    """, (after[0], after[1], limit))
                 books = cursor.fetchall()
                 return books
     except Exception as e:
         logger.error(f"Error fetching books with pagination: {e}")
         raise
-
-def update_book(book_id, title, published_year, genre, author_id):
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    UPDATE books SET title=%s, published_year=%s, genre=%s, author_id=%s
-                    WHERE id=%s
-                """, (title, published_year, genre, author_id, book_id))
-                
-                if cursor.rowcount == 0:
-                    raise ValueError("Book not found or no change")
-                conn.commit()
-                logger.info(f"Book with ID {book_id} updated successfully.")
-    except Exception as e:
-        logger.error(f"Error updating book with ID {book_id}: {e}")
-        conn.rollback()
-        raise ValueError(f"Error updating book: {e}")
-
-def delete_book(book_id):
-    """Delete a book from the database."""
-    try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("DELETE FROM user_history WHERE book_id=%s", (book_id,))
-                conn.commit()
-
-                cursor.execute("DELETE FROM books WHERE id=%s", (book_id,))
-                
-                if cursor.rowcount == 0:
-                    raise ValueError("Book not found")
-
-                conn.commit()
-                logger.info(f"Book with ID {book_id} deleted successfully.")
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        logger.error(f"Error deleting book with ID {book_id}: {e}")
-        raise ValueError(f"Error deleting book: {e}")
@@ -0,0 +1,130 @@
+import copy
+from src.dependencies import (
+    LOOKUP_CACHE_SIZE,
+    LOOKUP_CACHE_TTL,
+    LOOKUP_CACHE_LOCAL_TTL,
+    RECOMMENDATION_CACHE_TTL,
+    RECOMMENDATION_CACHE_MAX_QUERIES,
+    CACHE_BACKEND,
+    CACHE_REDIS_URL,
+    CACHE_KEY_PREFIX,
+    CACHE_INVALIDATION_CHANNEL,
+    logger,
+)
+from src.utils.shared_cache import SharedCache, CacheGroup, MemoryCacheBackend, RedisCacheBackend
+
+# With a shared backend the per-process copies are kept short-lived, so a lost
+# invalidation message can only leave a worker stale for LOOKUP_CACHE_LOCAL_TTL.
+_local_ttl = None if CACHE_BACKEND == "local" else LOOKUP_CACHE_LOCAL_TTL
+
+# Read-through caches for the hottest lookups. Only found rows are cached, so
+# a miss always falls through to the database.
+book_cache = SharedCache("book", LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL, _local_ttl, key_prefix=CACHE_KEY_PREFIX)
+
+# Recommendation results, one entry per user holding the results of their
+# most recent recommendation queries.
+recommendation_cache = SharedCache(
+    "recommendations", LOOKUP_CACHE_SIZE, RECOMMENDATION_CACHE_TTL, _local_ttl, key_prefix=CACHE_KEY_PREFIX
+)
+
+caches = CacheGroup(book_cache, recommendation_cache)
+
+
+def create_cache_backend(kind: str = CACHE_BACKEND):
+    """Build the shared backend selected by ``CACHE_BACKEND``; ``local`` means none."""
+    if kind == "local":
+        return None
+    if kind == "memory":
+        return MemoryCacheBackend()
+    if kind == "redis":
+        return RedisCacheBackend.from_url(CACHE_REDIS_URL, channel=CACHE_INVALIDATION_CHANNEL)
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+def init_cache_backend(backend=None):
+    """Attach the shared backend and subscribe to invalidations from other workers."""
+    if backend is None:
+        backend = create_cache_backend()
+    if backend is None:
+        return
+    caches.attach(backend)
+    logger.info(f"Shared cache backend attached: {type(backend).__name__}")
+
+
+def close_cache_backend():
+    if caches.backend is not None:
+        caches.detach()
+        logger.info("Shared cache backend detached.")
+
+
+def _recommendations_from_entry(entry, query: str):
+    if not entry or query not in entry:
+        return None
+    return copy.deepcopy(entry[query])
+
+
+def _entry_with_recommendations(entry, query: str, books) -> dict:
+    entry = dict(entry or {})
+    entry.pop(query, None)
+    entry[query] = copy.deepcopy(books)
+    # Keep only the most recent queries so arbitrary genre/author inputs can't grow an entry
+    while len(entry) > RECOMMENDATION_CACHE_MAX_QUERIES:
+        entry.pop(next(iter(entry)))
+    return entry
+
+
+def get_cached_recommendations(user_id: int, query: str):
+    """Cached result of a recommendation ``query`` for a user, or None."""
+    return _recommendations_from_entry(recommendation_cache.get(user_id), query)
+
+
+def cache_recommendations(user_id: int, query: str, books):
+    recommendation_cache.set(user_id, _entry_with_recommendations(recommendation_cache.get(user_id), query, books))
+
+
+def invalidate_recommendations(user_id=None):
+    """Drop one user's cached recommendations, or everyone's when no user is given."""
+    if user_id is None:
+        recommendation_cache.clear()
+    else:
+        recommendation_cache.delete(user_id)
+
+
+# Helpers for coroutines, which must not wait on the shared backend in the
+# event loop
+
+async def ainvalidate_book(book_id: int):
+    await book_cache.adelete(book_id)
+
+
+async def ainvalidate_books(rows):
+    """``ainvalidate_book`` for a batch of rows, with one backend call."""
+    book_ids = [row["id"] for row in rows]
+    if book_ids:
+        await book_cache.adelete(*book_ids)
+
+
+async def aget_cached_recommendations(user_id: int, query: str):
+    return _recommendations_from_entry(await recommendation_cache.aget(user_id), query)
+
+
+async def acache_recommendations(user_id: int, query: str, books):
+    entry = _entry_with_recommendations(await recommendation_cache.aget(user_id), query, books)
+    await recommendation_cache.aset(user_id, entry)
+
+
+async def ainvalidate_recommendations(user_id=None):
+    if user_id is None:
+        await recommendation_cache.aclear()
+    else:
+        await recommendation_cache.adelete(user_id)
+
+
+def clear_caches():
+    """Drop every cached lookup, e.g. after the database was changed out of band."""
+    for cache in caches.caches.values():
+        cache.clear()
+
+
+def cache_stats() -> dict:
+    return {namespace: cache.stats() for namespace, cache in caches.caches.items()}
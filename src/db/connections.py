@@ -1,17 +1,270 @@
+import os
+import time
+import threading
 import psycopg2
-from src.dependencies import DATABASE_URL, logger
+from psycopg2 import extensions
+from src.dependencies import (
+    DATABASE_URL,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_MAX_LIFETIME,
+    DB_POOL_TIMEOUT,
+    DB_POOL_HEALTH_CHECK_INTERVAL,
+    logger,
+)
 from contextlib import contextmanager
+from src.utils.metrics import DB_CONNECTION_ACQUIRE
+from src.db.slow_query_log import connection_factory as slow_query_connection_factory
+
+
+class PoolError(Exception):
+    """Raised when a connection can not be obtained from the pool."""
+
+
+class PoolTimeout(PoolError):
+    """Raised when no connection became available within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    Connections are health-checked on checkout, recycled once they are older
+    than ``max_lifetime`` seconds, and the time callers spend waiting for a
+    connection is tracked in ``stats()``.
+    """
+
+    def __init__(self, dsn, min_size=1, max_size=10, max_lifetime=1800.0, timeout=30.0, health_check_interval=30.0, connection_factory=None):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+        self.dsn = dsn
+        self.connection_factory = connection_factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._created_at = {}
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._connections_created = 0
+        self._recycled = 0
+        self._health_check_failures = 0
+
+    def open(self):
+        """Pre-create ``min_size`` connections."""
+        conns = []
+        try:
+            for _ in range(self.min_size):
+                conns.append(self.getconn())
+        finally:
+            for conn in conns:
+                self.putconn(conn)
+        logger.info(f"Connection pool opened (min_size={self.min_size}, max_size={self.max_size}).")
+
+    def getconn(self):
+        """Check out a healthy connection, waiting up to ``timeout`` seconds."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"Timed out after {self.timeout}s waiting for a database connection")
+                    self._cond.wait(remaining)
+                    continue
+
+            if conn is None:
+                conn = self._connect()
+            elif not self._is_usable(conn, last_used):
+                self._discard(conn)
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._in_use += 1
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            DB_CONNECTION_ACQUIRE.labels("sync").observe(waited)
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, resetting any open transaction."""
+        with self._cond:
+            self._in_use -= 1
+
+        if not discard and not self._closed and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except psycopg2.Error as e:
+                logger.warning(f"Discarding connection that failed to reset: {e}")
+                discard = True
+            if not discard and self._expired(conn):
+                with self._cond:
+                    self._recycled += 1
+                discard = True
+        else:
+            discard = True
+
+        if discard:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+        logger.info("Connection pool closed.")
+
+    def stats(self) -> dict:
+        """Snapshot of pool occupancy and checkout wait-time metrics."""
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "checkouts": self._checkouts,
+                "wait_time_total": self._wait_total,
+                "wait_time_max": self._wait_max,
+                "wait_time_avg": self._wait_total / self._checkouts if self._checkouts else 0.0,
+                "timeouts": self._timeouts,
+                "connections_created": self._connections_created,
+                "recycled": self._recycled,
+                "health_check_failures": self._health_check_failures,
+            }
+
+    def _connect(self):
+        try:
+            conn = psycopg2.connect(self.dsn, connection_factory=self.connection_factory)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[id(conn)] = time.monotonic()
+            self._connections_created += 1
+        return conn
+
+    def _expired(self, conn) -> bool:
+        created_at = self._created_at.get(id(conn), 0.0)
+        return self.max_lifetime > 0 and time.monotonic() - created_at > self.max_lifetime
+
+    def _is_usable(self, conn, last_used) -> bool:
+        if conn.closed:
+            return False
+        if self._expired(conn):
+            with self._cond:
+                self._recycled += 1
+            return False
+        if time.monotonic() - last_used >= self.health_check_interval:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error as e:
+                logger.warning(f"Pooled connection failed health check: {e}")
+                with self._cond:
+                    self._health_check_failures += 1
+                return False
+        return True
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+            self._size -= 1
+            self._cond.notify()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                pool = ConnectionPool(
+                    DATABASE_URL,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    max_lifetime=DB_POOL_MAX_LIFETIME,
+                    timeout=DB_POOL_TIMEOUT,
+                    health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL,
+                    connection_factory=slow_query_connection_factory,
+                )
+                pool.open()
+                _pool = pool
+    return _pool
+
+
+def pool_stats() -> dict:
+    """Stats of the process-wide connection pool, empty if it was not opened."""
+    pool = _pool
+    return pool.stats() if pool is not None else {}
+
+
+def close_pool():
+    """Close the process-wide connection pool, if one was opened."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
 
 @contextmanager
 def get_db_connection(testing_status=False):
-    conn = None
+    pool = get_pool()
+    broken = False
     try:
-        conn = psycopg2.connect(DATABASE_URL)
-        yield conn
+        conn = pool.getconn()
     except Exception as e:
         logger.error(f"Failed to connect to DB: {e}")
         raise
+    try:
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
     finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+        pool.putconn(conn, discard=broken)
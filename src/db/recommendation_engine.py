@@ -0,0 +1,94 @@
+import io
+import time
+import asyncio
+import numpy as np
+from src.db.connections import get_db_connection, logger
+from src.db.cache import invalidate_recommendations
+from src.dependencies import (
+    RECOMMENDATION_NEIGHBOURS,
+    RECOMMENDATION_MIN_CO_VIEWS,
+    RECOMMENDATION_MAX_USER_HISTORY,
+)
+from src.utils.co_view_similarity import top_k_neighbours
+
+# Serialises rebuilds across workers and the command-line entry point
+REFRESH_LOCK_ID = 7_305_011
+
+
+def refresh_book_neighbours(k=RECOMMENDATION_NEIGHBOURS, min_co_views=RECOMMENDATION_MIN_CO_VIEWS,
+                            max_user_history=RECOMMENDATION_MAX_USER_HISTORY):
+    """
+    Rebuild the ``book_neighbours`` table from ``user_history``.
+
+    Only each user's ``max_user_history`` most recent views are used, which
+    bounds the cost of very active users. The table is replaced inside one
+    transaction, so readers keep seeing the previous neighbours until the
+    rebuild commits. Returns the number of neighbour rows written, or None
+    if another rebuild was already running.
+    """
+    started = time.monotonic()
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (REFRESH_LOCK_ID,))
+                if not cursor.fetchone()[0]:
+                    logger.info("Book neighbours refresh already in progress, skipping.")
+                    conn.rollback()
+                    return None
+
+                cursor.execute("""
+                    SELECT user_id, book_id
+                    FROM (
+                        SELECT user_id, book_id,
+                               ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY created_at DESC, id DESC) AS recent
+                        FROM user_history
+                    ) h
+                    WHERE recent <= %s
+                """, (max_user_history,))
+                views = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+
+                book_ids, neighbour_ids, scores = top_k_neighbours(views[:, 0], views[:, 1], k, min_co_views)
+
+                buffer = io.StringIO()
+                np.savetxt(buffer, np.column_stack((book_ids, neighbour_ids, scores)), fmt="%d\t%d\t%.6f")
+                buffer.seek(0)
+
+                cursor.execute("""
+                    CREATE TEMP TABLE book_neighbours_new (LIKE book_neighbours) ON COMMIT DROP
+                """)
+                cursor.copy_expert("COPY book_neighbours_new (book_id, neighbour_id, score) FROM STDIN", buffer)
+                cursor.execute("DELETE FROM book_neighbours")
+                # Books deleted since the views were read are skipped rather than failing the rebuild
+                cursor.execute("""
+                    INSERT INTO book_neighbours (book_id, neighbour_id, score)
+                    SELECT n.book_id, n.neighbour_id, n.score
+                    FROM book_neighbours_new n
+                    JOIN books b ON b.id = n.book_id
+                    JOIN books nb ON nb.id = n.neighbour_id
+                """)
+                written = cursor.rowcount
+                conn.commit()
+
+        invalidate_recommendations()
+        logger.info(
+            f"Book neighbours rebuilt from {len(views)} views: {written} rows "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return written
+    except Exception as e:
+        logger.error(f"Error refreshing book neighbours: {e}")
+        raise
+
+
+async def run_periodic_refresh(interval: float):
+    """Rebuild the neighbours every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh_book_neighbours)
+        except Exception:
+            logger.exception("Periodic book neighbours refresh failed.")
+
+
+if __name__ == "__main__":
+    refresh_book_neighbours()
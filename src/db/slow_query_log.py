@@ -0,0 +1,244 @@
+import re
+import json
+import time
+import queue
+import random
+import hashlib
+import logging
+import threading
+import psycopg2
+from psycopg2 import extensions
+from src.dependencies import (
+    DATABASE_URL,
+    SLOW_QUERY_LOG_ENABLED,
+    SLOW_QUERY_THRESHOLD_MS,
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    SLOW_QUERY_EXPLAIN_INTERVAL,
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+    SLOW_QUERY_MAX_STATEMENTS,
+    logger,
+)
+
+# One JSON object per line, so the stream can be shipped and queried as is
+slow_query_logger = logging.getLogger("service.slow_queries")
+
+# EXPLAIN ANALYZE runs the statement again, so only reads are explained
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|CALL)\b|\bFOR\s+UPDATE\b", re.IGNORECASE)
+_ASYNCPG_PLACEHOLDER = re.compile(r"\$(\d+)")
+
+
+def normalize_statement(statement) -> str:
+    if isinstance(statement, bytes):
+        statement = statement.decode("utf-8", "replace")
+    return " ".join(str(statement).split())
+
+
+def redact(params):
+    """Replace parameter values by their types, keeping the shape of the parameters."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _redact_value(value) for key, value in params.items()}
+    return [_redact_value(value) for value in params]
+
+
+def _redact_value(value):
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set)):
+        return f"<{type(value).__name__}[{len(value)}]>"
+    return f"<{type(value).__name__}>"
+
+
+def explainable(statement: str) -> bool:
+    return bool(_READ_ONLY.match(statement)) and not _WRITES.search(statement)
+
+
+class SlowQueryLog:
+    """
+    Aggregates statements slower than ``threshold_ms`` by their text (the
+    parameters stay placeholders) and logs each occurrence as a JSON line,
+    with the parameter values redacted.
+
+    A slow read-only statement is picked for ``EXPLAIN (ANALYZE, BUFFERS)``
+    with probability ``sample_rate``, at most once per ``explain_interval``
+    seconds. The plans are captured by a background thread on its own
+    connection, inside a rolled back transaction, so requests do not wait
+    for them and the connection pools lose no connection.
+    """
+
+    def __init__(self, threshold_ms=200.0, sample_rate=0.1, explain_interval=300.0, explain_timeout_ms=10000, max_statements=500, dsn=None):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.explain_interval = explain_interval
+        self.explain_timeout_ms = explain_timeout_ms
+        self.max_statements = max_statements
+        self.dsn = dsn
+        self._statements = {}
+        self._lock = threading.Lock()
+        self._explain_queue = queue.Queue(maxsize=16)
+        self._explain_thread = None
+
+    def observe(self, statement, params, elapsed: float, source: str, paramstyle: str = "pyformat"):
+        """Record a statement that took ``elapsed`` seconds, if it was slow."""
+        duration_ms = elapsed * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        raw, statement = statement, normalize_statement(statement)
+        fingerprint = hashlib.sha1(statement.encode("utf-8")).hexdigest()[:12]
+        redacted = redact(params)
+        now = time.time()
+        explain = False
+        with self._lock:
+            entry = self._statements.get(fingerprint)
+            if entry is None:
+                if len(self._statements) >= self.max_statements:
+                    # Keep the statements that cost the most in total
+                    cheapest = min(self._statements, key=lambda key: self._statements[key]["total_ms"])
+                    del self._statements[cheapest]
+                entry = self._statements[fingerprint] = {
+                    "fingerprint": fingerprint,
+                    "statement": statement,
+                    "source": source,
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "last_params": None,
+                    "last_seen": None,
+                    "explain": None,
+                    "explained_at": None,
+                    "_explain_requested": 0.0,
+                }
+            entry["calls"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_params"] = redacted
+            entry["last_seen"] = now
+            if (
+                self.sample_rate > 0
+                and now - entry["_explain_requested"] >= self.explain_interval
+                and random.random() < self.sample_rate
+                and explainable(statement)
+            ):
+                entry["_explain_requested"] = now
+                explain = True
+
+        slow_query_logger.warning(json.dumps({
+            "event": "slow_query",
+            "fingerprint": fingerprint,
+            "source": source,
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement,
+            "params": redacted,
+        }))
+        if explain:
+            self._request_explain(fingerprint, raw if isinstance(raw, str) else statement, params, paramstyle)
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> list:
+        """The ``limit`` slowest statements by ``total_ms``, ``max_ms``, ``mean_ms`` or ``calls``."""
+        if order_by not in ("total_ms", "max_ms", "mean_ms", "calls"):
+            raise ValueError("order_by must be one of: total_ms, max_ms, mean_ms, calls.")
+        with self._lock:
+            entries = [
+                {**{key: value for key, value in entry.items() if not key.startswith("_")}, "mean_ms": entry["total_ms"] / entry["calls"]}
+                for entry in self._statements.values()
+            ]
+        entries.sort(key=lambda entry: entry[order_by], reverse=True)
+        return entries[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+
+    def log_asyncpg_query(self, record):
+        """Query logger for asyncpg connections (``Connection.add_query_logger``)."""
+        self.observe(record.query, record.args, record.elapsed, "asyncpg", paramstyle="numeric")
+
+    def explain(self, fingerprint, statement, params, paramstyle="pyformat"):
+        """Capture the plan of a statement now, on a dedicated connection."""
+        if paramstyle == "numeric":
+            # asyncpg's $1 placeholders become named psycopg2 ones
+            statement = _ASYNCPG_PLACEHOLDER.sub(r"%(p\1)s", statement.replace("%", "%%"))
+            params = {f"p{i}": value for i, value in enumerate(params or (), start=1)}
+        try:
+            conn = psycopg2.connect(self.dsn or DATABASE_URL)
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", params)
+                    plan = "\n".join(row[0] for row in cursor.fetchall())
+            finally:
+                conn.rollback()
+                conn.close()
+        except Exception as e:
+            logger.error(f"Error explaining slow statement {fingerprint}: {e}")
+            return None
+
+        with self._lock:
+            entry = self._statements.get(fingerprint)
+            if entry is not None:
+                entry["explain"] = plan
+                entry["explained_at"] = time.time()
+        slow_query_logger.warning(json.dumps({"event": "slow_query_explain", "fingerprint": fingerprint, "plan": plan}))
+        return plan
+
+    def _request_explain(self, fingerprint, statement, params, paramstyle):
+        try:
+            self._explain_queue.put_nowait((fingerprint, statement, params, paramstyle))
+        except queue.Full:
+            return
+        with self._lock:
+            if self._explain_thread is None or not self._explain_thread.is_alive():
+                self._explain_thread = threading.Thread(target=self._run_explains, name="slow-query-explain", daemon=True)
+                self._explain_thread.start()
+
+    def _run_explains(self):
+        while True:
+            self.explain(*self._explain_queue.get())
+
+
+class _TimedCursorMixin:
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed * 1000 >= slow_query_log.threshold_ms:
+                if not isinstance(query, (str, bytes)):
+                    query = query.as_string(self)
+                slow_query_log.observe(query, vars, elapsed, "psycopg2")
+
+
+_timed_cursor_classes = {}
+
+
+def _timed_cursor_class(factory):
+    cls = _timed_cursor_classes.get(factory)
+    if cls is None:
+        cls = _timed_cursor_classes[factory] = type(f"Timed{factory.__name__}", (_TimedCursorMixin, factory), {})
+    return cls
+
+
+class InstrumentedConnection(extensions.connection):
+    """psycopg2 connection whose cursors report slow statements to ``slow_query_log``."""
+
+    def cursor(self, *args, **kwargs):
+        if len(args) > 1:
+            args = (args[0], _timed_cursor_class(args[1] or self.cursor_factory or extensions.cursor)) + args[2:]
+        else:
+            kwargs["cursor_factory"] = _timed_cursor_class(kwargs.get("cursor_factory") or self.cursor_factory or extensions.cursor)
+        return super().cursor(*args, **kwargs)
+
+
+slow_query_log = SlowQueryLog(
+    SLOW_QUERY_THRESHOLD_MS,
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    SLOW_QUERY_EXPLAIN_INTERVAL,
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+    SLOW_QUERY_MAX_STATEMENTS,
+)
+
+# Connection factory for psycopg2.connect, None unless the log is enabled
+connection_factory = InstrumentedConnection if SLOW_QUERY_LOG_ENABLED else None
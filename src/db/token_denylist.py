@@ -0,0 +1,145 @@
+import asyncio
+import threading
+from src.db.async_connections import get_async_connection, logger
+from src.db.connections import get_db_connection
+from src.utils.bloom_filter import BloomFilter
+from src.utils.ttl_cache import TTLCache
+from src.dependencies import TOKEN_DENYLIST_CAPACITY, TOKEN_DENYLIST_ERROR_RATE, TOKEN_DENYLIST_REFRESH_INTERVAL
+
+
+class TokenDenylist:
+    """
+    Revoked access tokens, stored in ``revoked_tokens`` until they expire.
+
+    Every request checks its token against an in-memory Bloom filter of the
+    stored digests, so tokens that were never revoked cost no query. Only a
+    filter hit is confirmed against the table, and the answer is kept for
+    ``refresh_interval`` seconds. Tokens revoked by other workers are picked
+    up when the filter is rebuilt, every ``refresh_interval`` seconds (0
+    disables it); the rebuild also purges expired rows. Tokens revoked here
+    while a rebuild reads the table are carried over to the new filter.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001, refresh_interval=30.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        self._confirmed = TTLCache(max(1, capacity // 10), refresh_interval or 60.0)
+        self._task = None
+        self._lock = threading.Lock()
+        # Revocations made while a rebuild runs, None outside of rebuilds
+        self._pending = None
+        self._checks = 0
+        self._filter_hits = 0
+        self._revoked_hits = 0
+        self._loads = 0
+
+    def is_revoked(self, token_hash: bytes) -> bool:
+        self._checks += 1
+        if token_hash not in self._filter:
+            return False
+        self._filter_hits += 1
+        revoked = self._confirmed.get(token_hash)
+        if revoked is None:
+            revoked = _is_stored(token_hash)
+            self._confirmed.set(token_hash, revoked)
+        if revoked:
+            self._revoked_hits += 1
+        return revoked
+
+    async def revoke(self, token_hash: bytes, expires_at: float):
+        """Revoke a token until ``expires_at`` (a Unix timestamp)."""
+        try:
+            async with get_async_connection() as conn:
+                await conn.execute("""
+                    INSERT INTO revoked_tokens (token_hash, expires_at)
+                    VALUES ($1, to_timestamp($2))
+                    ON CONFLICT (token_hash) DO NOTHING
+                """, token_hash, float(expires_at))
+        except Exception as e:
+            logger.error(f"Error revoking token: {e}")
+            raise
+        with self._lock:
+            self._filter.add(token_hash)
+            if self._pending is not None:
+                self._pending.add(token_hash)
+        self._confirmed.set(token_hash, True)
+
+    async def load(self):
+        """Purge expired rows and rebuild the filter from the remaining ones."""
+        with self._lock:
+            self._pending = set()
+        try:
+            async with get_async_connection() as conn:
+                await conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= now()")
+                rows = await conn.fetch("SELECT token_hash FROM revoked_tokens")
+            # Past its capacity the filter would answer "maybe" too often
+            bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+            for row in rows:
+                bloom.add(bytes(row["token_hash"]))
+            with self._lock:
+                # Revoked after the SELECT started, so possibly missing from rows
+                for token_hash in self._pending:
+                    bloom.add(token_hash)
+                self._filter = bloom
+                self._confirmed.clear()
+        finally:
+            with self._lock:
+                self._pending = None
+        self._loads += 1
+
+    async def start(self):
+        if self._task is None:
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Error loading revoked tokens: {e}")
+            if self.refresh_interval > 0:
+                self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._filter),
+            "checks": self._checks,
+            "filter_hits": self._filter_hits,
+            "revoked_hits": self._revoked_hits,
+            "loads": self._loads,
+            "memory_bytes": self._filter.stats()["memory_bytes"],
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Error loading revoked tokens: {e}")
+
+
+def _is_stored(token_hash):
+    # Called from the synchronous get_current_user dependency, which FastAPI
+    # runs in a worker thread, so the blocking pool is used here
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM revoked_tokens WHERE token_hash = %s AND expires_at > now()",
+                    (token_hash,),
+                )
+                return cursor.fetchone() is not None
+    except Exception as e:
+        logger.error(f"Error checking revoked token: {e}")
+        raise
+
+
+token_denylist = TokenDenylist(TOKEN_DENYLIST_CAPACITY, TOKEN_DENYLIST_ERROR_RATE, TOKEN_DENYLIST_REFRESH_INTERVAL)
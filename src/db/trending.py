@@ -0,0 +1,141 @@
+import asyncio
+from typing import Iterable, List, Tuple
+from src.db.async_connections import get_async_connection, logger
+from src.utils.decaying_counter import DecayingCounter, WINDOWS
+from src.dependencies import TRENDING_CHECKPOINT_INTERVAL, TRENDING_MIN_SCORE
+
+
+class TrendingTracker:
+    """
+    Trending view scores of books, kept in memory and checkpointed to
+    ``book_trending``.
+
+    ``record()`` only updates in-memory counters, so counting a view costs
+    no query. Every ``checkpoint_interval`` seconds the views counted since
+    the last checkpoint are added to the stored scores (which other workers
+    add to as well), and the merged scores are read back, so ``top()``
+    reflects every worker as of their last checkpoint plus this worker's own
+    views. Books whose scores decayed below ``min_score`` are dropped.
+    """
+
+    def __init__(self, checkpoint_interval=60.0, min_score=0.01):
+        self.checkpoint_interval = checkpoint_interval
+        self.min_score = min_score
+        self.scores = DecayingCounter()
+        self._pending = DecayingCounter()
+        self._task = None
+        self._recorded = 0
+        self._checkpoints = 0
+        self._checkpoint_errors = 0
+
+    def record(self, book_ids: Iterable[int]):
+        book_ids = list(book_ids)
+        self.scores.record(book_ids)
+        self._pending.record(book_ids)
+        self._recorded += len(book_ids)
+
+    def discard(self, book_id: int):
+        """Forget a deleted book; its stored row goes with the book."""
+        self.scores.discard(book_id)
+        self._pending.discard(book_id)
+
+    def top(self, window: str = "24h", limit: int = 10) -> List[Tuple[int, float]]:
+        if window not in WINDOWS:
+            raise ValueError(f"Window must be one of: {', '.join(WINDOWS)}.")
+        return self.scores.top(window, limit)
+
+    async def load(self):
+        """Replace the in-memory scores with the stored ones plus the views not checkpointed yet."""
+        async with get_async_connection() as conn:
+            rows = await conn.fetch("""
+                SELECT book_id,
+                       book_trending_decay(score_1h, updated_at, 3600) AS score_1h,
+                       book_trending_decay(score_24h, updated_at, 86400) AS score_24h,
+                       book_trending_decay(score_7d, updated_at, 604800) AS score_7d
+                FROM book_trending
+            """)
+        scores = DecayingCounter()
+        scores.update({row["book_id"]: [row["score_1h"], row["score_24h"], row["score_7d"]] for row in rows})
+        scores.update(self._pending.snapshot())
+        scores.prune(self.min_score)
+        self.scores = scores
+
+    async def checkpoint(self):
+        """Add the views counted since the last checkpoint to ``book_trending`` and reload."""
+        deltas = self._pending.drain()
+        try:
+            if deltas:
+                book_ids = sorted(deltas)
+                async with get_async_connection() as conn:
+                    async with conn.transaction():
+                        # Stored scores are decayed to now before the new views are added
+                        await conn.execute("""
+                            INSERT INTO book_trending (book_id, score_1h, score_24h, score_7d, updated_at)
+                            SELECT d.book_id, d.score_1h, d.score_24h, d.score_7d, LOCALTIMESTAMP
+                            FROM unnest($1::int[], $2::float8[], $3::float8[], $4::float8[])
+                                AS d(book_id, score_1h, score_24h, score_7d)
+                            WHERE EXISTS (SELECT 1 FROM books b WHERE b.id = d.book_id)
+                            ORDER BY d.book_id
+                            ON CONFLICT (book_id) DO UPDATE SET
+                                score_1h = book_trending_decay(book_trending.score_1h, book_trending.updated_at, 3600) + EXCLUDED.score_1h,
+                                score_24h = book_trending_decay(book_trending.score_24h, book_trending.updated_at, 86400) + EXCLUDED.score_24h,
+                                score_7d = book_trending_decay(book_trending.score_7d, book_trending.updated_at, 604800) + EXCLUDED.score_7d,
+                                updated_at = EXCLUDED.updated_at
+                        """, book_ids, *([deltas[book_id][i] for book_id in book_ids] for i in range(3)))
+                        await conn.execute(
+                            "DELETE FROM book_trending WHERE book_trending_decay(score_7d, updated_at, 604800) < $1",
+                            self.min_score,
+                        )
+        except Exception:
+            # Keep the views for the next checkpoint
+            self._pending.update(deltas)
+            raise
+        await self.load()
+        self._checkpoints += 1
+        logger.info(f"Checkpointed trending scores of {len(deltas)} book(s), tracking {len(self.scores)}.")
+
+    async def start(self):
+        if self._task is None:
+            try:
+                await self.load()
+            except Exception as e:
+                logger.error(f"Error loading trending scores: {e}")
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Trending tracker started (checkpoint_interval={self.checkpoint_interval}s).")
+
+    async def stop(self):
+        """Stop the background task and checkpoint the remaining views."""
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.checkpoint()
+        except Exception as e:
+            self._checkpoint_errors += 1
+            logger.error(f"Error checkpointing trending scores: {e}")
+        logger.info("Trending tracker stopped.")
+
+    def stats(self) -> dict:
+        return {
+            "tracked": len(self.scores),
+            "pending": len(self._pending),
+            "recorded": self._recorded,
+            "checkpoints": self._checkpoints,
+            "checkpoint_errors": self._checkpoint_errors,
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                self._checkpoint_errors += 1
+                logger.error(f"Error checkpointing trending scores: {e}")
+
+
+trending = TrendingTracker(TRENDING_CHECKPOINT_INTERVAL, TRENDING_MIN_SCORE)
@@ -0,0 +1,69 @@
+import argparse
+from typing import Optional
+from src.db.connections import get_db_connection, logger
+from src.db.cache import invalidate_recommendations
+
+def rebuild_user_profiles(user_id: Optional[int] = None) -> int:
+    """
+    Recompute taste profiles from ``user_history`` for one user, or for all
+    users when ``user_id`` is None.
+
+    add_book_view keeps profiles current, but counts drift when a viewed
+    book changes genre or author or is deleted; a rebuild corrects that.
+    Returns the number of profiles written.
+    """
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    WITH views AS (
+                        SELECT h.id, h.user_id, h.book_id, h.created_at, b.genre, b.author_id
+                        FROM user_history h
+                        JOIN books b ON b.id = h.book_id
+                        WHERE %(user_id)s::int IS NULL OR h.user_id = %(user_id)s
+                    ), genres AS (
+                        SELECT user_id, jsonb_object_agg(genre, views) AS counts
+                        FROM (SELECT user_id, genre, COUNT(*) AS views FROM views GROUP BY user_id, genre) g
+                        GROUP BY user_id
+                    ), authors AS (
+                        SELECT user_id, jsonb_object_agg(author_id::text, views) AS counts
+                        FROM (SELECT user_id, author_id, COUNT(*) AS views FROM views GROUP BY user_id, author_id) a
+                        GROUP BY user_id
+                    ), viewed AS (
+                        SELECT user_id, array_agg(book_id ORDER BY created_at, id) AS book_ids, COUNT(*) AS views
+                        FROM views
+                        GROUP BY user_id
+                    )
+                    INSERT INTO user_profiles (user_id, genre_counts, author_counts, viewed_book_ids, view_count, updated_at)
+                    SELECT v.user_id, g.counts, a.counts, v.book_ids, v.views, CURRENT_TIMESTAMP
+                    FROM viewed v
+                    JOIN genres g ON g.user_id = v.user_id
+                    JOIN authors a ON a.user_id = v.user_id
+                    ON CONFLICT (user_id) DO UPDATE SET
+                        genre_counts = EXCLUDED.genre_counts,
+                        author_counts = EXCLUDED.author_counts,
+                        viewed_book_ids = EXCLUDED.viewed_book_ids,
+                        view_count = EXCLUDED.view_count,
+                        updated_at = EXCLUDED.updated_at
+                """, {"user_id": user_id})
+                written = cursor.rowcount
+
+                cursor.execute("""
+                    DELETE FROM user_profiles p
+                    WHERE (%(user_id)s::int IS NULL OR p.user_id = %(user_id)s)
+                      AND NOT EXISTS (SELECT 1 FROM user_history h WHERE h.user_id = p.user_id)
+                """, {"user_id": user_id})
+                conn.commit()
+
+        invalidate_recommendations(user_id)
+        logger.info(f"Rebuilt {written} user profile(s)" + (f" for user {user_id}" if user_id is not None else ""))
+        return written
+    except Exception as e:
+        logger.error(f"Error rebuilding user profiles: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild per-user taste profiles from the view history.")
+    parser.add_argument("--user-id", type=int, help="rebuild a single user's profile")
+    rebuild_user_profiles(parser.parse_args().user_id)
@@ -1,6 +1,8 @@
 from psycopg2.extras import RealDictCursor
 from src.db.connections import get_db_connection,logger
+from src.utils.metrics import timed_query
 
+@timed_query
 def get_user_by_username(username: str):
     try:
         with get_db_connection() as conn:
@@ -12,6 +14,7 @@ def get_user_by_username(username: str):
         logger.error(f"Error fetching user by username {username}: {e}")
         raise
 
+@timed_query
 def create_user(username: str, hashed_password: str):
     try:
         with get_db_connection() as conn:
@@ -0,0 +1,120 @@
+import asyncio
+from src.db.async_connections import logger
+from src.db.async_recommendations_queries import add_book_views
+from src.dependencies import VIEW_QUEUE_SIZE, VIEW_FLUSH_BATCH_SIZE, VIEW_FLUSH_INTERVAL
+
+
+class ViewTracker:
+    """
+    Write-behind buffer for book views.
+
+    ``record()`` only enqueues the view; a background task started with
+    ``start()`` writes queued views in batches of up to ``batch_size`` at
+    least every ``flush_interval`` seconds. When the queue is full new views
+    are dropped and counted rather than slowing down the request. ``stop()``
+    writes everything still queued.
+    """
+
+    def __init__(self, max_queue=10000, batch_size=500, flush_interval=1.0, writer=add_book_views):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.writer = writer
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._pending = []
+        self._task = None
+        self._enqueued = 0
+        self._dropped = 0
+        self._flushes = 0
+        self._flushed = 0
+        self._flush_errors = 0
+        self._lost = 0
+
+    def record(self, user_id: int, book_id: int) -> bool:
+        """Queue a view; returns False if it was dropped because the queue is full."""
+        try:
+            self._queue.put_nowait((user_id, book_id))
+        except asyncio.QueueFull:
+            self._dropped += 1
+            if self._dropped == 1 or self._dropped % 1000 == 0:
+                logger.warning(f"View queue is full, {self._dropped} view(s) dropped so far")
+            return False
+        self._enqueued += 1
+        return True
+
+    async def start(self):
+        if self._task is None:
+            # asyncio queues bind to the loop that first waits on them, so each
+            # start (e.g. a new application lifespan) gets a fresh queue
+            queue = asyncio.Queue(maxsize=self._queue.maxsize)
+            while not self._queue.empty():
+                queue.put_nowait(self._queue.get_nowait())
+            self._queue = queue
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"View tracker started (batch_size={self.batch_size}, flush_interval={self.flush_interval}s).")
+
+    async def stop(self):
+        """Stop the background task and write every view still queued."""
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        logger.info("View tracker stopped.")
+
+    async def flush(self):
+        """Write all queued views now."""
+        self._drain(limit=None)
+        while self._pending:
+            await self._write()
+            self._drain(limit=None)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() + len(self._pending),
+            "max_queue": self._queue.maxsize,
+            "enqueued": self._enqueued,
+            "dropped": self._dropped,
+            "flushes": self._flushes,
+            "flushed": self._flushed,
+            "flush_errors": self._flush_errors,
+            "lost": self._lost,
+        }
+
+    def _drain(self, limit):
+        while limit is None or len(self._pending) < limit:
+            try:
+                self._pending.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+
+    async def _run(self):
+        while True:
+            self._pending.append(await self._queue.get())
+            self._drain(self.batch_size)
+            if len(self._pending) < self.batch_size:
+                await asyncio.sleep(self.flush_interval)
+                self._drain(self.batch_size)
+            await self._write()
+
+    async def _write(self):
+        # Views stay in _pending until written, so a flush interrupted by
+        # stop() is retried; already recorded views are skipped on retry.
+        batch = self._pending[:self.batch_size]
+        try:
+            await self.writer(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._flush_errors += 1
+            self._lost += len(batch)
+            logger.error(f"Failed to write {len(batch)} book view(s), discarding them: {e}")
+        else:
+            self._flushes += 1
+            self._flushed += len(batch)
+        del self._pending[:len(batch)]
+
+
+view_tracker = ViewTracker(VIEW_QUEUE_SIZE, VIEW_FLUSH_BATCH_SIZE, VIEW_FLUSH_INTERVAL)
@@ -47,3 +47,107 @@ class DatabaseConfig:
 # Create an instance of the DatabaseConfig to manage database connection URL
 db_config = DatabaseConfig()
 DATABASE_URL = db_config.get_db_url()
+
+# Connection pool configuration
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", 300))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", 30))
+
+# Password hashing worker pool configuration
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 32))
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))
+
+# Bulk import configuration
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 5000))
+IMPORT_READ_CHUNK_SIZE = int(os.getenv("IMPORT_READ_CHUNK_SIZE", 64 * 1024))
+
+# Export configuration
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", 1000))
+# Rows per export when no limit is given, the largest limit accepted, and
+# exports streamed at once per worker (each holds a pooled connection)
+EXPORT_DEFAULT_LIMIT = int(os.getenv("EXPORT_DEFAULT_LIMIT", 1000))
+EXPORT_MAX_LIMIT = int(os.getenv("EXPORT_MAX_LIMIT", 100000))
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", 2))
+
+# Book and author lookup cache configuration
+LOOKUP_CACHE_SIZE = int(os.getenv("LOOKUP_CACHE_SIZE", 10000))
+LOOKUP_CACHE_TTL = float(os.getenv("LOOKUP_CACHE_TTL", 300))
+
+# Shared cache backend configuration ("local", "memory" or "redis")
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "bms:")
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "bms:invalidate")
+# Threads running shared cache calls for async code, off the event loop
+CACHE_BACKEND_THREADS = int(os.getenv("CACHE_BACKEND_THREADS", 8))
+LOOKUP_CACHE_LOCAL_TTL = float(os.getenv("LOOKUP_CACHE_LOCAL_TTL", 30))
+RECOMMENDATION_CACHE_TTL = float(os.getenv("RECOMMENDATION_CACHE_TTL", 60))
+RECOMMENDATION_CACHE_MAX_QUERIES = int(os.getenv("RECOMMENDATION_CACHE_MAX_QUERIES", 16))
+
+# Co-view recommendation engine configuration
+RECOMMENDATION_NEIGHBOURS = int(os.getenv("RECOMMENDATION_NEIGHBOURS", 20))
+RECOMMENDATION_MIN_CO_VIEWS = int(os.getenv("RECOMMENDATION_MIN_CO_VIEWS", 1))
+RECOMMENDATION_MAX_USER_HISTORY = int(os.getenv("RECOMMENDATION_MAX_USER_HISTORY", 500))
+RECOMMENDATION_HISTORY_WINDOW = int(os.getenv("RECOMMENDATION_HISTORY_WINDOW", 50))
+RECOMMENDATION_REFRESH_INTERVAL = float(os.getenv("RECOMMENDATION_REFRESH_INTERVAL", 0))
+
+# Write-behind book view tracking configuration
+VIEW_QUEUE_SIZE = int(os.getenv("VIEW_QUEUE_SIZE", 10000))
+VIEW_FLUSH_BATCH_SIZE = int(os.getenv("VIEW_FLUSH_BATCH_SIZE", 500))
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", 1.0))
+
+# Trending view counters configuration
+TRENDING_CHECKPOINT_INTERVAL = float(os.getenv("TRENDING_CHECKPOINT_INTERVAL", 60))
+TRENDING_MIN_SCORE = float(os.getenv("TRENDING_MIN_SCORE", 0.01))
+
+# Autocomplete index configuration
+AUTOCOMPLETE_REFRESH_INTERVAL = float(os.getenv("AUTOCOMPLETE_REFRESH_INTERVAL", 600))
+AUTOCOMPLETE_MERGE_THRESHOLD = int(os.getenv("AUTOCOMPLETE_MERGE_THRESHOLD", 10000))
+
+# Batch CRUD configuration
+BOOK_BATCH_MAX_ITEMS = int(os.getenv("BOOK_BATCH_MAX_ITEMS", 1000))
+
+# Book lookup coalescing configuration
+BOOK_LOADER_WINDOW = float(os.getenv("BOOK_LOADER_WINDOW", 0.002))
+BOOK_LOADER_MAX_BATCH = int(os.getenv("BOOK_LOADER_MAX_BATCH", 500))
+
+# Access token verification cache and revocation configuration
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TOKEN_DENYLIST_CAPACITY = int(os.getenv("TOKEN_DENYLIST_CAPACITY", 100000))
+TOKEN_DENYLIST_ERROR_RATE = float(os.getenv("TOKEN_DENYLIST_ERROR_RATE", 0.001))
+TOKEN_DENYLIST_REFRESH_INTERVAL = float(os.getenv("TOKEN_DENYLIST_REFRESH_INTERVAL", 30))
+
+# Rate limiting configuration. The storage is shared by the workers unless it
+# is "memory://"; limits are "N/period" strings, RATE_LIMITS a JSON object of
+# per-route overrides such as {"books.search": "30/minute"}
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+RATE_LIMIT_KEY_PREFIX = os.getenv("RATE_LIMIT_KEY_PREFIX", "bms:ratelimit")
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "5/minute")
+RATE_LIMITS = os.getenv("RATE_LIMITS", "{}")
+
+# Adaptive concurrency limits per route group (books, recommendations, auth)
+CONCURRENCY_LIMIT_INITIAL = int(os.getenv("CONCURRENCY_LIMIT_INITIAL", 20))
+CONCURRENCY_LIMIT_MIN = int(os.getenv("CONCURRENCY_LIMIT_MIN", 2))
+CONCURRENCY_LIMIT_MAX = int(os.getenv("CONCURRENCY_LIMIT_MAX", 200))
+CONCURRENCY_LATENCY_TOLERANCE = float(os.getenv("CONCURRENCY_LATENCY_TOLERANCE", 2.0))
+CONCURRENCY_BACKOFF = float(os.getenv("CONCURRENCY_BACKOFF", 0.9))
+CONCURRENCY_QUEUE_SIZE = int(os.getenv("CONCURRENCY_QUEUE_SIZE", 20))
+CONCURRENCY_QUEUE_TIMEOUT = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT", 0.5))
+CONCURRENCY_PER_CLIENT = int(os.getenv("CONCURRENCY_PER_CLIENT", 8))
+CONCURRENCY_RETRY_AFTER = int(os.getenv("CONCURRENCY_RETRY_AFTER", 1))
+
+# Slow query log (opt-in) and its sampled EXPLAIN (ANALYZE, BUFFERS) capture
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", 300))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", 10000))
+SLOW_QUERY_MAX_STATEMENTS = int(os.getenv("SLOW_QUERY_MAX_STATEMENTS", 500))
+
+# Comma-separated usernames allowed to use the /admin endpoints
+ADMIN_USERNAMES = {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
@@ -1,17 +1,76 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from src.routes.auth_routes import router as auth_router
 from src.routes.book_routes import router as book_router
 from src.routes.recommendations_routes import router as recommendation_routes
+from src.routes.metrics_routes import router as metrics_router
+from src.routes.admin_routes import router as admin_router
 from src.db.init_db import init_db
+from src.db.connections import close_pool
+from src.db.async_connections import close_async_pool
+from src.db.cache import init_cache_backend, close_cache_backend
+from src.db.recommendation_engine import run_periodic_refresh
+from src.db.view_tracker import view_tracker
+from src.db.trending import trending
+from src.db.autocomplete import autocomplete
+from src.db.token_denylist import token_denylist
 from src.utils.rate_limit import limiter
+from src.utils.concurrency_limit import ConcurrencyLimitMiddleware, concurrency_limiter
+from src.utils.metrics import MetricsMiddleware
+from src.utils.password_pool import password_pool, PasswordPoolSaturated
+from src.dependencies import PASSWORD_HASH_RETRY_AFTER, RECOMMENDATION_REFRESH_INTERVAL, CONCURRENCY_RETRY_AFTER, logger
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup and shutdown hooks.
+    """
+    # Share cached lookups and invalidations with the other workers
+    init_cache_backend()
+    await view_tracker.start()
+    await trending.start()
+    # Build the type-ahead index before serving requests
+    await autocomplete.start()
+    # Load the revoked tokens before accepting authenticated requests
+    await token_denylist.start()
+    # Keep the co-view neighbours fresh when no external scheduler rebuilds them
+    refresh_task = None
+    if RECOMMENDATION_REFRESH_INTERVAL > 0:
+        refresh_task = asyncio.create_task(run_periodic_refresh(RECOMMENDATION_REFRESH_INTERVAL))
+    yield
+    if refresh_task is not None:
+        refresh_task.cancel()
+    await autocomplete.stop()
+    await token_denylist.stop()
+    # Write buffered book views and trending scores before the connection pools go away
+    await view_tracker.stop()
+    await trending.stop()
+    # Release pooled connections and worker threads on shutdown
+    await close_async_pool()
+    close_pool()
+    password_pool.shutdown()
+    close_cache_backend()
+
+async def password_pool_saturated_handler(request: Request, exc: PasswordPoolSaturated):
+    """
+    Shed authentication load when the password worker pool is full.
+    """
+    logger.warning(f"Rejected {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service is busy, please retry shortly"},
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+    )
 
 def create_app() -> FastAPI:
     """
     Create and configure the FastAPI application instance.
     """
-    app = FastAPI(title="Book Management API", version="1.0")
+    app = FastAPI(title="Book Management API", version="1.0", lifespan=lifespan)
 
     # Limiter setup
     app.state.limiter = limiter
@@ -19,6 +78,15 @@ def create_app() -> FastAPI:
     # Exception handler for rate limits
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+    # Exception handler for password hashing backpressure
+    app.add_exception_handler(PasswordPoolSaturated, password_pool_saturated_handler)
+
+    # Shed load beyond the adaptive concurrency limit of each route group
+    app.add_middleware(ConcurrencyLimitMiddleware, limiter=concurrency_limiter, retry_after=CONCURRENCY_RETRY_AFTER)
+
+    # Request latency histograms; added last so shed requests are observed too
+    app.add_middleware(MetricsMiddleware)
+
     # Initialize the database if not already initialized
     init_db()
 
@@ -26,6 +94,9 @@ def create_app() -> FastAPI:
     app.include_router(auth_router, prefix="/api/v1")
     app.include_router(book_router, prefix="/api/v1")
     app.include_router(recommendation_routes, prefix="/api/v1")
+    app.include_router(admin_router, prefix="/api/v1")
+    # Prometheus scrape endpoint, outside the versioned API
+    app.include_router(metrics_router)
 
     return app
 
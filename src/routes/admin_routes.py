@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Request, status, HTTPException, Query
+from src.dependencies import ADMIN_USERNAMES, SLOW_QUERY_LOG_ENABLED, logger
+from src.utils.auth_utils import user_dependency
+from src.utils.rate_limit import limiter, route_limit
+from src.db.slow_query_log import slow_query_log
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+@router.get("/slow_queries")
+@limiter.limit(route_limit("admin.slow_queries"))
+async def slow_queries_endpoint(
+    user: user_dependency,
+    request: Request,
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = Query("total_ms", description="total_ms, max_ms, mean_ms or calls"),
+):
+    if user.get("username") not in ADMIN_USERNAMES:
+        logger.warning(f"User {user.get('id')} attempted to read the slow query log without admin rights")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin rights required")
+
+    try:
+        statements = slow_query_log.top(limit, order_by)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    logger.info(f"Admin {user.get('username')} read {len(statements)} slow statements")
+    return {
+        "enabled": SLOW_QUERY_LOG_ENABLED,
+        "threshold_ms": slow_query_log.threshold_ms,
+        "statements": statements,
+    }
@@ -1,41 +1,108 @@
 # src/routes/book_routes.py
-import json
-import csv
-from io import StringIO
-from typing import List
-from datetime import datetime
+import weakref
+from typing import List, Optional
 
-from fastapi import APIRouter, status, HTTPException, UploadFile, File, Request
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, status, HTTPException, UploadFile, File, Request, Response, Query
+from fastapi.responses import StreamingResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from src.utils.auth_utils import user_dependency
-from src.utils.rate_limit import limiter
-from src.schemas.book_schemas import BookCreate, BookRead, BookUpdate, GENRES
-from src.db.book_queries import get_book_by_title, create_book, get_book, get_books, update_book, delete_book
-from src.db.author_queries import get_author_by_name, create_author
-from src.db.recommendations_queries import add_book_view
-from src.dependencies import logger
+from src.utils.rate_limit import limiter, route_limit
+from src.utils.concurrency_limit import export_slots
+from src.utils.import_parsers import iter_upload_rows, iter_batches
+from src.utils.export_writers import EXPORT_FORMATS
+from src.utils.pagination import SORT_COLUMNS, SEARCH_SORT_KEY, encode_cursor, decode_cursor
+from src.schemas.book_schemas import BookCreate, BookRead, BookUpdate, TrendingBook, AutocompleteResult, BookBatchCreate, BookBatchUpdate, BookBatchDelete, BookBatchResult, GENRES
+from src.db.async_book_queries import get_book, get_books, get_books_by_ids, search_books, create_book_with_author, update_book_with_author, delete_book, update_books, delete_books, bulk_import_books, iter_books, get_page_end
+from src.db.view_tracker import view_tracker
+from src.db.trending import trending
+from src.db.autocomplete import autocomplete
+from src.dependencies import logger, IMPORT_BATCH_SIZE, BOOK_BATCH_MAX_ITEMS, EXPORT_DEFAULT_LIMIT, EXPORT_MAX_LIMIT, CONCURRENCY_RETRY_AFTER
 
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
 @router.get("/get_all_books", response_model=List[BookRead])
-@limiter.limit("5/minute")
-async def get_books_endpoint(request: Request, skip: int = 0, limit: int = 10, sort_by: str = "title"):
+@limiter.limit(route_limit("books.get_all_books"))
+async def get_books_endpoint(request: Request, response: Response, skip: int = 0, limit: int = 10, sort_by: str = "title", cursor: Optional[str] = None):
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "title"
     try:
-        books = get_books(skip, limit, sort_by)
-        logger.info(f"Retrieved {len(books)} books with skip={skip}, limit={limit}, sort_by={sort_by}")
+        after = decode_cursor(cursor, sort_by) if cursor else None
+        books = await get_books(skip, limit, sort_by, after=after)
+        if books and len(books) == limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(sort_by, books[-1])
+        logger.info(f"Retrieved {len(books)} books with skip={skip}, limit={limit}, sort_by={sort_by}, cursor={cursor}")
         return books
     except ValueError as e:
         logger.error(f"Error retrieving books: {str(e)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+@router.get("/search", response_model=List[BookRead])
+@limiter.limit(route_limit("books.search"))
+async def search_books_endpoint(
+    request: Request,
+    response: Response,
+    q: str,
+    genre: Optional[str] = None,
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
+    try:
+        if genre is not None and genre not in GENRES:
+            raise ValueError(f"Genre must be one of: {', '.join(sorted(GENRES))}.")
+        if year_from is not None and year_to is not None and year_from > year_to:
+            raise ValueError("year_from must not be greater than year_to.")
+        after = decode_cursor(cursor, SEARCH_SORT_KEY) if cursor else None
+        books = await search_books(q, genre, year_from, year_to, limit, after=after)
+        if books and len(books) == limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(SEARCH_SORT_KEY, books[-1])
+        logger.info(f"Search for {q!r} returned {len(books)} books (genre={genre}, year_from={year_from}, year_to={year_to}, cursor={cursor})")
+        return books
+    except ValueError as e:
+        logger.error(f"Error searching books: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/autocomplete", response_model=AutocompleteResult)
+@limiter.limit(route_limit("books.autocomplete", "60/minute"))
+async def autocomplete_endpoint(request: Request, q: str = Query(..., min_length=1, max_length=250), limit: int = Query(10, ge=1, le=50)):
+    # Served from memory; type-ahead clients call this on every keystroke
+    return autocomplete.search(q, limit)
+
+@router.get("/trending", response_model=List[TrendingBook])
+@limiter.limit(route_limit("books.trending"))
+async def get_trending_books_endpoint(request: Request, window: str = "24h", limit: int = Query(10, ge=1, le=100)):
+    try:
+        top = trending.top(window, limit)
+        books = {book["id"]: book for book in await get_books_by_ids([book_id for book_id, _ in top])}
+        logger.info(f"Retrieved {len(books)} trending books for window={window}, limit={limit}")
+        return [{**books[book_id], "score": score} for book_id, score in top if book_id in books]
+    except ValueError as e:
+        logger.error(f"Error retrieving trending books: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/get_many", response_model=List[BookRead])
+@limiter.limit(route_limit("books.get_many"))
+async def get_many_books_endpoint(request: Request, ids: str):
+    try:
+        book_ids = [int(book_id) for book_id in ids.split(",") if book_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be a comma-separated list of integers")
+    if not book_ids or len(book_ids) > BOOK_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"ids must contain between 1 and {BOOK_BATCH_MAX_ITEMS} IDs")
+
+    books = await get_books_by_ids(book_ids)
+    logger.info(f"Retrieved {len(books)} of {len(book_ids)} requested books")
+    return books
+
 @router.get("/get_book/{book_id}", response_model=BookRead)
-@limiter.limit("5/minute")
+@limiter.limit(route_limit("books.get_book"))
 async def get_book_endpoint(book_id: int, user: user_dependency, request: Request):
     try:
-        book = get_book(book_id)
-        add_book_view(user.get("id"), book_id)
+        book = await get_book(book_id)
+        view_tracker.record(user.get("id"), book_id)
         logger.info(f"User {user.get('id')} viewed book {book_id}")
         return book
     except ValueError as e:
@@ -43,136 +110,200 @@ async def get_book_endpoint(book_id: int, user: user_dependency, request: Reques
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 @router.post("/create_book", status_code=status.HTTP_201_CREATED, response_model=BookRead)
-@limiter.limit("5/minute")
+@limiter.limit(route_limit("books.create_book"))
 async def create_book_endpoint(book: BookCreate, user: user_dependency, request: Request):
     if not user:
         logger.warning("Attempt to create book without authentication.")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
 
     try:
-        existing = get_book_by_title(book.title)
-        if existing:
+        created = await create_book_with_author(book.title, book.published_year, book.genre, book.author)
+        if created is None:
             logger.warning(f"Book with title {book.title} already exists.")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Book with this title already exists")
 
-        author = get_author_by_name(book.author)
-        author_id = author["id"] if author else create_author(book.author)
-
-        book_id = create_book(book.title, book.published_year, book.genre, author_id)
-
-        logger.info(f"Created new book: {book.title} (ID: {book_id})")
-        return {**book.dict(), "id": book_id}
+        logger.info(f"Created new book: {book.title} (ID: {created['id']})")
+        return created
     except ValueError as e:
         logger.error(f"Error creating book: {str(e)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.put("/update_book/{book_id}", response_model=BookRead)
-@limiter.limit("5/minute")
+@limiter.limit(route_limit("books.update_book"))
 async def update_book_endpoint(book_id: int, book: BookUpdate, user: user_dependency, request: Request):
     if not user:
         logger.warning("Attempt to update book without authentication.")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
 
     try:
-        existing_book = get_book(book_id)
-        if not existing_book:
+        # Fields left out keep their current values; BookUpdate has validated the rest
+        updated = await update_book_with_author(book_id, book.title, book.published_year, book.genre, book.author)
+        if updated is None:
             logger.warning(f"Book with ID {book_id} not found.")
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
-        updated_title = book.title or existing_book["title"]
-        updated_year = book.published_year or existing_book["published_year"]
-        updated_genre = book.genre or existing_book["genre"]
-        updated_author_name = book.author or existing_book["author"]
-
-        if updated_title != existing_book["title"]:
-            same_title = get_book_by_title(updated_title)
-            if same_title:
-                logger.warning(f"Book with title {updated_title} already exists.")
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Book with this title already exists")
-
-        current_year = datetime.now().year
-        if not updated_title.strip():
-            raise ValueError("Title must not be empty")
-        if not updated_author_name.strip():
-            raise ValueError("Author must not be empty")
-        if updated_year < 1800 or updated_year > current_year:
-            raise ValueError(f"Year must be between 1800 and {current_year}")
-        if updated_genre not in GENRES:
-            raise ValueError(f"Genre must be one of {GENRES}")
-
-        author = get_author_by_name(updated_author_name)
-        author_id = author["id"] if author else create_author(updated_author_name)
-
-        update_book(book_id, updated_title, updated_year, updated_genre, author_id)
-
         logger.info(f"Book {book_id} updated successfully.")
-        return {
-            "id": book_id,
-            "title": updated_title,
-            "published_year": updated_year,
-            "genre": updated_genre,
-            "author": updated_author_name
-        }
+        return updated
 
     except ValueError as e:
         logger.error(f"Error updating book {book_id}: {str(e)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.delete("/delete_book/{book_id}", status_code=status.HTTP_204_NO_CONTENT)
-@limiter.limit("5/minute")
+@limiter.limit(route_limit("books.delete_book"))
 async def delete_book_endpoint(book_id: int, user: user_dependency, request: Request):
     if not user:
         logger.warning("Attempt to delete book without authentication.")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
 
     try:
-        delete_book(book_id)
+        await delete_book(book_id)
         logger.info(f"Book {book_id} deleted successfully.")
         return {"message": "Book deleted"}
     except ValueError as e:
         logger.error(f"Error deleting book {book_id}: {str(e)}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+@router.post("/batch", response_model=BookBatchResult)
+@limiter.limit(route_limit("books.batch_create"))
+async def create_books_batch_endpoint(batch: BookBatchCreate, user: user_dependency, request: Request):
+    if not user:
+        logger.warning("Attempt to create books without authentication.")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+
+    books = [book.model_dump() for book in batch.books]
+    try:
+        inserted = await bulk_import_books(books)
+    except Exception as e:
+        logger.error(f"Error creating a batch of books: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to create books: {str(e)}")
+
+    results = []
+    for index, book in enumerate(books):
+        book_id = inserted.pop(book["title"], None)
+        if book_id is None:
+            results.append({"index": index, "status": "conflict", "detail": "Book with this title already exists"})
+        else:
+            results.append({"index": index, "id": book_id, "status": "created", "book": {**book, "id": book_id}})
+    logger.info(f"User {user.get('id')} created {sum(r['status'] == 'created' for r in results)} of {len(books)} books in a batch.")
+    return {"results": results}
+
+@router.put("/batch", response_model=BookBatchResult)
+@limiter.limit(route_limit("books.batch_update"))
+async def update_books_batch_endpoint(batch: BookBatchUpdate, user: user_dependency, request: Request):
+    if not user:
+        logger.warning("Attempt to update books without authentication.")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+
+    try:
+        outcomes = await update_books([book.model_dump() for book in batch.books])
+    except Exception as e:
+        logger.error(f"Error updating a batch of books: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to update books: {str(e)}")
+
+    results = []
+    for index, (book, (outcome, value)) in enumerate(zip(batch.books, outcomes)):
+        if outcome == "updated":
+            results.append({"index": index, "id": book.id, "status": outcome, "book": value})
+        elif outcome == "not_found":
+            results.append({"index": index, "id": book.id, "status": outcome, "detail": "Book not found"})
+        else:
+            results.append({"index": index, "id": book.id, "status": outcome, "detail": value})
+    logger.info(f"User {user.get('id')} updated {sum(r['status'] == 'updated' for r in results)} of {len(results)} books in a batch.")
+    return {"results": results}
+
+@router.delete("/batch", response_model=BookBatchResult)
+@limiter.limit(route_limit("books.batch_delete"))
+async def delete_books_batch_endpoint(batch: BookBatchDelete, user: user_dependency, request: Request):
+    if not user:
+        logger.warning("Attempt to delete books without authentication.")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+
+    try:
+        deleted = await delete_books(list(dict.fromkeys(batch.ids)))
+    except Exception as e:
+        logger.error(f"Error deleting a batch of books: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to delete books: {str(e)}")
+
+    results = []
+    for index, book_id in enumerate(batch.ids):
+        if book_id in deleted:
+            deleted.discard(book_id)
+            results.append({"index": index, "id": book_id, "status": "deleted"})
+        else:
+            results.append({"index": index, "id": book_id, "status": "not_found", "detail": "Book not found"})
+    logger.info(f"User {user.get('id')} deleted {sum(r['status'] == 'deleted' for r in results)} of {len(results)} books in a batch.")
+    return {"results": results}
+
+def _import_text(book: dict, field: str):
+    """A stripped text field of an imported row, or None if it is missing or not text."""
+    value = book.get(field)
+    return value.strip() if isinstance(value, str) else None
+
+def parse_import_row(book: dict):
+    """Normalize an imported row, or return None if it can not be stored."""
+    title = _import_text(book, "title")
+    genre = _import_text(book, "genre")
+    author_name = _import_text(book, "author")
+    try:
+        year = int(book.get("published_year"))
+    except (TypeError, ValueError):
+        return None
+
+    if not title or len(title) > 255 or not author_name or len(author_name) > 255 or genre not in GENRES:
+        return None
+    return {"title": title, "published_year": year, "genre": genre, "author": author_name}
+
 @router.post("/import", status_code=status.HTTP_201_CREATED)
-@limiter.limit("5/minute")
+@limiter.limit(route_limit("books.import"))
 async def import_books(user: user_dependency, request: Request, file: UploadFile = File(...)):
     if not user:
         logger.warning("Attempt to import books without authentication.")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
 
-    content = await file.read()
     try:
-        if file.filename.endswith(".json"):
-            books_data = json.loads(content.decode("utf-8"))
-        elif file.filename.endswith(".csv"):
-            csv_content = content.decode("utf-8")
-            reader = csv.DictReader(StringIO(csv_content))
-            books_data = list(reader)
-        else:
-            logger.error("Unsupported file type uploaded.")
-            raise HTTPException(status_code=400, detail="Only JSON and CSV files are supported")
+        rows = iter_upload_rows(file.filename, file.file)
+    except ValueError as e:
+        logger.error("Unsupported file type uploaded.")
+        raise HTTPException(status_code=400, detail=str(e))
 
+    try:
         imported = []
         skipped = []
+        row_number = 0
+        parse_error = None
 
-        for book in books_data:
-            title = book["title"].strip()
-            year = int(book["published_year"])
-            genre = book["genre"].strip()
-            author_name = book["author"].strip()
-
-            if get_book_by_title(title):
-                skipped.append(title)
-                continue
-
-            author = get_author_by_name(author_name)
-            author_id = author["id"] if author else create_author(author_name)
-
+        batches = iter_batches(rows, IMPORT_BATCH_SIZE)
+        while True:
+            # Parsing reads the spooled upload from disk, so keep it off the event loop
             try:
-                book_id = create_book(title, year, genre, author_id)
-                imported.append(title)
-            except ValueError:
-                skipped.append(title)
+                batch = await run_in_threadpool(next, batches, None)
+            except ValueError as e:
+                parse_error = e
+                break
+            if batch is None:
+                break
+
+            parsed = [parse_import_row(book) for book in batch]
+            inserted = set(await bulk_import_books([row for row in parsed if row is not None]))
+
+            for book, row in zip(batch, parsed):
+                row_number += 1
+                if row is not None and row["title"] in inserted:
+                    inserted.discard(row["title"])
+                    imported.append(row["title"])
+                else:
+                    # Rows without a usable title are reported by their position in the file
+                    skipped.append(_import_text(book, "title") or f"row {row_number}")
+
+        if parse_error is not None:
+            # Earlier batches are already committed, so report what was stored
+            logger.warning(f"Import stopped after {row_number} rows: {parse_error}")
+            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={
+                "detail": f"Import stopped after row {row_number}: {parse_error}",
+                "imported": imported,
+                "skipped": skipped,
+            })
 
         logger.info(f"Import summary: Imported {len(imported)} books, skipped {len(skipped)}.")
         return {
@@ -187,31 +318,63 @@ async def import_books(user: user_dependency, request: Request, file: UploadFile
 
 
 
-@router.get("/export", status_code=status.HTTP_200_OK)
-async def export_books(format: str = "json", skip: int = 0, limit: int = 10, sort_by: str = "title"):
-    books = get_books(skip=skip, limit=limit, sort_by=sort_by)
-
-    if format == "json":
-        json_output = json.dumps({"books": books}, ensure_ascii=False)
-        response = StreamingResponse(StringIO(json_output), media_type="application/json")
-        response.headers["Content-Disposition"] = "attachment; filename=books.json"
-        return response
-
-    elif format == "csv":
-        csv_output = StringIO()
-        fieldnames = ["id", "title", "published_year", "genre", "author", "author_id"]
-        writer = csv.DictWriter(csv_output, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for book in books:
-            book_data = {key: book[key] for key in fieldnames if key in book}
-            writer.writerow(book_data)
-
-        csv_output.seek(0)
-        response = StreamingResponse(csv_output, media_type="text/csv")
-        response.headers["Content-Disposition"] = "attachment; filename=books.csv"
-        return response
+async def _release_when_done(books, release):
+    try:
+        async for book in books:
+            yield book
+    finally:
+        # Close the cursor now rather than when the generator is collected
+        await books.aclose()
+        release()
 
+@router.get("/export", status_code=status.HTTP_200_OK)
+@limiter.limit(route_limit("books.export"))
+async def export_books(
+    user: user_dependency,
+    request: Request,
+    format: str = "json",
+    skip: int = Query(0, ge=0),
+    limit: int = Query(EXPORT_DEFAULT_LIMIT, ge=1, le=EXPORT_MAX_LIMIT),
+    sort_by: str = "title",
+    cursor: Optional[str] = None,
+):
+    if not user:
+        logger.warning("Attempt to export books without authentication.")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid format. Use 'json', 'csv' or 'ndjson'.")
+    if sort_by not in SORT_COLUMNS:
+        sort_by = "title"
+    try:
+        after = decode_cursor(cursor, sort_by) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Headers go out before the rows, so a full page is located up front. It
+    # is then streamed up to its last key rather than by row count, so rows
+    # inserted meanwhile can not push a row past the next cursor unseen.
+    page_end = await get_page_end(skip, limit, sort_by, after)
+
+    release = export_slots.acquire()
+    if release is None:
+        logger.warning(f"Rejected export for user {user.get('id')}: {export_slots.slots} exports in progress")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many exports in progress, please retry shortly",
+            headers={"Retry-After": str(CONCURRENCY_RETRY_AFTER)},
+        )
+
+    encode, media_type, filename = EXPORT_FORMATS[format]
+    if page_end is None:
+        rows = iter_books(skip=skip, limit=limit, sort_by=sort_by, after=after)
     else:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid format. Use 'json' or 'csv'.")
-
+        rows = iter_books(skip=skip, sort_by=sort_by, after=after, until=page_end)
+    books = _release_when_done(rows, release)
+    # The slot is also freed if the response is dropped before streaming starts
+    weakref.finalize(books, release)
+    logger.info(f"User {user.get('id')} streaming books export as {format} with skip={skip}, limit={limit}, sort_by={sort_by}")
+
+    response = StreamingResponse(encode(books), media_type=media_type)
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    if page_end is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(sort_by, {sort_by: page_end[0], "id": page_end[1]})
+    return response
@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Response
+from prometheus_client import REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from src.db.async_connections import acquire_stats
+from src.db.connections import pool_stats
+from src.db.cache import cache_stats
+from src.db.view_tracker import view_tracker
+from src.db.trending import trending
+from src.db.autocomplete import autocomplete
+from src.db.token_denylist import token_denylist
+from src.db.async_book_queries import book_loader
+from src.utils.password_pool import password_pool
+from src.utils.concurrency_limit import concurrency_limiter, export_slots
+from src.dependencies import logger
+
+
+router = APIRouter(tags=["Metrics"])
+
+# Nested stats keyed by name, exported with that name as a label
+NESTED_LABELS = {"operations": "operation", "groups": "group"}
+
+
+class StatsCollector:
+    """
+    Exports the ``stats()`` of the pools, caches and background workers as
+    gauges, read at scrape time. Counters keep their stats names, e.g.
+    ``view_tracker_dropped`` or ``cache_hit_ratio{cache="book"}``.
+    """
+
+    def __init__(self, sources):
+        self.sources = sources
+
+    def collect(self):
+        families = {}
+        for prefix, stats, label in self.sources:
+            try:
+                values = stats()
+            except Exception as e:
+                logger.error(f"Error reading {prefix} stats: {e}")
+                continue
+            if label is None:
+                self._add(families, prefix, values, (), ())
+            else:
+                for name, nested in values.items():
+                    self._add(families, prefix, nested, (label,), (str(name),))
+        return families.values()
+
+    def describe(self):
+        # Families depend on the stats present at scrape time
+        return []
+
+    def _add(self, families, prefix, values, label_names, label_values):
+        for key, value in values.items():
+            if isinstance(value, dict) and key in NESTED_LABELS:
+                for name, nested in value.items():
+                    self._add(families, prefix, nested, label_names + (NESTED_LABELS[key],), label_values + (str(name),))
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                name = f"{prefix}_{key}"
+                family = families.get(name)
+                if family is None:
+                    family = families[name] = GaugeMetricFamily(name, f"{key} from {prefix} stats()", labels=label_names)
+                family.add_metric(label_values, value)
+
+
+stats_collector = StatsCollector([
+    ("db_async_pool", acquire_stats, None),
+    ("db_pool", pool_stats, None),
+    ("cache", cache_stats, "cache"),
+    ("view_tracker", view_tracker.stats, None),
+    ("trending", trending.stats, None),
+    ("autocomplete", autocomplete.stats, None),
+    ("book_loader", book_loader.stats, None),
+    ("token_denylist", token_denylist.stats, None),
+    ("password_pool", password_pool.stats, None),
+    ("concurrency", concurrency_limiter.stats, None),
+    ("export", export_slots.stats, None),
+])
+REGISTRY.register(stats_collector)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
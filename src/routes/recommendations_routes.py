@@ -2,9 +2,9 @@ from typing import List
 from fastapi import APIRouter, Request, status, HTTPException, Query
 from src.dependencies import logger
 from src.utils.auth_utils import user_dependency
-from src.utils.rate_limit import limiter
+from src.utils.rate_limit import limiter, route_limit
 from src.schemas.book_schemas import BookRead
-from src.db.recommendations_queries import (
+from src.db.async_recommendations_queries import (
     recommend_books_by_genre,
     recommend_books_by_author,
     recommend_books_based_on_history,
@@ -18,7 +18,7 @@ def format_author_field(book: dict) -> dict:
     return book
 
 @router.get("/recommendations/genre", response_model=List[BookRead])
-@limiter.limit("5/minute")
+@limiter.limit(route_limit("recommendations.genre"))
 async def recommend_books_by_genre_endpoint(
     user: user_dependency, genre: str, request: Request
 ):
@@ -30,7 +30,7 @@ async def recommend_books_by_genre_endpoint(
 
     logger.info(f"User {user.get('id')} requested genre-based book recommendations for genre: {genre}")
     try:
-        recommended_books = recommend_books_by_genre(user.get("id"), genre)
+        recommended_books = await recommend_books_by_genre(user.get("id"), genre)
         formatted_books = [format_author_field(book) for book in recommended_books]
         logger.info(f"Successfully retrieved {len(formatted_books)} books based on genre '{genre}'")
         return formatted_books
@@ -42,7 +42,7 @@ async def recommend_books_by_genre_endpoint(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/recommendations/author", response_model=List[BookRead])
-@limiter.limit("5/minute")
+@limiter.limit(route_limit("recommendations.author"))
 async def recommend_books_by_author_endpoint(
     user: user_dependency = None,
     request: Request = None,
@@ -56,7 +56,7 @@ async def recommend_books_by_author_endpoint(
 
     logger.info(f"User {user.get('id')} requested author-based book recommendations for author: {author_name}")
     try:
-        recommended_books = recommend_books_by_author(user.get("id"), author_name)
+        recommended_books = await recommend_books_by_author(user.get("id"), author_name)
         formatted_books = [format_author_field(book) for book in recommended_books]
         logger.info(f"Successfully retrieved {len(formatted_books)} books based on author '{author_name}'")
         return formatted_books
@@ -65,7 +65,7 @@ async def recommend_books_by_author_endpoint(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.get("/recommendations/history", response_model=List[BookRead])
-@limiter.limit("5/minute")
+@limiter.limit(route_limit("recommendations.history"))
 async def recommend_books_history_endpoint(
     user: user_dependency, request: Request
 ):
@@ -77,7 +77,7 @@ async def recommend_books_history_endpoint(
 
     logger.info(f"User {user.get('id')} requested book recommendations based on their history")
     try:
-        recommended_books = recommend_books_based_on_history(user.get("id"))
+        recommended_books = await recommend_books_based_on_history(user.get("id"))
         formatted_books = [format_author_field(book) for book in recommended_books]
         logger.info(f"Successfully retrieved {len(formatted_books)} books based on user's history")
         return formatted_books
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+from src.dependencies import BOOK_BATCH_MAX_ITEMS
 
 GENRES = {
     'Fiction', 'Non-Fiction', 'Science', 'History',
@@ -68,3 +69,40 @@ class BookWithAuthor(BaseModel):
     published_year: int = Field(..., description="The year the book was published.")
     genre: str = Field(..., description="The genre of the book.")
     author: str = Field(..., description="The name of the author.")
+
+class TrendingBook(BookRead):
+    score: float = Field(..., description="The decayed number of recent views in the requested window.")
+
+class AutocompleteBook(BaseModel):
+    id: int = Field(..., description="The unique identifier for the book.")
+    title: str = Field(..., description="The title of the book.")
+
+class AutocompleteAuthor(BaseModel):
+    id: int = Field(..., description="The unique identifier for the author.")
+    name: str = Field(..., description="The name of the author.")
+
+class AutocompleteResult(BaseModel):
+    books: List[AutocompleteBook] = Field(..., description="Books whose title starts with the query.")
+    authors: List[AutocompleteAuthor] = Field(..., description="Authors whose name starts with the query.")
+
+class BookBatchUpdateItem(BookUpdate):
+    id: int = Field(..., description="The unique identifier of the book to update.")
+
+class BookBatchCreate(BaseModel):
+    books: List[BookCreate] = Field(..., min_length=1, max_length=BOOK_BATCH_MAX_ITEMS, description="The books to create.")
+
+class BookBatchUpdate(BaseModel):
+    books: List[BookBatchUpdateItem] = Field(..., min_length=1, max_length=BOOK_BATCH_MAX_ITEMS, description="The books to update.")
+
+class BookBatchDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BOOK_BATCH_MAX_ITEMS, description="The IDs of the books to delete.")
+
+class BookBatchItemResult(BaseModel):
+    index: int = Field(..., description="The position of the item in the request.")
+    id: Optional[int] = Field(None, description="The unique identifier of the book, when known.")
+    status: str = Field(..., description="created, updated, deleted, conflict or not_found.")
+    detail: Optional[str] = Field(None, description="Why the item was not applied.")
+    book: Optional[BookRead] = Field(None, description="The stored book, for created and updated items.")
+
+class BookBatchResult(BaseModel):
+    results: List[BookBatchItemResult] = Field(..., description="One result per request item, in request order.")
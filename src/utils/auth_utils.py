@@ -1,10 +1,16 @@
 # src/utils/auth_utils.py
+import time
+import uuid
+import hashlib
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from src.dependencies import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from src.dependencies import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, TOKEN_CACHE_SIZE
 from fastapi import HTTPException, status,Depends
-from src.db.user_queries import get_user_by_username
+from src.db.async_user_queries import get_user_by_username
+from src.utils.password_pool import password_pool
+from src.utils.ttl_cache import TTLCache
+from src.db.token_denylist import token_denylist
 from fastapi.security import OAuth2PasswordBearer
 from typing import Annotated 
 
@@ -13,22 +19,32 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 oauth2_bearer=OAuth2PasswordBearer(tokenUrl='/api/v1/auth/login')
 
+# Users of recently verified tokens by token digest, each kept until its token expires
+token_cache = TTLCache(TOKEN_CACHE_SIZE, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def hash_password(password):
     return pwd_context.hash(password)
 
-def authenticate_user(username: str, password: str):
-    user = get_user_by_username(username)
-    if not user or not verify_password(password, user['password']):
+async def verify_password_async(plain_password, hashed_password):
+    return await password_pool.run("verify", verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password):
+    return await password_pool.run("hash", hash_password, password)
+
+async def authenticate_user(username: str, password: str):
+    user = await get_user_by_username(username)
+    if not user or not await verify_password_async(password, user['password']):
         return False
     return user
 
 
 
 def create_access_token(username: str, user_id: int, expires_delta: timedelta = None):
-    to_encode = {"sub": username, "id": user_id}
+    # The random jti keeps tokens issued in the same second distinct, so revoking one spares the other
+    to_encode = {"sub": username, "id": user_id, "jti": uuid.uuid4().hex}
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
@@ -40,10 +56,37 @@ def decode_access_token(token: str):
     except JWTError:
         return None
 
-def get_current_user(token:Annotated[str,Depends(oauth2_bearer)]):
+def hash_token(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+async def revoke_access_token(token: str, payload: dict):
+    """Reject ``token`` from now on until it expires."""
+    token_hash = hash_token(token)
+    await token_denylist.revoke(token_hash, payload["exp"])
+    token_cache.delete(token_hash)
+
+def user_from_token(token: str, token_hash: bytes = None):
+    """User of a valid token, from the verification cache when possible. Revocation is not checked."""
+    token_hash = token_hash or hash_token(token)
+    user = token_cache.get(token_hash)
+    if user is not None:
+        return dict(user)
+
     payload = decode_access_token(token)
     if not payload:
+        return None
+    user = {'username': payload.get('sub'), 'id': payload.get('id')}
+    # Tokens without an expiry are verified every time
+    expires_in = payload["exp"] - time.time() if isinstance(payload.get("exp"), (int, float)) else 0
+    if expires_in > 0:
+        token_cache.set(token_hash, dict(user), expires_in)
+    return user
+
+def get_current_user(token:Annotated[str,Depends(oauth2_bearer)]):
+    token_hash = hash_token(token)
+    user = None if token_denylist.is_revoked(token_hash) else user_from_token(token, token_hash)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user")
-    return {'username': payload.get('sub'), 'id': payload.get('id')}
+    return user
 
 user_dependency=Annotated[dict,Depends(get_current_user)]
@@ -0,0 +1,79 @@
+import asyncio
+
+
+class _Batch:
+    def __init__(self, loop):
+        self.loop = loop
+        self.futures = {}
+        self.handle = None
+
+
+class BatchLoader:
+    """
+    DataLoader-style coalescing of concurrent lookups by key.
+
+    ``load(key)`` calls arriving within ``window`` seconds of the first one
+    are collected and resolved with a single ``load_many(keys)`` call, which
+    returns a ``{key: value}`` mapping; keys missing from it resolve to None.
+    Concurrent loads of the same key share one result. A batch is sent early
+    once it holds ``max_batch`` keys.
+    """
+
+    def __init__(self, load_many, window=0.002, max_batch=500):
+        self.load_many = load_many
+        self.window = window
+        self.max_batch = max_batch
+        self._batch = None
+        self._tasks = set()
+        self._loads = 0
+        self._coalesced = 0
+        self._batches = 0
+        self._keys = 0
+
+    async def load(self, key):
+        loop = asyncio.get_running_loop()
+        self._loads += 1
+        batch = self._batch
+        if batch is None or batch.loop is not loop:
+            batch = self._batch = _Batch(loop)
+            batch.handle = loop.call_later(self.window, self._dispatch, batch)
+
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = loop.create_future()
+            if len(batch.futures) >= self.max_batch:
+                batch.handle.cancel()
+                self._dispatch(batch)
+        else:
+            self._coalesced += 1
+        # Callers may be cancelled; the shared future must outlive them
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict:
+        return {
+            "loads": self._loads,
+            "coalesced": self._coalesced,
+            "batches": self._batches,
+            "keys": self._keys,
+        }
+
+    def _dispatch(self, batch):
+        if self._batch is batch:
+            self._batch = None
+        self._batches += 1
+        self._keys += len(batch.futures)
+        task = batch.loop.create_task(self._resolve(batch.futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, futures):
+        try:
+            values = await self.load_many(list(futures))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(values.get(key))
@@ -0,0 +1,55 @@
+import math
+import threading
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over byte string keys.
+
+    Sized for ``capacity`` keys at a false positive rate of ``error_rate``;
+    past that the rate degrades. Keys are expected to be uniformly
+    distributed already (e.g. SHA-256 digests): the probe positions are
+    derived from their first 16 bytes by double hashing instead of hashing
+    them again. Keys cannot be removed, so the owner rebuilds the filter
+    to forget them.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, key: bytes):
+        with self._lock:
+            for position in self._positions(key):
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self._count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self):
+        """Number of keys added, counting duplicates."""
+        return self._count
+
+    def stats(self) -> dict:
+        return {
+            "keys": self._count,
+            "capacity": self.capacity,
+            "memory_bytes": len(self._bits),
+            "num_hashes": self.num_hashes,
+        }
+
+    def _positions(self, key):
+        h1 = int.from_bytes(key[:8], "little")
+        h2 = int.from_bytes(key[8:16], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
@@ -0,0 +1,47 @@
+import numpy as np
+from scipy import sparse
+
+
+def top_k_neighbours(user_ids, book_ids, k=20, min_co_views=1):
+    """
+    Item-to-item co-view similarity from (user_id, book_id) view pairs.
+
+    Builds the sparse user x book view matrix ``X``, counts co-views with
+    ``X.T @ X`` and normalises them to cosine similarity
+    ``co_views(i, j) / sqrt(views(i) * views(j))``. Returns three aligned
+    arrays ``(book_id, neighbour_id, score)`` holding at most ``k``
+    neighbours per book, best first, ties broken by neighbour id.
+    """
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    book_ids = np.asarray(book_ids, dtype=np.int64)
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+    if user_ids.size == 0 or k < 1:
+        return empty
+
+    users, user_index = np.unique(user_ids, return_inverse=True)
+    books, book_index = np.unique(book_ids, return_inverse=True)
+    views = sparse.csr_matrix(
+        (np.ones(user_index.size, dtype=np.float64), (user_index, book_index)),
+        shape=(users.size, books.size),
+    )
+    # Repeated views of the same book by one user count once
+    views.sum_duplicates()
+    views.data[:] = 1.0
+
+    co_views = (views.T @ views).tocoo()
+    keep = (co_views.row != co_views.col) & (co_views.data >= min_co_views)
+    rows, cols, counts = co_views.row[keep], co_views.col[keep], co_views.data[keep]
+    if rows.size == 0:
+        return empty
+
+    norms = np.sqrt(np.asarray(views.sum(axis=0)).ravel())
+    scores = counts / (norms[rows] * norms[cols])
+
+    # Order every book's neighbours by score (desc), then neighbour id, and
+    # keep the first k of each book
+    order = np.lexsort((books[cols], -scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    rank = np.arange(rows.size) - np.repeat(starts, np.diff(np.r_[starts, rows.size]))
+    top = rank < k
+    return books[rows[top]], books[cols[top]], scores[top]
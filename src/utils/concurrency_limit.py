@@ -0,0 +1,291 @@
+import asyncio
+import time
+import threading
+from collections import deque
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from src.utils.rate_limit import rate_limit_key
+from src.dependencies import (
+    CONCURRENCY_LIMIT_INITIAL,
+    CONCURRENCY_LIMIT_MIN,
+    CONCURRENCY_LIMIT_MAX,
+    CONCURRENCY_LATENCY_TOLERANCE,
+    CONCURRENCY_BACKOFF,
+    CONCURRENCY_QUEUE_SIZE,
+    CONCURRENCY_QUEUE_TIMEOUT,
+    CONCURRENCY_PER_CLIENT,
+    EXPORT_MAX_CONCURRENT,
+    logger,
+)
+
+# Route groups limited independently, by path prefix
+ROUTE_GROUPS = {
+    "/api/v1/books": "books",
+    "/api/v1/recommendations": "recommendations",
+    "/api/v1/auth": "auth",
+}
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit of one route group, adapted to response latency (AIMD).
+
+    Every finished request is a latency sample. A sample slower than
+    ``tolerance`` times the baseline (a slow moving average of the samples)
+    means the group is overloaded, and the limit is multiplied by
+    ``backoff``; only requests started after the previous cut can cut it
+    again, so one slow burst counts once. Otherwise, if the group used at
+    least half of its limit, the limit grows by one per ``limit`` samples.
+
+    Requests over the limit wait in a queue of ``queue_size`` for up to
+    ``queue_timeout`` seconds; the rest are rejected.
+    """
+
+    def __init__(self, name, initial=20, min_limit=2, max_limit=200, tolerance=2.0, backoff=0.9, queue_size=20, queue_timeout=0.5):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError(f"Invalid limits: min={min_limit}, initial={initial}, max={max_limit}")
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters = deque()
+        self._baseline = None
+        self._samples = 0
+        self._last_cut = 0.0
+        self._accepted = 0
+        self._queued = 0
+        self._rejected = 0
+        self._decreases = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; False if the request is rejected."""
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self._accepted += 1
+            return True
+        if len(self._waiters) >= self.queue_size or self.queue_timeout <= 0:
+            self._rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued += 1
+        try:
+            # A slot handed over by release() is counted in in_flight already
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            return False
+        except asyncio.CancelledError:
+            # Cancelled right after being handed a slot: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._hand_back()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self._accepted += 1
+        return True
+
+    def release(self, started: float, latency: float):
+        """Return the slot of a request started at ``started`` that took ``latency`` seconds."""
+        self._update(started, latency)
+        self._hand_back()
+
+    def _hand_back(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "accepted": self._accepted,
+            "queued": self._queued,
+            "rejected": self._rejected,
+            "decreases": self._decreases,
+            "baseline_latency": self._baseline,
+        }
+
+    def _update(self, started, latency):
+        self._samples += 1
+        if self._baseline is None:
+            self._baseline = latency
+        overloaded = latency > self._baseline * self.tolerance
+        self._baseline += (latency - self._baseline) * max(0.01, 1 / self._samples)
+
+        if overloaded:
+            if started >= self._last_cut:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_cut = time.monotonic()
+                self._decreases += 1
+        elif self.in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+
+class ConcurrencyLimiter:
+    """
+    Adaptive concurrency limits of the route groups, selected by path
+    prefix, plus a fixed cap of ``per_client`` in-flight requests per user
+    or client address (0 disables it).
+    """
+
+    def __init__(self, groups: dict, per_client=8, **limit_options):
+        self.groups = {name: AdaptiveLimit(name, **limit_options) for name in groups.values()}
+        self._prefixes = sorted(groups.items(), key=lambda item: -len(item[0]))
+        self.per_client = per_client
+        self._clients = {}
+        self._client_rejected = 0
+
+    def group_for(self, path: str):
+        for prefix, name in self._prefixes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return self.groups[name]
+        return None
+
+    def enter_client(self, client: str) -> bool:
+        if self._clients.get(client, 0) >= self.per_client:
+            self._client_rejected += 1
+            return False
+        self._clients[client] = self._clients.get(client, 0) + 1
+        return True
+
+    def leave_client(self, client: str):
+        remaining = self._clients.pop(client) - 1
+        if remaining:
+            self._clients[client] = remaining
+
+    def stats(self) -> dict:
+        return {
+            "groups": {name: limit.stats() for name, limit in self.groups.items()},
+            "clients_in_flight": len(self._clients),
+            "client_rejected": self._client_rejected,
+        }
+
+
+class SlotLimit:
+    """
+    Fixed number of slots for long-running work, such as streamed exports
+    that hold a pooled connection until their last row is sent.
+
+    ``acquire`` never waits: it returns None when every slot is taken, or a
+    callable that frees the slot, once, however many times it is called.
+    """
+
+    def __init__(self, name, slots):
+        self.name = name
+        self.slots = slots
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._rejected = 0
+
+    def acquire(self):
+        with self._lock:
+            if self.in_use >= self.slots:
+                self._rejected += 1
+                return None
+            self.in_use += 1
+            self._acquired += 1
+        released = False
+
+        def release():
+            nonlocal released
+            with self._lock:
+                if not released:
+                    released = True
+                    self.in_use -= 1
+
+        return release
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slots": self.slots,
+                "in_use": self.in_use,
+                "acquired": self._acquired,
+                "rejected": self._rejected,
+            }
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Sheds requests over the concurrency limit of their route group with
+    503 and ``Retry-After``. Latency is measured up to the start of the
+    response, so streamed exports hold their slot without counting as slow.
+    """
+
+    def __init__(self, app, limiter: ConcurrencyLimiter, retry_after: int = 1):
+        self.app = app
+        self.limiter = limiter
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        group = self.limiter.group_for(scope["path"]) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        client = rate_limit_key(Request(scope)) if self.limiter.per_client > 0 else None
+        if client is not None and not self.limiter.enter_client(client):
+            await self._reject(scope, receive, send, f"too many requests in flight for {client}")
+            return
+        try:
+            if not await group.acquire():
+                await self._reject(scope, receive, send, f"{group.name} is at its concurrency limit of {int(group.limit)}")
+                return
+
+            started = time.monotonic()
+            latency = None
+
+            async def send_with_latency(message):
+                nonlocal latency
+                if latency is None and message["type"] == "http.response.start":
+                    latency = time.monotonic() - started
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_latency)
+            finally:
+                group.release(started, latency if latency is not None else time.monotonic() - started)
+        finally:
+            if client is not None:
+                self.limiter.leave_client(client)
+
+    async def _reject(self, scope, receive, send, reason):
+        logger.warning(f"Rejected {scope['path']}: {reason}")
+        response = JSONResponse(
+            status_code=503,
+            content={"detail": "Server is busy, please retry shortly"},
+            headers={"Retry-After": str(self.retry_after)},
+        )
+        await response(scope, receive, send)
+
+
+concurrency_limiter = ConcurrencyLimiter(
+    ROUTE_GROUPS,
+    per_client=CONCURRENCY_PER_CLIENT,
+    initial=CONCURRENCY_LIMIT_INITIAL,
+    min_limit=CONCURRENCY_LIMIT_MIN,
+    max_limit=CONCURRENCY_LIMIT_MAX,
+    tolerance=CONCURRENCY_LATENCY_TOLERANCE,
+    backoff=CONCURRENCY_BACKOFF,
+    queue_size=CONCURRENCY_QUEUE_SIZE,
+    queue_timeout=CONCURRENCY_QUEUE_TIMEOUT,
+)
+
+# Each export streams from its own pooled connection; keep some for the rest
+export_slots = SlotLimit("export", EXPORT_MAX_CONCURRENT)
@@ -0,0 +1,120 @@
+import math
+import time
+import heapq
+import threading
+
+# Trending windows and their length in seconds
+WINDOWS = {"1h": 3600.0, "24h": 86400.0, "7d": 604800.0}
+
+# Rescale stored values before exp() of the elapsed time gets near overflow
+_MAX_GROWTH = 50.0
+
+
+class DecayingCounter:
+    """
+    Per-key event counters that decay exponentially, one score per window.
+
+    A window's score decays with the window length as time constant, so it
+    approximates the number of events in the last window without keeping
+    time buckets. Values are stored scaled to a common origin ("forward
+    decay"): adding an event is O(1), every key decays by the same factor,
+    and ranking needs no per-key arithmetic.
+    """
+
+    def __init__(self, windows=None, clock=time.time):
+        self.windows = dict(windows or WINDOWS)
+        self._taus = list(self.windows.values())
+        self._clock = clock
+        self._origin = clock()
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def add(self, key, amount=1.0, now=None):
+        self.update({key: [amount] * len(self._taus)}, now)
+
+    def update(self, scores, now=None):
+        """Add a ``{key: [score per window]}`` mapping of current-time scores."""
+        with self._lock:
+            growth = self._growth(now)
+            for key, key_scores in scores.items():
+                values = self._values.get(key)
+                if values is None:
+                    values = self._values[key] = [0.0] * len(self._taus)
+                for i, score in enumerate(key_scores):
+                    values[i] += score * growth[i]
+
+    def record(self, keys, now=None):
+        """Count one event for each key in ``keys``."""
+        with self._lock:
+            growth = self._growth(now)
+            for key in keys:
+                values = self._values.get(key)
+                if values is None:
+                    values = self._values[key] = [0.0] * len(self._taus)
+                for i, g in enumerate(growth):
+                    values[i] += g
+
+    def get(self, key, now=None) -> dict:
+        with self._lock:
+            decay = self._decay(now)
+            values = self._values.get(key, [0.0] * len(self._taus))
+            return {window: v * d for window, v, d in zip(self.windows, values, decay)}
+
+    def top(self, window, n, now=None):
+        """Return the ``n`` highest scoring ``(key, score)`` pairs for ``window``."""
+        index = list(self.windows).index(window)
+        with self._lock:
+            decay = self._decay(now)[index]
+            best = heapq.nlargest(n, self._values.items(), key=lambda item: (item[1][index], -item[0]))
+            return [(key, values[index] * decay) for key, values in best if values[index] > 0]
+
+    def snapshot(self, now=None) -> dict:
+        """Return the current scores of every key as ``{key: [score per window]}``."""
+        with self._lock:
+            decay = self._decay(now)
+            return {key: [v * d for v, d in zip(values, decay)] for key, values in self._values.items()}
+
+    def drain(self, now=None) -> dict:
+        """Return the current scores and reset the counter."""
+        with self._lock:
+            decay = self._decay(now)
+            scores = {key: [v * d for v, d in zip(values, decay)] for key, values in self._values.items()}
+            self._values = {}
+            return scores
+
+    def discard(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def prune(self, min_score, now=None) -> int:
+        """Drop keys whose scores have all decayed below ``min_score``; returns how many."""
+        with self._lock:
+            decay = self._decay(now)
+            stale = [
+                key for key, values in self._values.items()
+                if all(v * d < min_score for v, d in zip(values, decay))
+            ]
+            for key in stale:
+                del self._values[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def _decay(self, now):
+        elapsed = (self._clock() if now is None else now) - self._origin
+        return [math.exp(-elapsed / tau) for tau in self._taus]
+
+    def _growth(self, now):
+        now = self._clock() if now is None else now
+        if (now - self._origin) / min(self._taus) > _MAX_GROWTH:
+            decay = [math.exp(-(now - self._origin) / tau) for tau in self._taus]
+            for values in self._values.values():
+                for i, d in enumerate(decay):
+                    values[i] *= d
+            self._origin = now
+        return [math.exp((now - self._origin) / tau) for tau in self._taus]
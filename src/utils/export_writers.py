@@ -0,0 +1,55 @@
+import io
+import csv
+import json
+from src.dependencies import EXPORT_FETCH_SIZE
+
+EXPORT_FIELDNAMES = ["id", "title", "published_year", "genre", "author", "author_id"]
+
+
+async def json_array_chunks(books, chunk_rows=EXPORT_FETCH_SIZE):
+    """Encode books as ``{"books": [...]}``, yielding a chunk every ``chunk_rows`` rows."""
+    parts = ['{"books": [']
+    count = 0
+    async for book in books:
+        parts.append(("" if count == 0 else ", ") + json.dumps(book, ensure_ascii=False))
+        count += 1
+        if count % chunk_rows == 0:
+            yield "".join(parts)
+            parts = []
+    parts.append("]}")
+    yield "".join(parts)
+
+
+async def ndjson_chunks(books, chunk_rows=EXPORT_FETCH_SIZE):
+    """Encode books as newline-delimited JSON."""
+    parts = []
+    async for book in books:
+        parts.append(json.dumps(book, ensure_ascii=False) + "\n")
+        if len(parts) >= chunk_rows:
+            yield "".join(parts)
+            parts = []
+    if parts:
+        yield "".join(parts)
+
+
+async def csv_chunks(books, chunk_rows=EXPORT_FETCH_SIZE):
+    """Encode books as CSV with a header row."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDNAMES, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    async for book in books:
+        writer.writerow(book)
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+EXPORT_FORMATS = {
+    "json": (json_array_chunks, "application/json", "books.json"),
+    "csv": (csv_chunks, "text/csv", "books.csv"),
+    "ndjson": (ndjson_chunks, "application/x-ndjson", "books.ndjson"),
+}
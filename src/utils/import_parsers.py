@@ -0,0 +1,135 @@
+import io
+import csv
+import json
+from src.dependencies import IMPORT_READ_CHUNK_SIZE
+
+# Largest single JSON element (in characters) buffered before giving up on it
+MAX_JSON_ELEMENT_SIZE = 1024 * 1024
+
+
+def _open_text(stream):
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+
+def iter_csv_rows(stream):
+    """Yield rows of a CSV file as dicts keyed by the header row."""
+    text = _open_text(stream)
+    try:
+        yield from csv.DictReader(text)
+    except csv.Error as e:
+        raise ValueError(f"Invalid CSV in import file: {e}")
+    finally:
+        text.detach()
+
+
+def iter_ndjson_rows(stream):
+    """Yield one object per non-empty line of a newline-delimited JSON file."""
+    text = _open_text(stream)
+    try:
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not isinstance(item, dict):
+                raise ValueError(f"Line {line_number} is not a JSON object")
+            yield item
+    finally:
+        text.detach()
+
+
+def iter_json_array_rows(stream, chunk_size=IMPORT_READ_CHUNK_SIZE):
+    """
+    Yield the objects of a top-level JSON array one at a time.
+
+    The file is read ``chunk_size`` characters at a time and only the element
+    currently being decoded is kept in memory.
+    """
+    text = _open_text(stream)
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def refill():
+        nonlocal buffer, pos, eof
+        chunk = text.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def peek():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                return None
+            refill()
+
+    try:
+        if peek() != "[":
+            raise ValueError("JSON import must be an array of book objects")
+        pos += 1
+        if peek() == "]":
+            return
+
+        while True:
+            peek()
+            while True:
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                    break
+                except json.JSONDecodeError:
+                    if eof or len(buffer) - pos > MAX_JSON_ELEMENT_SIZE:
+                        raise ValueError("Invalid or truncated JSON in import file")
+                    refill()
+
+            if not isinstance(item, dict):
+                raise ValueError("JSON import must be an array of book objects")
+            yield item
+
+            separator = peek()
+            if separator == ",":
+                pos += 1
+            elif separator == "]":
+                return
+            else:
+                raise ValueError("Invalid or truncated JSON in import file")
+    finally:
+        text.detach()
+
+
+def iter_upload_rows(filename: str, stream):
+    """Pick a streaming parser for an uploaded file based on its extension."""
+    if filename.endswith(".json"):
+        return iter_json_array_rows(stream)
+    if filename.endswith((".ndjson", ".jsonl")):
+        return iter_ndjson_rows(stream)
+    if filename.endswith(".csv"):
+        return iter_csv_rows(stream)
+    raise ValueError("Only JSON, NDJSON and CSV files are supported")
+
+
+def iter_batches(rows, size: int):
+    """
+    Group an iterator of rows into lists of at most ``size`` rows.
+
+    If the parser fails with ``ValueError``, the rows read before the error
+    are yielded first and the error is raised on the next call.
+    """
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == size:
+                yield batch
+                batch = []
+    except ValueError:
+        if batch:
+            yield batch
+        raise
+    if batch:
+        yield batch
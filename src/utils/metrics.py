@@ -0,0 +1,121 @@
+import time
+import inspect
+import functools
+from prometheus_client import Counter, Histogram
+
+# Request and query latencies span cache hits (sub-millisecond) to slow
+# exports and imports, hence the wide buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 1000, 5000, 10000)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, by route template.",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUEST_ERRORS = Counter(
+    "http_request_errors_total", "Requests that failed with a 5xx status or an unhandled exception.",
+    ["method", "route"],
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Time spent in a query function of src.db, cache hits included.",
+    ["query"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows", "Rows returned by a query function of src.db.",
+    ["query"], buckets=ROW_BUCKETS,
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total", "Query functions of src.db that raised.",
+    ["query"],
+)
+DB_CONNECTION_ACQUIRE = Histogram(
+    "db_connection_acquire_seconds", "Time spent waiting for a pooled database connection.",
+    ["pool"], buckets=LATENCY_BUCKETS,
+)
+
+
+def count_rows(result) -> int:
+    """Rows in a query function's result: the length of a list, tuple or set, else one row or none."""
+    if result is None:
+        return 0
+    if isinstance(result, (list, tuple, set, frozenset)):
+        return len(result)
+    return 1
+
+
+def timed_query(func=None, *, rows=count_rows):
+    """
+    Record the latency, row count and errors of a query function, labeled
+    with its name. ``rows`` counts the rows of a result.
+    """
+    if func is None:
+        return functools.partial(timed_query, rows=rows)
+    name = func.__name__
+    latency = DB_QUERY_LATENCY.labels(name)
+    returned = DB_QUERY_ROWS.labels(name)
+    errors = DB_QUERY_ERRORS.labels(name)
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - started)
+            returned.observe(rows(result))
+            return result
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - started)
+            returned.observe(rows(result))
+            return result
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    Observes the latency of every HTTP request until its response is sent,
+    labeled with the route template (``/books/get_book/{book_id}``) rather
+    than the path, so ids do not multiply the series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.labels(scope["method"], template, str(status)).observe(time.perf_counter() - started)
+            if status >= 500:
+                REQUEST_ERRORS.labels(scope["method"], template).inc()
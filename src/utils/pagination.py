@@ -0,0 +1,32 @@
+import json
+import base64
+import binascii
+
+SORT_COLUMNS = ["title", "published_year", "author_id"]
+# Search results are ordered by relevance, which continuation tokens carry as a float
+SEARCH_SORT_KEY = "rank"
+
+
+def encode_cursor(sort_by: str, book: dict) -> str:
+    """Build an opaque continuation token from the last book of a page."""
+    payload = json.dumps([sort_by, book[sort_by], book["id"]], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_by: str):
+    """
+    Decode a continuation token into the ``(sort value, id)`` to seek after.
+    Raises ValueError if the token is malformed or was issued for another sort key.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        token_sort_by, value, book_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise ValueError("Invalid pagination cursor")
+
+    if token_sort_by != sort_by:
+        raise ValueError(f"Pagination cursor was issued for sort_by={token_sort_by}")
+    expected_type = {"title": str, SEARCH_SORT_KEY: float}.get(sort_by, int)
+    if not isinstance(value, expected_type) or isinstance(value, bool) or not isinstance(book_id, int):
+        raise ValueError("Invalid pagination cursor")
+    return value, book_id
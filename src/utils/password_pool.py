@@ -0,0 +1,96 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.dependencies import PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE, logger
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when every password worker is busy and the wait queue is full."""
+
+
+class PasswordWorkerPool:
+    """
+    Bounded thread pool for bcrypt hashing and verification.
+
+    At most ``max_workers`` operations run at once and at most ``max_queue``
+    more may wait for a worker; anything beyond that is rejected immediately
+    with ``PasswordPoolSaturated`` instead of piling up behind the executor.
+    """
+
+    def __init__(self, max_workers=4, max_queue=32):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self._operations = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password")
+            return self._executor
+
+    async def run(self, operation: str, func, *args):
+        """Run ``func(*args)`` on a password worker and record its timing under ``operation``."""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordPoolSaturated(f"Password worker pool is saturated ({self._pending} pending)")
+            self._pending += 1
+
+        queued_at = time.monotonic()
+
+        def job():
+            started = time.monotonic()
+            result = func(*args)
+            return result, started - queued_at, time.monotonic() - started
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, waited, duration = await loop.run_in_executor(self._get_executor(), job)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        self._record(operation, waited, duration)
+        return result
+
+    def _record(self, operation: str, waited: float, duration: float):
+        with self._lock:
+            metrics = self._operations.setdefault(operation, {
+                "calls": 0,
+                "duration_total": 0.0,
+                "duration_max": 0.0,
+                "queue_wait_total": 0.0,
+                "queue_wait_max": 0.0,
+            })
+            metrics["calls"] += 1
+            metrics["duration_total"] += duration
+            metrics["duration_max"] = max(metrics["duration_max"], duration)
+            metrics["queue_wait_total"] += waited
+            metrics["queue_wait_max"] = max(metrics["queue_wait_max"], waited)
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth, rejections and per-operation timings."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "queued": max(self._pending - self.max_workers, 0),
+                "rejected": self._rejected,
+                "operations": {name: dict(metrics) for name, metrics in self._operations.items()},
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            logger.info("Password worker pool shut down.")
+
+
+password_pool = PasswordWorkerPool(max_workers=PASSWORD_HASH_WORKERS, max_queue=PASSWORD_HASH_QUEUE_SIZE)
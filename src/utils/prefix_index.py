@@ -0,0 +1,224 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
+
+# Entries sorted together in one run of a build
+BUILD_CHUNK_SIZE = 50000
+
+
+def normalize(text: str) -> str:
+    return text.casefold()
+
+
+class PrefixIndex:
+    """
+    Compact case-insensitive prefix index of ``(id, text)`` entries.
+
+    The bulk of the entries lives in sorted arrays: all texts concatenated
+    into one UTF-8 buffer in ``(casefolded text, id)`` order, their offsets,
+    and their ids (twice, also sorted by id), so an entry costs its UTF-8
+    length plus 16 bytes instead of a Python object per string. Lookups binary search that buffer.
+
+    Changes after a build go to a small sorted delta list (added or replaced
+    entries) and a set of ids hidden from the arrays; once the delta grows
+    past ``merge_threshold`` it is merged into new arrays.
+
+    A rebuild from the database runs between ``begin_rebuild()`` and
+    ``finish_rebuild()``; changes made meanwhile are replayed on the result.
+    New indexes are built by ``PrefixIndexBuilder``.
+    """
+
+    def __init__(self, merge_threshold=10000):
+        self.merge_threshold = merge_threshold
+        self._text = b""
+        self._offsets = array("q", [0])
+        self._ids = array("i")
+        self._sorted_ids = array("i")
+        self._delta = []
+        self._delta_keys = {}
+        self._hidden = set()
+        self._journal = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_items(cls, items, merge_threshold=10000) -> "PrefixIndex":
+        builder = PrefixIndexBuilder()
+        items = iter(items)
+        while chunk := list(islice(items, BUILD_CHUNK_SIZE)):
+            builder.add(chunk)
+        return builder.build(merge_threshold)
+
+    def add(self, entry_id: int, text: str):
+        """Add an entry, replacing any entry with the same id."""
+        with self._lock:
+            self._remove(entry_id)
+            key = (normalize(text), entry_id, text)
+            insort(self._delta, key)
+            self._delta_keys[entry_id] = key
+            if self._journal is not None:
+                self._journal.append((entry_id, text))
+            if len(self._delta) > self.merge_threshold:
+                self._merge()
+
+    def remove(self, entry_id: int):
+        with self._lock:
+            self._remove(entry_id)
+            if self._journal is not None:
+                self._journal.append((entry_id, None))
+
+    def search(self, prefix: str, limit: int = 10):
+        """Return up to ``limit`` ``(id, text)`` entries starting with ``prefix``, ignoring case."""
+        prefix = normalize(prefix)
+        with self._lock:
+            matches = heapq.merge(self._search_arrays(prefix), self._search_delta(prefix))
+            result = []
+            for _, entry_id, text in matches:
+                result.append((entry_id, text))
+                if len(result) >= limit:
+                    break
+            return result
+
+    def begin_rebuild(self):
+        """Start journaling changes that a rebuild in progress would miss."""
+        with self._lock:
+            self._journal = []
+
+    def abort_rebuild(self):
+        with self._lock:
+            self._journal = None
+
+    def finish_rebuild(self, rebuilt: "PrefixIndex"):
+        """Take over the arrays of ``rebuilt`` and replay the changes made since ``begin_rebuild()``."""
+        with self._lock:
+            journal, self._journal = self._journal or [], None
+            self._text, self._offsets, self._ids = rebuilt._text, rebuilt._offsets, rebuilt._ids
+            self._sorted_ids = rebuilt._sorted_ids
+            self._delta, self._delta_keys, self._hidden = [], {}, set()
+        for entry_id, text in journal:
+            if text is None:
+                self.remove(entry_id)
+            else:
+                self.add(entry_id, text)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._ids) - len(self._hidden) + len(self._delta),
+                "delta": len(self._delta),
+                "memory_bytes": (
+                    len(self._text)
+                    + self._offsets.itemsize * len(self._offsets)
+                    + self._ids.itemsize * len(self._ids) * 2
+                    + sum(len(text.encode("utf-8")) * 2 + 64 for _, _, text in self._delta)
+                ),
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids) - len(self._hidden) + len(self._delta)
+
+    def _store(self, entries, sorted_ids):
+        """Pack sorted ``(key, id, text)`` entries into the arrays, one entry at a time."""
+        self._text, self._offsets, self._ids = _pack(entries)
+        self._sorted_ids = sorted_ids
+        self._delta, self._delta_keys, self._hidden = [], {}, set()
+
+    def _text_at(self, i):
+        return _text_at(self._text, self._offsets, i)
+
+    def _search_arrays(self, prefix):
+        lo, hi = 0, len(self._ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if normalize(self._text_at(mid)) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        for i in range(lo, len(self._ids)):
+            text = self._text_at(i)
+            key = normalize(text)
+            if not key.startswith(prefix):
+                break
+            if self._ids[i] not in self._hidden:
+                yield key, self._ids[i], text
+
+    def _search_delta(self, prefix):
+        for i in range(bisect_left(self._delta, (prefix,)), len(self._delta)):
+            entry = self._delta[i]
+            if not entry[0].startswith(prefix):
+                break
+            yield entry
+
+    def _remove(self, entry_id):
+        key = self._delta_keys.pop(entry_id, None)
+        if key is not None:
+            del self._delta[bisect_left(self._delta, key)]
+        if entry_id not in self._hidden and self._in_arrays(entry_id):
+            self._hidden.add(entry_id)
+
+    def _in_arrays(self, entry_id):
+        i = bisect_left(self._sorted_ids, entry_id)
+        return i < len(self._sorted_ids) and self._sorted_ids[i] == entry_id
+
+    def _merge(self):
+        # Both sides are already sorted, so merging is linear
+        kept = (entry for entry in _entries(self._text, self._offsets, self._ids) if entry[1] not in self._hidden)
+        sorted_ids = array("i", heapq.merge(
+            (entry_id for entry_id in self._sorted_ids if entry_id not in self._hidden),
+            sorted(self._delta_keys),
+        ))
+        self._store(heapq.merge(kept, self._delta), sorted_ids)
+
+
+class PrefixIndexBuilder:
+    """
+    Builds a ``PrefixIndex`` from chunks of ``(id, text)`` items.
+
+    Each chunk is sorted and packed into arrays as soon as it is added, and
+    ``build()`` merges the packed runs, so a build holds Python objects for
+    one chunk at a time and about twice the final index size in arrays.
+    When the items arrive in id order, the ids need no separate sort.
+    """
+
+    def __init__(self):
+        self._runs = []
+        self._ids = array("i")
+        self._ids_sorted = True
+
+    def add(self, items):
+        """Sort and pack one chunk of ``(id, text)`` items."""
+        entries = sorted((normalize(text), entry_id, text) for entry_id, text in items)
+        for entry_id, _ in items:
+            if self._ids and entry_id < self._ids[-1]:
+                self._ids_sorted = False
+            self._ids.append(entry_id)
+        self._runs.append(_pack(entries))
+
+    def build(self, merge_threshold=10000) -> PrefixIndex:
+        index = PrefixIndex(merge_threshold)
+        runs, self._runs = self._runs, []
+        sorted_ids = self._ids if self._ids_sorted else array("i", sorted(self._ids))
+        index._store(heapq.merge(*(_entries(*run) for run in runs)), sorted_ids)
+        return index
+
+
+def _pack(entries):
+    """Pack sorted ``(key, id, text)`` entries into a UTF-8 buffer, offsets and ids."""
+    text, offsets, ids = bytearray(), array("q", [0]), array("i")
+    for _, entry_id, entry_text in entries:
+        text += entry_text.encode("utf-8")
+        offsets.append(len(text))
+        ids.append(entry_id)
+    return text, offsets, ids
+
+
+def _text_at(text, offsets, i):
+    return text[offsets[i]:offsets[i + 1]].decode("utf-8")
+
+
+def _entries(text, offsets, ids):
+    for i in range(len(ids)):
+        entry_text = _text_at(text, offsets, i)
+        yield normalize(entry_text), ids[i], entry_text
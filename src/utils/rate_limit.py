@@ -1,4 +1,52 @@
+import json
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from src.utils.auth_utils import user_from_token
+from src.dependencies import (
+    RATE_LIMIT_STORAGE_URI,
+    RATE_LIMIT_STRATEGY,
+    RATE_LIMIT_KEY_PREFIX,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMITS,
+)
 
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+
+def parse_route_limits(value: str) -> dict:
+    """Parse the ``RATE_LIMITS`` JSON object of route name to limit string."""
+    limits = json.loads(value or "{}")
+    if not isinstance(limits, dict) or not all(isinstance(limit, str) for limit in limits.values()):
+        raise ValueError('RATE_LIMITS must be a JSON object such as {"books.search": "30/minute"}')
+    return limits
+
+
+_route_limits = parse_route_limits(RATE_LIMITS)
+
+
+def route_limit(name: str, default: str = RATE_LIMIT_DEFAULT) -> str:
+    """Limit of the route ``name``, unless ``RATE_LIMITS`` overrides it."""
+    return _route_limits.get(name, default)
+
+
+def rate_limit_key(request) -> str:
+    """
+    Count requests per user when they carry a valid bearer token, else per
+    client address, so users behind one address do not share a limit.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        user = user_from_token(token)
+        if user and user.get("id") is not None:
+            return f"user:{user['id']}"
+    return f"ip:{get_remote_address(request)}"
+
+
+# With a shared storage (e.g. redis://) every worker counts against the same
+# limits; if it is unreachable each worker falls back to its own counters.
+limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+    key_prefix=RATE_LIMIT_KEY_PREFIX,
+    key_style="endpoint",
+    in_memory_fallback_enabled=not RATE_LIMIT_STORAGE_URI.startswith("memory://"),
+)
@@ -0,0 +1,17 @@
+import re
+
+# Words of the query; everything else (tsquery operators included) is ignored
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+MAX_QUERY_WORDS = 8
+
+
+def prefix_tsquery(text: str) -> str:
+    """
+    Turn free text into a ``to_tsquery('simple', ...)`` expression in which
+    every word must match as a prefix, e.g. ``"lord ring"`` -> ``"lord:* & ring:*"``.
+    Raises ValueError if the text has no words.
+    """
+    words = _WORD.findall((text or "").lower())[:MAX_QUERY_WORDS]
+    if not words:
+        raise ValueError("Search query must contain at least one word")
+    return " & ".join(f"{word}:*" for word in words)
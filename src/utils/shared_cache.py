@@ -0,0 +1,347 @@
+import json
+import uuid
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.dependencies import CACHE_BACKEND_THREADS, logger
+from src.utils.ttl_cache import TTLCache
+
+_MISSING = object()
+
+
+class CacheBackend:
+    """
+    Cache shared by every worker process, plus a broadcast channel used to
+    tell the other workers which of their local entries went stale.
+
+    Values must be JSON-serialisable.
+    """
+
+    # Whether calls block on I/O; SharedCache runs those off the event loop
+    blocking = True
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix):
+        raise NotImplementedError
+
+    def publish(self, message: dict):
+        raise NotImplementedError
+
+    def subscribe(self, handler):
+        """Call ``handler(message)`` for every message published by any worker."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process stand-in for a shared cache server.
+
+    Several ``SharedCache`` instances pointed at the same backend behave like
+    workers sharing one Redis, which is what the tests rely on.
+    """
+
+    blocking = False
+
+    def __init__(self, max_size=100_000):
+        self._store = TTLCache(max_size=max_size, ttl=0)
+        self._handlers = []
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value = self._store.get(key, _MISSING)
+        return None if value is _MISSING else json.loads(value)
+
+    def set(self, key, value, ttl):
+        self._store.set(key, json.dumps(value), ttl=ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._store.delete(key)
+
+    def delete_prefix(self, prefix):
+        for key in self._store.keys():
+            if key.startswith(prefix):
+                self._store.delete(key)
+
+    def publish(self, message: dict):
+        payload = json.loads(json.dumps(message))
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler in handlers:
+            handler(payload)
+
+    def subscribe(self, handler):
+        with self._lock:
+            self._handlers.append(handler)
+
+    def close(self):
+        with self._lock:
+            self._handlers.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache backend speaking the Redis protocol.
+
+    Invalidations are broadcast with PUBLISH on ``channel`` and received by a
+    background subscriber thread in each worker.
+    """
+
+    def __init__(self, client, channel="bms:invalidate", poll_interval=0.1):
+        self.client = client
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self._pubsub = None
+        self._thread = None
+
+    @classmethod
+    def from_url(cls, url, channel="bms:invalidate", socket_timeout=0.5):
+        import redis
+        client = redis.Redis.from_url(url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout)
+        return cls(client, channel=channel)
+
+    def get(self, key):
+        value = self.client.get(key)
+        return None if value is None else json.loads(value)
+
+    def set(self, key, value, ttl):
+        self.client.set(key, json.dumps(value), px=max(int(ttl * 1000), 1))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*keys)
+
+    def delete_prefix(self, prefix):
+        batch = []
+        for key in self.client.scan_iter(match=f"{prefix}*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                self.client.delete(*batch)
+                batch = []
+        if batch:
+            self.client.delete(*batch)
+
+    def publish(self, message: dict):
+        self.client.publish(self.channel, json.dumps(message))
+
+    def subscribe(self, handler):
+        def on_message(message):
+            try:
+                handler(json.loads(message["data"]))
+            except Exception as e:
+                logger.error(f"Failed to handle cache invalidation message: {e}")
+
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: on_message})
+        self._thread = self._pubsub.run_in_thread(sleep_time=self.poll_interval, daemon=True)
+        logger.info(f"Listening for cache invalidations on channel {self.channel}.")
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.join(timeout=1)
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+        self.client.close()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=CACHE_BACKEND_THREADS, thread_name_prefix="shared-cache")
+        return _executor
+
+
+class SharedCache:
+    """
+    Two-level cache: a per-process ``TTLCache`` in front of an optional shared
+    backend.
+
+    Reads fall back from the local cache to the shared backend; writes and
+    invalidations go to both, and invalidations are published so that other
+    workers evict their local copies too. Backend failures are logged and
+    treated as misses so an unavailable cache server never fails a request.
+
+    Coroutines use ``aget``/``aset``/``adelete``/``aclear``, which run
+    blocking backend calls on a small thread pool.
+    """
+
+    def __init__(self, namespace, max_size=1024, ttl=300.0, local_ttl=None, backend=None, key_prefix="bms:"):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.local = TTLCache(max_size=max_size, ttl=ttl if local_ttl is None else min(ttl, local_ttl))
+        self.backend = backend
+        # Identifies the worker that published an invalidation, so it can skip its own messages
+        self.origin = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._shared_hits = 0
+        self._shared_misses = 0
+        self._backend_errors = 0
+
+    def _key(self, key) -> str:
+        return f"{self.key_prefix}{self.namespace}:{key}"
+
+    def _backend_call(self, operation, *args):
+        try:
+            return getattr(self.backend, operation)(*args)
+        except Exception as e:
+            with self._lock:
+                self._backend_errors += 1
+            logger.warning(f"Shared cache {operation} failed for {self.namespace}: {e}")
+            return None
+
+    async def _offload(self, func, *args):
+        """Run backend calls on a cache thread, so a slow cache server does not stall the event loop."""
+        if not getattr(self.backend, "blocking", True):
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(func, *args))
+
+    def _shared_result(self, key, value, default):
+        with self._lock:
+            if value is None:
+                self._shared_misses += 1
+            else:
+                self._shared_hits += 1
+        if value is None:
+            return default
+        self.local.set(key, value)
+        return value
+
+    def _invalidate_shared(self, keys):
+        self._backend_call("delete", *[self._key(key) for key in keys])
+        self._backend_call("publish", {"origin": self.origin, "namespace": self.namespace, "keys": list(keys)})
+
+    def _clear_shared(self):
+        self._backend_call("delete_prefix", self._key(""))
+        self._backend_call("publish", {"origin": self.origin, "namespace": self.namespace, "clear": True})
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.backend is None:
+            return default
+        return self._shared_result(key, self._backend_call("get", self._key(key)), default)
+
+    def set(self, key, value, ttl=None):
+        self.local.set(key, value, ttl=None if ttl is None else min(ttl, self.local.ttl))
+        if self.backend is not None:
+            self._backend_call("set", self._key(key), value, self.ttl if ttl is None else ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.local.delete(key)
+        if self.backend is not None and keys:
+            self._invalidate_shared(keys)
+
+    def clear(self):
+        self.local.clear()
+        if self.backend is not None:
+            self._clear_shared()
+
+    # Counterparts of get/set/delete/clear for coroutines: local hits are
+    # served inline, shared backend I/O is awaited on a cache thread.
+
+    async def aget(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.backend is None:
+            return default
+        return self._shared_result(key, await self._offload(self._backend_call, "get", self._key(key)), default)
+
+    async def aset(self, key, value, ttl=None):
+        self.local.set(key, value, ttl=None if ttl is None else min(ttl, self.local.ttl))
+        if self.backend is not None:
+            await self._offload(self._backend_call, "set", self._key(key), value, self.ttl if ttl is None else ttl)
+
+    async def adelete(self, *keys):
+        for key in keys:
+            self.local.delete(key)
+        if self.backend is not None and keys:
+            await self._offload(self._invalidate_shared, keys)
+
+    async def aclear(self):
+        self.local.clear()
+        if self.backend is not None:
+            await self._offload(self._clear_shared)
+
+    def evict_local(self, message: dict):
+        """Apply an invalidation broadcast by another worker to the local cache."""
+        if message.get("clear"):
+            self.local.clear()
+        for key in message.get("keys", ()):
+            self.local.delete(key)
+
+    def __len__(self):
+        return len(self.local)
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        with self._lock:
+            shared_lookups = self._shared_hits + self._shared_misses
+            stats.update({
+                "backend": type(self.backend).__name__ if self.backend is not None else None,
+                "shared_hits": self._shared_hits,
+                "shared_misses": self._shared_misses,
+                "shared_hit_ratio": self._shared_hits / shared_lookups if shared_lookups else 0.0,
+                "backend_errors": self._backend_errors,
+            })
+        return stats
+
+
+class CacheGroup:
+    """
+    Set of ``SharedCache`` namespaces that share one backend and one
+    invalidation subscription.
+    """
+
+    def __init__(self, *caches):
+        self.caches = {cache.namespace: cache for cache in caches}
+        self.backend = None
+        self.origin = uuid.uuid4().hex
+        for cache in caches:
+            cache.origin = self.origin
+
+    def attach(self, backend, subscribe=True):
+        """Point every cache at ``backend`` and start listening for invalidations."""
+        for cache in self.caches.values():
+            cache.backend = backend
+        self.backend = backend
+        if backend is not None and subscribe:
+            backend.subscribe(self.handle_invalidation)
+
+    def detach(self):
+        backend, self.backend = self.backend, None
+        for cache in self.caches.values():
+            cache.backend = None
+        if backend is not None:
+            backend.close()
+
+    def handle_invalidation(self, message: dict):
+        if message.get("origin") == self.origin:
+            return
+        cache = self.caches.get(message.get("namespace"))
+        if cache is not None:
+            cache.evict_local(message)
@@ -5,57 +5,38 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import os
+import uuid
+from alembic import command
+from src.db.init_db import get_alembic_config
 
 # Завантаження .env
 load_dotenv()
 
-# SQL для створення таблиць
-init_sql = """
-CREATE TABLE IF NOT EXISTS users (
-    id SERIAL PRIMARY KEY,
-    username VARCHAR(255) UNIQUE NOT NULL,
-    password VARCHAR(255) NOT NULL
-);
 
-CREATE TABLE IF NOT EXISTS authors (
-    id SERIAL PRIMARY KEY,
-    name VARCHAR(255) UNIQUE NOT NULL
-);
-
-CREATE TABLE IF NOT EXISTS books (
-    id SERIAL PRIMARY KEY,
-    title VARCHAR(255) UNIQUE NOT NULL,
-    published_year INT NOT NULL,
-    genre VARCHAR(50) NOT NULL CHECK (genre IN (
-        'Fiction', 'Non-Fiction', 'Science', 'History', 'Fantasy', 
-        'Biography', 'Romance', 'Thriller', 'Mystery', 'Philosophy'
-    )),
-    author_id INTEGER NOT NULL REFERENCES authors(id)
-);
-
-CREATE TABLE IF NOT EXISTS user_history (
-    id SERIAL PRIMARY KEY,
-    user_id INTEGER NOT NULL REFERENCES users(id),
-    book_id INTEGER NOT NULL REFERENCES books(id),
-    action VARCHAR(50) CHECK (action IN ('viewed')) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-"""
+def db_url(dbname=None):
+    """URL тестової БД (або іншої БД на тому ж сервері)."""
+    return (
+        f"postgresql://{os.getenv('TEST_DB_USER')}:{os.getenv('TEST_DB_PASSWORD')}"
+        f"@{os.getenv('TEST_DB_HOST').strip()}:{os.getenv('TEST_DB_PORT')}/{dbname or os.getenv('TEST_DB_NAME')}"
+    )
 
 @pytest.fixture(scope="session")
 def init_test_db():
-    """Ініціалізує таблиці в тестовій базі даних."""
-    conn = psycopg2.connect(
-        dbname=os.getenv("TEST_DB_NAME"),
-        user=os.getenv("TEST_DB_USER"),
-        password=os.getenv("TEST_DB_PASSWORD"),
-        host=os.getenv("TEST_DB_HOST").strip(),
-        port=os.getenv("TEST_DB_PORT")
-    )
-    print(f"🔗 Connected to test DB: {os.getenv('TEST_DB_NAME')} at {os.getenv('TEST_DB_HOST')}")
+    """Застосовує міграції Alembic до тестової бази даних."""
+    print(f"🔗 Migrating test DB: {os.getenv('TEST_DB_NAME')} at {os.getenv('TEST_DB_HOST')}")
+    command.upgrade(get_alembic_config(db_url()), "head")
+
+@pytest.fixture
+def scratch_db_url():
+    """Створює порожню тимчасову БД і видаляє її після тесту."""
+    name = f"scratch_{uuid.uuid4().hex[:12]}"
+    conn = psycopg2.connect(db_url())
     conn.autocommit = True
     with conn.cursor() as cur:
-        cur.execute(init_sql)
+        cur.execute(f"CREATE DATABASE {name}")
+    yield db_url(name)
+    with conn.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
     conn.close()
 
 @pytest.fixture(scope="function")
@@ -79,3 +60,11 @@ def clean_users(test_db_conn):
     with test_db_conn.cursor() as cursor:
         cursor.execute("TRUNCATE TABLE users RESTART IDENTITY CASCADE;")
         test_db_conn.commit()
+
+@pytest.fixture(autouse=True)
+def clear_lookup_caches():
+    """Очищає кеші книг і авторів, бо тести змінюють БД напряму."""
+    from src.db.cache import clear_caches
+    clear_caches()
+    yield
+    clear_caches()
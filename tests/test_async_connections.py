@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+import src.db.async_connections as async_connections
+from src.db.async_connections import (
+    acquire_stats,
+    close_async_pool,
+    get_async_connection,
+    get_async_pool,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    # Кожен тест починає з нового пулу
+    asyncio.run(close_async_pool())
+    yield
+    asyncio.run(close_async_pool())
+
+
+async def backend_pid():
+    async with get_async_connection() as conn:
+        return await conn.fetchval("SELECT pg_backend_pid()")
+
+
+async def backend_alive(pid):
+    async with get_async_connection() as conn:
+        return await conn.fetchval("SELECT EXISTS (SELECT 1 FROM pg_stat_activity WHERE pid = $1)", pid)
+
+
+# Підключення повертається в пул і використовується повторно
+def test_acquire_and_release():
+    async def scenario():
+        before = acquire_stats()["checkouts"]
+        pool = await get_async_pool()
+        async with get_async_connection() as conn:
+            pid = await conn.fetchval("SELECT pg_backend_pid()")
+            busy_idle = pool.get_idle_size()
+        return before, pid, busy_idle, pool.get_idle_size(), await backend_pid()
+
+    before, pid, busy_idle, idle, reused_pid = asyncio.run(scenario())
+    assert busy_idle == 0
+    assert idle == 1
+    assert reused_pid == pid
+    assert acquire_stats()["checkouts"] == before + 2
+
+
+# Після закриття пулу наступний запит відкриває новий
+def test_close_async_pool():
+    async def scenario():
+        pool = await get_async_pool()
+        await close_async_pool()
+        reopened = await get_async_pool()
+        return pool, reopened, await backend_pid()
+
+    pool, reopened, pid = asyncio.run(scenario())
+    assert pool.is_closing()
+    assert reopened is not pool
+    assert pid
+
+
+# Пул старого циклу подій не використовується в новому, його підключення закриваються
+def test_pool_from_another_event_loop_is_replaced():
+    async def first_loop():
+        return await get_async_pool(), await backend_pid()
+
+    first, old_pid = asyncio.run(first_loop())
+
+    async def scenario():
+        pool, pid = await get_async_pool(), await backend_pid()
+        await asyncio.sleep(0.2)
+        return pool, pid, await backend_alive(old_pid)
+
+    second, pid, old_alive = asyncio.run(scenario())
+    assert second is not first
+    assert pid != old_pid
+    assert not old_alive
+
+
+# Закриття пулу з іншого циклу подій не блокує наступні запити
+def test_close_from_another_event_loop():
+    old_pid = asyncio.run(backend_pid())
+    asyncio.run(close_async_pool())
+
+    async def scenario():
+        await asyncio.sleep(0.2)
+        return await backend_pid(), await backend_alive(old_pid)
+
+    pid, old_alive = asyncio.run(scenario())
+    assert pid != old_pid
+    assert not old_alive
+
+
+# Підключення, старше за DB_POOL_MAX_LIFETIME, замінюється новим
+def test_connection_older_than_max_lifetime_is_replaced(monkeypatch):
+    monkeypatch.setattr(async_connections, "DB_POOL_MAX_LIFETIME", 0)
+
+    async def scenario():
+        pool = await get_async_pool()
+        first, second = await backend_pid(), await backend_pid()
+        return first, second, pool.get_size()
+
+    first, second, size = asyncio.run(scenario())
+    assert first != second
+    assert size <= async_connections.DB_POOL_MAX_SIZE
+
+
+# Підключення, що простоює довше за DB_POOL_MAX_IDLE, закривається
+def test_idle_connection_is_closed(monkeypatch):
+    monkeypatch.setattr(async_connections, "DB_POOL_MAX_IDLE", 0.1)
+
+    async def scenario():
+        first = await backend_pid()
+        await asyncio.sleep(0.5)
+        return first, await backend_pid()
+
+    first, second = asyncio.run(scenario())
+    assert first != second
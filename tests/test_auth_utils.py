@@ -8,6 +8,7 @@ from src.utils.auth_utils import (
     create_access_token,
     decode_access_token,
     get_current_user,
+    token_cache,
 )
 from fastapi import HTTPException
 
@@ -71,3 +72,15 @@ def test_get_current_user(mock_decode_access_token):
     mock_decode_access_token.return_value = None
     with pytest.raises(HTTPException):
         get_current_user(token)
+
+
+# Підпис токена з терміном дії перевіряється лише один раз
+def test_get_current_user_caches_verified_token():
+    token = create_access_token("cached_user", 7, timedelta(minutes=5))
+    token_cache.clear()
+
+    with patch("src.utils.auth_utils.decode_access_token", wraps=decode_access_token) as mock_decode:
+        assert get_current_user(token) == {"username": "cached_user", "id": 7}
+        assert get_current_user(token) == {"username": "cached_user", "id": 7}
+
+    assert mock_decode.call_count == 1
@@ -0,0 +1,49 @@
+import asyncio
+import uuid
+from src.db.init_db import init_db
+from src.db.connections import get_db_connection
+from src.db.autocomplete import Autocomplete
+from src.db.async_book_queries import create_book_with_author, update_book_with_author, delete_book, update_books
+import src.db.async_book_queries as async_book_queries
+import src.db.autocomplete as autocomplete_module
+
+
+# Індекс будується з БД і оновлюється під час створення, зміни й видалення книг
+def test_index_built_and_kept_fresh(monkeypatch):
+    init_db(retries=1)
+    index = Autocomplete(refresh_interval=0)
+    monkeypatch.setattr(async_book_queries, "autocomplete", index)
+    # Кілька частин навіть на малій БД
+    monkeypatch.setattr(autocomplete_module, "BUILD_CHUNK_SIZE", 2)
+    tag = uuid.uuid4().hex[:8]
+
+    async def scenario():
+        await index.rebuild()
+        book = await create_book_with_author(f"Qwerty Tales {tag}", 2001, "Fiction", f"Qwylla {tag}")
+        created = index.search(f"qwerty tales {tag}"), index.search(f"qwylla {tag}")
+
+        await update_book_with_author(book["id"], title=f"Qwerty Sagas {tag}", author_name=f"Qwonn {tag}")
+        renamed = index.search(f"qwerty sagas {tag}"), index.search(f"qwonn {tag}")
+
+        # Пакетне оновлення теж оновлює індекс
+        await update_books([{"id": book["id"], "title": f"Qwerty Epics {tag}", "published_year": None, "genre": None, "author": f"Qwarr {tag}"}])
+        batch = index.search(f"qwerty epics {tag}"), index.search(f"qwarr {tag}")
+
+        await delete_book(book["id"])
+        return book["id"], created, renamed, batch, index.search(f"qwerty epics {tag}")
+
+    book_id, created, renamed, batch, after_delete = asyncio.run(scenario())
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM authors WHERE name LIKE %s", (f"% {tag}",))
+            conn.commit()
+    for (books, authors), title, author in (
+        (created, "Qwerty Tales", "Qwylla"), (renamed, "Qwerty Sagas", "Qwonn"), (batch, "Qwerty Epics", "Qwarr"),
+    ):
+        assert books["books"] == [{"id": book_id, "title": f"{title} {tag}"}]
+        assert [entry["name"] for entry in authors["authors"]] == [f"{author} {tag}"]
+    assert after_delete["books"] == []
+    stats = index.stats()
+    assert stats["builds"] == 1
+    assert stats["memory_bytes"] > 0
+    assert stats["build_seconds"] is not None
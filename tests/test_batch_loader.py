@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from src.utils.batch_loader import BatchLoader
+
+
+class RecordingLoader:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, keys):
+        self.calls.append(sorted(keys))
+        if self.fail:
+            raise RuntimeError("database is down")
+        return {key: f"book {key}" for key in keys if key != 404}
+
+
+# Одночасні запити різних і однакових ключів об'єднуються в один виклик
+def test_concurrent_loads_share_one_call():
+    load_many = RecordingLoader()
+    loader = BatchLoader(load_many, window=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(loader.load(key) for key in [1, 2, 2, 3, 404]))
+
+    assert asyncio.run(scenario()) == ["book 1", "book 2", "book 2", "book 3", None]
+    assert load_many.calls == [[1, 2, 3, 404]]
+    assert loader.stats() == {"loads": 5, "coalesced": 1, "batches": 1, "keys": 4}
+
+
+# Пакет відправляється раніше, коли досягає max_batch
+def test_full_batch_dispatched_early():
+    load_many = RecordingLoader()
+    loader = BatchLoader(load_many, window=60, max_batch=2)
+
+    async def scenario():
+        return await asyncio.wait_for(asyncio.gather(loader.load(1), loader.load(2)), timeout=1)
+
+    assert asyncio.run(scenario()) == ["book 1", "book 2"]
+    assert load_many.calls == [[1, 2]]
+
+
+# Запити після вікна йдуть окремим пакетом
+def test_loads_after_window_form_new_batch():
+    load_many = RecordingLoader()
+    loader = BatchLoader(load_many, window=0.001)
+
+    async def scenario():
+        await loader.load(1)
+        await loader.load(2)
+
+    asyncio.run(scenario())
+    assert load_many.calls == [[1], [2]]
+
+
+# Помилка завантаження передається всім, хто чекає
+def test_errors_reach_every_caller():
+    loader = BatchLoader(RecordingLoader(fail=True), window=0.01)
+
+    async def scenario():
+        return await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,43 @@
+import hashlib
+import pytest
+from src.utils.bloom_filter import BloomFilter
+
+
+def _key(i):
+    return hashlib.sha256(str(i).encode()).digest()
+
+
+# Додані ключі завжди знаходяться
+def test_added_keys_are_found():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(_key(i))
+
+    assert all(_key(i) in bloom for i in range(1000))
+    assert len(bloom) == 1000
+
+
+# Частка хибнопозитивних відповідей близька до заданої
+def test_false_positive_rate():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(_key(i))
+
+    false_positives = sum(_key(i) in bloom for i in range(1000, 21000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_empty_filter_and_stats():
+    bloom = BloomFilter(capacity=100000, error_rate=0.001)
+
+    assert _key(1) not in bloom
+    stats = bloom.stats()
+    assert stats["keys"] == 0
+    assert 170000 < stats["memory_bytes"] < 190000
+    assert stats["num_hashes"] == 10
+
+
+@pytest.mark.parametrize("capacity, error_rate", [(0, 0.01), (10, 0), (10, 1)])
+def test_invalid_parameters(capacity, error_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(capacity, error_rate)
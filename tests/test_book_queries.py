@@ -1,79 +1,34 @@
+import asyncio
 import pytest
 import uuid
-from src.db.book_queries import create_book, get_book_by_title, get_book, update_book, delete_book
+from src.db.book_queries import get_book
+from src.db.async_book_queries import create_book_with_author, update_book_with_author, delete_book
 from src.db.connections import get_db_connection
 
 
-# Фікстура для створення автора в таблиці authors
-@pytest.fixture(scope="module")
-def create_author():
-    author_name = "J.K. Rowling"
-    
-    # Перевіряємо, чи вже є автор з таким іменем
-    with get_db_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT id FROM authors WHERE name = %s", (author_name,))
-            existing_author = cursor.fetchone()
-            if existing_author:
-                author_id = existing_author[0]
-            else:
-                # Якщо автора нема, створюємо нового
-                cursor.execute("INSERT INTO authors (name) VALUES (%s) RETURNING id", (author_name,))
-                author_id = cursor.fetchone()[0]
-                conn.commit()
-            yield author_id
-            # Очистка після тестів
-            if not existing_author:
-                cursor.execute("DELETE FROM authors WHERE id = %s", (author_id,))
-                conn.commit()
-
-
 # Тест на створення книги
-def test_create_book(create_author):
+def test_create_book():
     title = f"Harry Potter and the Philosopher's Stone {uuid.uuid4()}"
-    published_year = 1997
-    genre = "Fantasy"
-    author_id = create_author
 
     # Створюємо книгу
-    book_id = create_book(title, published_year, genre, author_id)
+    book = run(create_book_with_author(title, 1997, "Fantasy", "J.K. Rowling"))
 
     # Перевіряємо, чи книга була успішно створена
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
-            cursor.execute("SELECT id, title, published_year, genre, author_id FROM books WHERE id = %s", (book_id,))
-            book = cursor.fetchone()
-            assert book is not None
-            assert book[1] == title  # title
-            assert book[2] == published_year  # published_year
-            assert book[3] == genre  # genre
-            assert book[4] == author_id  # author_id
-
-
-# Тест на отримання книги за назвою
-def test_get_book_by_title(create_author):
-    title = f"Harry Potter and the Philosopher's Stone {uuid.uuid4()}"
-    published_year = 1997
-    genre = "Fantasy"
-    author_id = create_author
-
-    book_id = create_book(title, published_year, genre, author_id)
-
-    # Перевіряємо отримання книги за назвою
-    book = get_book_by_title(title)
-    assert book is not None
-    assert book['id'] == book_id
-    assert book['title'] == title
+            cursor.execute("SELECT id, title, published_year, genre, author_id FROM books WHERE id = %s", (book["id"],))
+            row = cursor.fetchone()
+            assert row is not None
+            assert row[1] == title  # title
+            assert row[2] == 1997  # published_year
+            assert row[3] == "Fantasy"  # genre
+            assert row[4] == _author_id("J.K. Rowling")  # author_id
 
 
 # Тест на отримання книги за ID
-def test_get_book(create_author):
+def test_get_book():
     title = f"Harry Potter and the Philosopher's Stone {uuid.uuid4()}"
-    published_year = 1997
-    genre = "Fantasy"
-    author_id = create_author
-
-    book_id = create_book(title, published_year, genre, author_id)
+    book_id = run(create_book_with_author(title, 1997, "Fantasy", "J.K. Rowling"))["id"]
 
     # Перевіряємо отримання книги за ID
     book = get_book(book_id)
@@ -84,39 +39,30 @@ def test_get_book(create_author):
 
 
 # Тест на оновлення книги
-def test_update_book(create_author):
+def test_update_book():
     title = f"Harry Potter and the Philosopher's Stone {uuid.uuid4()}"
-    published_year = 1997
-    genre = "Fantasy"
-    author_id = create_author
-
-    book_id = create_book(title, published_year, genre, author_id)
+    book_id = run(create_book_with_author(title, 1997, "Fantasy", "J.K. Rowling"))["id"]
+    get_book(book_id)
 
     new_title = f"Harry Potter and the Chamber of Secrets {uuid.uuid4()}"
-    new_published_year = 1998
-    new_genre = "Fantasy"
 
     # Оновлюємо книгу
-    update_book(book_id, new_title, new_published_year, new_genre, author_id)
+    run(update_book_with_author(book_id, new_title, 1998, "Fantasy", "J.K. Rowling"))
 
-    # Перевіряємо, чи книга була оновлена
+    # Перевіряємо, чи книга була оновлена (і кеш не віддає старі дані)
     updated_book = get_book(book_id)
     assert updated_book['title'] == new_title
-    assert updated_book['published_year'] == new_published_year
-    assert updated_book['genre'] == new_genre
+    assert updated_book['published_year'] == 1998
+    assert updated_book['genre'] == "Fantasy"
 
 
 # Тест на видалення книги
-def test_delete_book(create_author):
+def test_delete_book():
     title = f"Harry Potter and the Philosopher's Stone {uuid.uuid4()}"
-    published_year = 1997
-    genre = "Fantasy"
-    author_id = create_author
-
-    book_id = create_book(title, published_year, genre, author_id)
+    book_id = run(create_book_with_author(title, 1997, "Fantasy", "J.K. Rowling"))["id"]
 
     # Видаляємо книгу
-    delete_book(book_id)
+    run(delete_book(book_id))
 
     # Перевіряємо, чи книга була видалена
     with get_db_connection() as conn:
@@ -124,3 +70,68 @@ def test_delete_book(create_author):
             cursor.execute("SELECT id FROM books WHERE id = %s", (book_id,))
             book = cursor.fetchone()
             assert book is None
+    with pytest.raises(ValueError):
+        get_book(book_id)
+
+
+def _author_id(name):
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id FROM authors WHERE name = %s", (name,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# Книга і новий автор створюються одним запитом
+def test_create_book_with_author():
+    title = f"Single Statement {uuid.uuid4()}"
+    author_name = f"Author {uuid.uuid4()}"
+
+    book = run(create_book_with_author(title, 2001, "Fiction", author_name))
+
+    assert book["title"] == title
+    assert book["author"] == author_name
+    assert get_book(book["id"])["author"] == author_name
+    assert _author_id(author_name) is not None
+
+    # Наявний автор використовується повторно
+    other = run(create_book_with_author(f"{title} II", 2002, "Fiction", author_name))
+    assert get_book(other["id"])["author_id"] == _author_id(author_name)
+
+
+# Книга з наявною назвою не створюється, і новий автор не залишається в базі
+def test_create_book_with_author_title_conflict():
+    title = f"Single Statement {uuid.uuid4()}"
+    run(create_book_with_author(title, 2001, "Fiction", f"Author {uuid.uuid4()}"))
+
+    orphan = f"Author {uuid.uuid4()}"
+    assert run(create_book_with_author(title, 2001, "Fiction", orphan)) is None
+    assert _author_id(orphan) is None
+
+
+# Часткове оновлення змінює лише передані поля
+def test_update_book_with_author():
+    title = f"Single Statement {uuid.uuid4()}"
+    book = run(create_book_with_author(title, 2001, "Fiction", f"Author {uuid.uuid4()}"))
+    new_author = f"Author {uuid.uuid4()}"
+
+    updated = run(update_book_with_author(book["id"], published_year=2005, author_name=new_author))
+
+    assert updated == {"id": book["id"], "title": title, "published_year": 2005, "genre": "Fiction", "author": new_author}
+    assert get_book(book["id"])["author_id"] == _author_id(new_author)
+    assert get_book(book["id"])["published_year"] == 2005
+
+
+def test_update_book_with_author_not_found_or_conflict():
+    assert run(update_book_with_author(-1, title="Missing")) is None
+
+    first = run(create_book_with_author(f"Single Statement {uuid.uuid4()}", 2001, "Fiction", "Shared Author"))
+    second = run(create_book_with_author(f"Single Statement {uuid.uuid4()}", 2001, "Fiction", "Shared Author"))
+    orphan = f"Author {uuid.uuid4()}"
+    with pytest.raises(ValueError, match="already exists"):
+        run(update_book_with_author(second["id"], title=first["title"], author_name=orphan))
+    assert _author_id(orphan) is None
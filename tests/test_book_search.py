@@ -0,0 +1,93 @@
+import asyncio
+import uuid
+import pytest
+from src.db.init_db import init_db
+from src.db.connections import get_db_connection
+import src.db.async_book_queries as async_book_queries
+from src.db.async_book_queries import search_books
+
+
+@pytest.fixture
+def catalogue():
+    init_db(retries=1)
+    tag = uuid.uuid4().hex[:8]
+    books = [
+        (f"Zorvex Chronicles {tag}", 1954, "Fantasy", f"Ilvarra Quenn {tag}"),
+        (f"Zorvex Returns {tag}", 1990, "Fantasy", f"Ilvarra Quenn {tag}"),
+        (f"Harbour Lights {tag}", 1990, "History", f"Zorvex Dalmar {tag}"),
+        (f"Quiet Rooms {tag}", 2001, "Science", f"Pell Odrin {tag}"),
+    ]
+    ids = {}
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            for title, year, genre, author in books:
+                cursor.execute("INSERT INTO authors (name) VALUES (%s) ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name RETURNING id", (author,))
+                author_id = cursor.fetchone()[0]
+                cursor.execute(
+                    "INSERT INTO books (title, published_year, genre, author_id) VALUES (%s, %s, %s, %s) RETURNING id",
+                    (title, year, genre, author_id),
+                )
+                ids[title.split()[0] + title.split()[1]] = cursor.fetchone()[0]
+            conn.commit()
+    yield tag, ids
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM books WHERE id = ANY(%s)", (list(ids.values()),))
+            cursor.execute("DELETE FROM authors WHERE name LIKE %s", (f"% {tag}",))
+            conn.commit()
+
+
+def search(*args, **kwargs):
+    return asyncio.run(search_books(*args, **kwargs))
+
+
+# Слова запиту шукаються як префікси в назві та імені автора, назви важать більше
+def test_prefix_match_on_title_and_author(catalogue):
+    tag, ids = catalogue
+    found = [book["id"] for book in search(f"zorv {tag}")]
+    assert set(found) == {ids["ZorvexChronicles"], ids["ZorvexReturns"], ids["HarbourLights"]}
+    assert found[-1] == ids["HarbourLights"]
+
+    by_author = search(f"ilvar quen {tag}")
+    assert {book["id"] for book in by_author} == {ids["ZorvexChronicles"], ids["ZorvexReturns"]}
+    assert by_author[0]["author"] == f"Ilvarra Quenn {tag}"
+
+
+# Фільтри за жанром і роком звужують результати
+def test_genre_and_year_filters(catalogue):
+    tag, ids = catalogue
+    assert [book["id"] for book in search(f"zorvex {tag}", genre="History")] == [ids["HarbourLights"]]
+    found = search(f"zorvex {tag}", year_from=1980, year_to=1995)
+    assert {book["id"] for book in found} == {ids["ZorvexReturns"], ids["HarbourLights"]}
+
+
+# Сторінки за ключем (релевантність, id) не повторюють і не пропускають книг
+def test_keyset_pagination(catalogue):
+    tag, _ = catalogue
+    everything = search(f"zorvex {tag}", limit=10)
+    first = search(f"zorvex {tag}", limit=2)
+    last = first[-1]
+    second = search(f"zorvex {tag}", limit=2, after=(last["rank"], last["id"]))
+    assert [book["id"] for book in first + second] == [book["id"] for book in everything]
+
+
+# Перейменування автора оновлює пошуковий вектор його книг
+def test_author_rename_reindexes_books(catalogue):
+    tag, ids = catalogue
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE authors SET name = %s WHERE name = %s", (f"Pell Marrowind {tag}", f"Pell Odrin {tag}"))
+            conn.commit()
+    assert [book["id"] for book in search(f"marrow {tag}")] == [ids["QuietRooms"]]
+
+
+def test_query_without_words_rejected():
+    with pytest.raises(ValueError):
+        search("&& !!")
+
+
+# Без pg_trgm пошук не падає, а працює лише за повнотекстовим індексом
+def test_search_without_trigram(catalogue, monkeypatch):
+    tag, ids = catalogue
+    monkeypatch.setattr(async_book_queries, "_trigram_search", False)
+    assert [book["id"] for book in search(f"harb {tag}")] == [ids["HarbourLights"]]
@@ -4,6 +4,11 @@ from src.main import app
 from src.utils.auth_utils import create_access_token
 from datetime import timedelta
 from psycopg2 import IntegrityError
+import json
+import csv
+import io
+from src.utils.concurrency_limit import export_slots
+import src.routes.book_routes as book_routes
 
 client = TestClient(app)
 
@@ -173,3 +178,231 @@ def test_delete_book_not_found(token):
     headers = {"Authorization": f"Bearer {token}"}
     response = client.delete("api/v1/books/delete_book/999", headers=headers)
     assert response.status_code == 404
+
+# 6. Тести для пакетних ендпоінтів /books/batch
+def test_create_books_batch(create_books, test_db_conn, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    batch = {"books": [
+        {"title": "Batch One", "published_year": 2001, "genre": "Fiction", "author": "Author A"},
+        {"title": "Book A", "published_year": 2001, "genre": "Fiction", "author": "Conflict Author"},
+        {"title": "Batch Two", "published_year": 2002, "genre": "Science", "author": "Batch Author"},
+        {"title": "Batch One", "published_year": 2003, "genre": "Fiction", "author": "Author A"},
+    ]}
+    response = client.post("api/v1/books/batch", json=batch, headers=headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["created", "conflict", "created", "conflict"]
+    assert results[2]["book"]["author"] == "Batch Author"
+    assert results[0]["book"]["id"] == results[0]["id"]
+    # Автор конфліктного елемента не створюється
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM authors ORDER BY name")
+        assert [row["name"] for row in cursor.fetchall()] == ["Author A", "Batch Author"]
+
+def test_create_books_batch_validates_items(token):
+    headers = {"Authorization": f"Bearer {token}"}
+    batch = {"books": [{"title": "Bad Genre", "published_year": 2001, "genre": "Cooking", "author": "Author A"}]}
+    response = client.post("api/v1/books/batch", json=batch, headers=headers)
+    assert response.status_code == 422
+
+def test_update_books_batch(create_books, test_db_conn, token):
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("SELECT id, title FROM books ORDER BY title")
+        ids = {row["title"]: row["id"] for row in cursor.fetchall()}
+    headers = {"Authorization": f"Bearer {token}"}
+    batch = {"books": [
+        {"id": ids["Book A"], "title": "Book A2", "author": "New Author"},
+        {"id": ids["Book B"], "title": "Book A2"},
+        {"id": 999999, "published_year": 2000},
+        {"id": ids["Book B"], "genre": "History"},
+    ]}
+    response = client.put("api/v1/books/batch", json=batch, headers=headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["updated", "conflict", "not_found", "conflict"]
+    assert results[0]["book"] == {"id": ids["Book A"], "title": "Book A2", "published_year": 2021, "genre": "Fiction", "author": "New Author"}
+
+def test_delete_books_batch(create_books, test_db_conn, token):
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("SELECT id FROM books ORDER BY title")
+        ids = [row["id"] for row in cursor.fetchall()]
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.request("DELETE", "api/v1/books/batch", json={"ids": ids + [999999]}, headers=headers)
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["deleted", "deleted", "not_found"]
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS n FROM books")
+        assert cursor.fetchone()["n"] == 0
+
+# 7. Тести для ендпоінту GET /books/get_many
+def test_get_many_books(create_books, test_db_conn):
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("SELECT id, title FROM books ORDER BY title")
+        ids = [row["id"] for row in cursor.fetchall()]
+    response = client.get(f"api/v1/books/get_many?ids={ids[1]},999999,{ids[0]}")
+    assert response.status_code == 200
+    assert [book["title"] for book in response.json()] == ["Book B", "Book A"]
+
+def test_get_many_books_invalid_ids():
+    response = client.get("api/v1/books/get_many?ids=1,abc")
+    assert response.status_code == 400
+
+# 8. Тести для ендпоінту POST /books/import
+IMPORT_ROWS = [
+    {"title": "Import One", "published_year": 2001, "genre": "Fiction", "author": "Import Author"},
+    {"title": "Book A", "published_year": 2002, "genre": "Fiction", "author": "Dup"},
+    {"title": "Import One", "published_year": 2003, "genre": "Science", "author": "Second Dup"},
+    {"title": "Bad Genre", "published_year": 2004, "genre": "Cooking", "author": "Invalid Author"},
+    {"title": "Bad Year", "published_year": "soon", "genre": "Fiction", "author": "Invalid Author"},
+    {"title": "Import Two", "published_year": 2005, "genre": "History", "author": "Author A"},
+]
+
+def _import_headers(user_id):
+    # Окремий користувач на тест, щоб не впертися в ліміт запитів ендпоінту
+    token = create_access_token(username=f"importer{user_id}", user_id=user_id, expires_delta=timedelta(minutes=30))
+    return {"Authorization": f"Bearer {token}"}
+
+def _author_names(test_db_conn):
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM authors ORDER BY name")
+        names = [row["name"] for row in cursor.fetchall()]
+    test_db_conn.commit()
+    return names
+
+def _csv(rows):
+    lines = ["title,published_year,genre,author"]
+    lines += [f"{row['title']},{row['published_year']},{row['genre']},{row['author']}" for row in rows]
+    return "\n".join(lines).encode("utf-8")
+
+@pytest.mark.parametrize("filename, content, user_id", [
+    ("books.json", json.dumps(IMPORT_ROWS).encode("utf-8"), 101),
+    ("books.ndjson", "\n".join(json.dumps(row) for row in IMPORT_ROWS).encode("utf-8"), 102),
+    ("books.csv", _csv(IMPORT_ROWS), 103),
+])
+def test_import_books(create_book_in_db, test_db_conn, filename, content, user_id):
+    response = client.post("api/v1/books/import", files={"file": (filename, content)}, headers=_import_headers(user_id))
+    assert response.status_code == 201
+    body = response.json()
+    assert body["imported"] == ["Import One", "Import Two"]
+    assert body["skipped"] == ["Book A", "Import One", "Bad Genre", "Bad Year"]
+
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("SELECT b.title, b.published_year, a.name AS author FROM books b JOIN authors a ON a.id = b.author_id ORDER BY b.title")
+        books = cursor.fetchall()
+    assert [(b["title"], b["published_year"], b["author"]) for b in books] == [
+        ("Book A", 2021, "Author A"),
+        ("Import One", 2001, "Import Author"),
+        ("Import Two", 2005, "Author A"),
+    ]
+    # Пропущені рядки не залишають авторів без книг
+    assert _author_names(test_db_conn) == ["Author A", "Import Author"]
+
+def test_import_books_empty_and_unsupported(test_db_conn):
+    headers = _import_headers(104)
+    response = client.post("api/v1/books/import", files={"file": ("books.json", b"[]")}, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["imported"] == [] and response.json()["skipped"] == []
+
+    response = client.post("api/v1/books/import", files={"file": ("books.xml", b"<books/>")}, headers=headers)
+    assert response.status_code == 400
+    assert _author_names(test_db_conn) == []
+
+# Рядки з відсутніми, порожніми чи нетекстовими полями пропускаються, а не ламають імпорт
+def test_import_books_malformed_rows(test_db_conn):
+    rows = [
+        {"published_year": 2001, "genre": "Fiction", "author": "Import Author"},
+        {"title": "No Author", "published_year": 2001, "genre": "Fiction", "author": None},
+        {"title": 42, "published_year": 2001, "genre": "Fiction", "author": "Import Author"},
+        {"title": "Numeric Genre", "published_year": 2001, "genre": 7, "author": "Import Author"},
+        {"title": "Import Ok", "published_year": 2001, "genre": "Fiction", "author": "Import Author"},
+    ]
+    response = client.post(
+        "api/v1/books/import", files={"file": ("books.json", json.dumps(rows).encode("utf-8"))}, headers=_import_headers(105)
+    )
+    assert response.status_code == 201
+    assert response.json()["imported"] == ["Import Ok"]
+    assert response.json()["skipped"] == ["row 1", "No Author", "row 3", "Numeric Genre"]
+
+    # У CSV короткий рядок дає None у відсутніх колонках
+    content = b"title,published_year,genre,author\nShort Row,2001\n"
+    response = client.post("api/v1/books/import", files={"file": ("books.csv", content)}, headers=_import_headers(105))
+    assert response.status_code == 201
+    assert response.json()["skipped"] == ["Short Row"]
+    assert _author_names(test_db_conn) == ["Import Author"]
+
+# Після помилки парсера збережені пакети лишаються, а відповідь 400 їх перелічує
+@pytest.mark.parametrize("filename, content, user_id", [
+    ("books.ndjson", ("\n".join(json.dumps(row) for row in IMPORT_ROWS[:3]) + "\n{not json\n").encode("utf-8"), 106),
+    ("books.json", json.dumps(IMPORT_ROWS[:3]).encode("utf-8")[:-1] + b", {\"title\": ", 107),
+])
+def test_import_books_stops_at_parse_error(monkeypatch, create_book_in_db, test_db_conn, filename, content, user_id):
+    monkeypatch.setattr(book_routes, "IMPORT_BATCH_SIZE", 2)
+    response = client.post("api/v1/books/import", files={"file": (filename, content)}, headers=_import_headers(user_id))
+    assert response.status_code == 400
+    body = response.json()
+    assert body["detail"].startswith("Import stopped after row 3")
+    assert body["imported"] == ["Import One"]
+    assert body["skipped"] == ["Book A", "Import One"]
+
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("SELECT title FROM books ORDER BY title")
+        assert [row["title"] for row in cursor.fetchall()] == ["Book A", "Import One"]
+    test_db_conn.commit()
+
+# 9. Тести для ендпоінту GET /books/export
+def _export_books(test_db_conn, count):
+    with test_db_conn.cursor() as cursor:
+        cursor.execute("INSERT INTO authors (name) VALUES ('Export Author') RETURNING id")
+        author_id = cursor.fetchone()["id"]
+        for number in range(count):
+            cursor.execute(
+                "INSERT INTO books (title, published_year, genre, author_id) VALUES (%s, %s, 'History', %s)",
+                (f"Export {number:03d}", 1900 + number, author_id),
+            )
+    test_db_conn.commit()
+
+def test_export_books_formats(test_db_conn):
+    _export_books(test_db_conn, 5)
+    headers = _import_headers(201)
+    titles = [f"Export {number:03d}" for number in range(5)]
+
+    response = client.get("api/v1/books/export?format=json", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert [book["title"] for book in response.json()["books"]] == titles
+    assert response.json()["books"][0]["author"] == "Export Author"
+
+    response = client.get("api/v1/books/export?format=csv&sort_by=published_year&limit=3", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == "attachment; filename=books.csv"
+    assert [row["title"] for row in csv.DictReader(io.StringIO(response.text))] == titles[:3]
+
+    response = client.get("api/v1/books/export?format=ndjson&skip=3", headers=headers)
+    assert response.status_code == 200
+    assert [json.loads(line)["title"] for line in response.text.splitlines()] == titles[3:]
+    # Після завершення потоку слот експорту звільняється
+    assert export_slots.in_use == 0
+
+def test_export_books_requires_auth_and_valid_params():
+    response = client.get("api/v1/books/export")
+    assert response.status_code == 401
+
+    headers = _import_headers(202)
+    assert client.get("api/v1/books/export?format=xml", headers=headers).status_code == 400
+    assert client.get("api/v1/books/export?limit=0", headers=headers).status_code == 422
+    assert client.get("api/v1/books/export?limit=100000000", headers=headers).status_code == 422
+
+# Коли всі слоти зайняті, експорт відхиляється з 503
+def test_export_books_concurrency_cap(test_db_conn, monkeypatch):
+    _export_books(test_db_conn, 1)
+    monkeypatch.setattr(export_slots, "slots", 1)
+    release = export_slots.acquire()
+    try:
+        response = client.get("api/v1/books/export", headers=_import_headers(203))
+        assert response.status_code == 503
+        assert response.headers["retry-after"]
+    finally:
+        release()
+    response = client.get("api/v1/books/export", headers=_import_headers(203))
+    assert response.status_code == 200
+    assert export_slots.in_use == 0
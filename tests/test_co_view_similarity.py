@@ -0,0 +1,41 @@
+import numpy as np
+from src.utils.co_view_similarity import top_k_neighbours
+
+
+# Косинусна схожість за спільними переглядами, найкращі сусіди першими
+def test_cosine_scores_and_order():
+    users = [1, 1, 2, 2, 3, 3, 3]
+    books = [10, 20, 10, 20, 10, 20, 30]
+    book_ids, neighbour_ids, scores = top_k_neighbours(users, books, k=5)
+
+    pairs = {(b, n): s for b, n, s in zip(book_ids, neighbour_ids, scores)}
+    assert np.isclose(pairs[(10, 20)], 1.0)
+    assert np.isclose(pairs[(10, 30)], 1 / np.sqrt(3))
+    assert list(neighbour_ids[book_ids == 10]) == [20, 30]
+    assert (10, 10) not in pairs
+
+
+# Для кожної книги зберігається не більше k сусідів, нічиї за id
+def test_top_k_limit_and_tie_break():
+    users = [1, 1, 1, 1]
+    books = [10, 40, 30, 20]
+    book_ids, neighbour_ids, _ = top_k_neighbours(users, books, k=2)
+    assert list(neighbour_ids[book_ids == 10]) == [20, 30]
+    assert np.bincount(book_ids).max() == 2
+
+
+# Повторні перегляди не збільшують схожість, поріг відсікає випадкові пари
+def test_duplicates_and_min_co_views():
+    users = [1, 1, 1, 2, 2]
+    books = [10, 10, 20, 10, 30]
+    book_ids, neighbour_ids, scores = top_k_neighbours(users, books, k=5)
+    assert scores.max() <= 1.0 + 1e-9
+
+    book_ids, _, _ = top_k_neighbours(users, books, k=5, min_co_views=2)
+    assert book_ids.size == 0
+
+
+# Порожня історія дає порожній результат
+def test_empty_history():
+    book_ids, neighbour_ids, scores = top_k_neighbours([], [])
+    assert book_ids.size == neighbour_ids.size == scores.size == 0
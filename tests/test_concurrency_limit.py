@@ -0,0 +1,127 @@
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from src.utils.concurrency_limit import AdaptiveLimit, ConcurrencyLimiter, ConcurrencyLimitMiddleware
+
+
+# Запити понад ліміт чекають у черзі, а коли черга повна — відхиляються
+def test_queue_and_handoff():
+    limit = AdaptiveLimit("books", initial=1, min_limit=1, queue_size=1, queue_timeout=1.0)
+
+    async def scenario():
+        assert await limit.acquire() is True
+        waiting = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0)
+        rejected = await limit.acquire()
+        depth = limit.stats()["queue_depth"]
+        limit.release(time.monotonic(), 0.01)
+        return rejected, depth, await waiting
+
+    rejected, depth, handed_over = asyncio.run(scenario())
+    assert rejected is False
+    assert depth == 1
+    assert handed_over is True
+    stats = limit.stats()
+    assert stats["in_flight"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["accepted"] == 2
+    assert stats["rejected"] == 1
+
+
+def test_queue_timeout():
+    limit = AdaptiveLimit("books", initial=1, min_limit=1, queue_size=5, queue_timeout=0.01)
+
+    async def scenario():
+        await limit.acquire()
+        return await limit.acquire()
+
+    assert asyncio.run(scenario()) is False
+    assert limit.stats()["queue_depth"] == 0
+
+
+# Повільні відповіді зменшують ліміт, швидкі під навантаженням — поступово збільшують
+def test_aimd_adjusts_limit():
+    limit = AdaptiveLimit("books", initial=10, min_limit=2, max_limit=20, tolerance=2.0, backoff=0.5, queue_size=0)
+
+    async def fill():
+        for _ in range(10):
+            await limit.acquire()
+
+    asyncio.run(fill())
+    started = time.monotonic()
+    limit.release(started, 0.01)
+    limit.release(started, 0.5)
+    assert limit.stats()["limit"] == 5
+    # Запит, що почався до зменшення, не зменшує ліміт удруге
+    limit.release(started, 0.5)
+    assert limit.stats()["limit"] == 5
+    assert limit.stats()["decreases"] == 1
+
+    for _ in range(7):
+        limit.release(time.monotonic(), 0.01)
+    assert limit.stats()["in_flight"] == 0
+    grown = limit.limit
+
+    async def loaded():
+        for _ in range(5):
+            await limit.acquire()
+        for _ in range(5):
+            limit.release(time.monotonic(), 0.01)
+
+    asyncio.run(loaded())
+    assert limit.limit > grown
+
+
+def test_group_for_path():
+    limiter = ConcurrencyLimiter({"/api/v1/books": "books", "/api/v1/auth": "auth"})
+
+    assert limiter.group_for("/api/v1/books/get_book/1").name == "books"
+    assert limiter.group_for("/api/v1/auth/login").name == "auth"
+    assert limiter.group_for("/api/v1/booksellers") is None
+    assert limiter.group_for("/docs") is None
+
+
+# Middleware повертає 503 з Retry-After, коли група перевантажена
+def test_middleware_sheds_load():
+    limiter = ConcurrencyLimiter({"/slow": "slow"}, per_client=0, initial=1, min_limit=1, queue_size=0)
+    app = FastAPI()
+    app.add_middleware(ConcurrencyLimitMiddleware, limiter=limiter, retry_after=3)
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/other")
+    async def other():
+        return {"ok": True}
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/slow"))
+            while limiter.groups["slow"].in_flight == 0:
+                await asyncio.sleep(0.001)
+            shed = await client.get("/slow")
+            unlimited = await client.get("/other")
+            release.set()
+            return await first, shed, unlimited
+
+    first, shed, unlimited = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "3"
+    assert unlimited.status_code == 200
+    assert limiter.stats()["groups"]["slow"]["in_flight"] == 0
+
+
+def test_per_client_cap():
+    limiter = ConcurrencyLimiter({"/api": "api"}, per_client=1)
+
+    assert limiter.enter_client("ip:1") is True
+    assert limiter.enter_client("ip:1") is False
+    assert limiter.enter_client("ip:2") is True
+    limiter.leave_client("ip:1")
+    assert limiter.enter_client("ip:1") is True
+    assert limiter.stats()["client_rejected"] == 1
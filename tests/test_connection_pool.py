@@ -0,0 +1,88 @@
+import time
+import pytest
+from src.dependencies import DATABASE_URL
+from src.db.connections import ConnectionPool, PoolTimeout
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool(DATABASE_URL, min_size=1, max_size=2, timeout=0.2, health_check_interval=0)
+    pool.open()
+    yield pool
+    pool.close()
+
+
+def backend_pid(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+# Підключення повторно використовується, а не відкривається заново
+def test_connection_is_reused(pool):
+    conn = pool.getconn()
+    pid = backend_pid(conn)
+    pool.putconn(conn)
+
+    conn = pool.getconn()
+    assert backend_pid(conn) == pid
+    pool.putconn(conn)
+
+    assert pool.stats()["connections_created"] == 1
+    assert pool.stats()["checkouts"] == 3
+
+
+# Незавершена транзакція відкочується при поверненні в пул
+def test_open_transaction_rolled_back_on_return(pool):
+    conn = pool.getconn()
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    conn.autocommit = False
+    with conn.cursor() as cursor:
+        cursor.execute("CREATE TEMP TABLE pool_probe (id INT)")
+    pool.putconn(conn)
+
+    conn = pool.getconn()
+    assert conn.autocommit is False
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('pg_temp.pool_probe')")
+        assert cursor.fetchone()[0] is None
+    pool.putconn(conn)
+
+
+# Вичерпаний пул повертає PoolTimeout після очікування
+def test_checkout_times_out_when_exhausted(pool):
+    first = pool.getconn()
+    second = pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
+    pool.putconn(first)
+    pool.putconn(second)
+
+
+# Підключення старші за max_lifetime замінюються новими
+def test_connection_recycled_after_max_lifetime(pool):
+    pool.max_lifetime = 0.01
+    time.sleep(0.02)
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.stats()["recycled"] >= 1
+    assert pool.stats()["connections_created"] >= 2
+
+
+# Закрите підключення не видається повторно
+def test_closed_connection_discarded_on_checkout(pool):
+    conn = pool.getconn()
+    pool.putconn(conn)
+    pool._idle[-1][0].close()
+
+    conn = pool.getconn()
+    assert not conn.closed
+    assert backend_pid(conn)
+    assert pool.stats()["connections_created"] == 2
+    pool.putconn(conn)
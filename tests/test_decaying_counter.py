@@ -0,0 +1,74 @@
+import math
+from src.utils.decaying_counter import DecayingCounter
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+# Кожне вікно згасає зі своєю сталою часу
+def test_scores_decay_per_window():
+    clock = FakeClock()
+    counter = DecayingCounter(clock=clock)
+    counter.record([1, 1, 2])
+
+    assert counter.get(1) == {"1h": 2.0, "24h": 2.0, "7d": 2.0}
+    clock.now += 3600
+    scores = counter.get(1)
+    assert math.isclose(scores["1h"], 2 * math.exp(-1))
+    assert math.isclose(scores["24h"], 2 * math.exp(-1 / 24))
+    assert math.isclose(scores["7d"], 2 * math.exp(-1 / 168))
+
+
+# Найпопулярніші ключі першими, нічиї за ключем
+def test_top_orders_by_score():
+    clock = FakeClock()
+    counter = DecayingCounter(clock=clock)
+    counter.record([3, 2, 2, 1, 1])
+    clock.now += 60
+    counter.record([3, 3])
+
+    assert [key for key, _ in counter.top("1h", 3)] == [3, 1, 2]
+    assert [key for key, _ in counter.top("1h", 1)] == [3]
+
+
+# Після довгого простою значення перемасштабовуються без переповнення
+def test_long_running_counter_rebases():
+    clock = FakeClock()
+    counter = DecayingCounter(clock=clock)
+    counter.record([1])
+    clock.now += 3600 * 1000
+    counter.record([2])
+
+    assert counter.get(1)["1h"] == 0.0
+    assert math.isclose(counter.get(2)["1h"], 1.0)
+    assert math.isclose(counter.get(1)["7d"], math.exp(-1000 / 168))
+
+
+# drain повертає поточні значення і очищає лічильник, update додає їх назад
+def test_drain_and_update_round_trip():
+    clock = FakeClock()
+    counter = DecayingCounter(clock=clock)
+    counter.record([1, 2])
+    clock.now += 1800
+    drained = counter.drain()
+
+    assert len(counter) == 0
+    counter.update(drained)
+    assert math.isclose(counter.get(1)["1h"], math.exp(-0.5))
+
+
+# Згаслі ключі видаляються
+def test_prune_drops_decayed_keys():
+    clock = FakeClock()
+    counter = DecayingCounter(clock=clock)
+    counter.record([1])
+    clock.now += 604800 * 10
+    counter.record([2])
+
+    assert counter.prune(0.01) == 1
+    assert len(counter) == 1
@@ -0,0 +1,56 @@
+import io
+import csv
+import json
+import asyncio
+import pytest
+from src.utils.export_writers import json_array_chunks, ndjson_chunks, csv_chunks, EXPORT_FIELDNAMES
+
+BOOKS = [
+    {"id": 1, "title": "Book A", "published_year": 2021, "genre": "Fiction", "author_id": 3, "author": "Author A"},
+    {"id": 2, "title": "Книга, \"B\"", "published_year": 2020, "genre": "Non-Fiction", "author_id": 4, "author": "Автор B"},
+    {"id": 3, "title": "Book C", "published_year": 2019, "genre": "Science", "author_id": 3, "author": "Author A"},
+]
+
+
+async def _rows(books):
+    for book in books:
+        yield book
+
+
+def collect(encode, books, chunk_rows):
+    async def scenario():
+        return [chunk async for chunk in encode(_rows(books), chunk_rows=chunk_rows)]
+    return asyncio.run(scenario())
+
+
+# JSON-об'єкт з масивом книг, частинами по chunk_rows рядків
+@pytest.mark.parametrize("chunk_rows", [1, 2, 1000])
+def test_json_array_chunks(chunk_rows):
+    chunks = collect(json_array_chunks, BOOKS, chunk_rows)
+    assert json.loads("".join(chunks)) == {"books": BOOKS}
+    assert len(chunks) == len(BOOKS) // chunk_rows + 1
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 1000])
+def test_ndjson_chunks(chunk_rows):
+    chunks = collect(ndjson_chunks, BOOKS, chunk_rows)
+    assert [json.loads(line) for line in "".join(chunks).splitlines()] == BOOKS
+    assert len(chunks) == -(-len(BOOKS) // chunk_rows)
+
+
+# CSV з заголовком і екрануванням ком та лапок
+@pytest.mark.parametrize("chunk_rows", [1, 2, 1000])
+def test_csv_chunks(chunk_rows):
+    chunks = collect(csv_chunks, BOOKS, chunk_rows)
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert list(rows[0].keys()) == EXPORT_FIELDNAMES
+    assert [{key: row[key] for key in EXPORT_FIELDNAMES} for row in rows] == [
+        {key: str(book[key]) for key in EXPORT_FIELDNAMES} for book in BOOKS
+    ]
+
+
+# Порожній експорт усе одно є коректним документом
+def test_empty_exports():
+    assert json.loads("".join(collect(json_array_chunks, [], 10))) == {"books": []}
+    assert collect(ndjson_chunks, [], 10) == []
+    assert "".join(collect(csv_chunks, [], 10)).strip() == ",".join(EXPORT_FIELDNAMES)
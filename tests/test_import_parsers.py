@@ -0,0 +1,71 @@
+import io
+import json
+import pytest
+from src.utils.import_parsers import (
+    iter_csv_rows,
+    iter_ndjson_rows,
+    iter_json_array_rows,
+    iter_upload_rows,
+    iter_batches,
+)
+
+BOOKS = [
+    {"title": "Book A", "published_year": 2021, "genre": "Fiction", "author": "Author A"},
+    {"title": "Книга, \"B\"", "published_year": 2020, "genre": "Non-Fiction", "author": "Author B"},
+    {"title": "Book C", "published_year": 2019, "genre": "Science", "author": "Author A"},
+]
+
+
+# JSON-масив розбирається поелементно навіть при дуже малих чанках
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_json_array_rows(chunk_size):
+    stream = io.BytesIO(json.dumps(BOOKS, ensure_ascii=False, indent=2).encode("utf-8"))
+    assert list(iter_json_array_rows(stream, chunk_size=chunk_size)) == BOOKS
+
+
+def test_iter_json_array_rows_empty():
+    assert list(iter_json_array_rows(io.BytesIO(b"  [ ] "))) == []
+
+
+@pytest.mark.parametrize("content", [b'{"title": "Book A"}', b'[{"title": "Book A"}, ', b'[{"title": "Book A"} {"title": "B"}]', b"[1, 2]"])
+def test_iter_json_array_rows_invalid(content):
+    with pytest.raises(ValueError):
+        list(iter_json_array_rows(io.BytesIO(content), chunk_size=4))
+
+
+def test_iter_ndjson_rows():
+    content = "\n".join(json.dumps(book, ensure_ascii=False) for book in BOOKS) + "\n\n"
+    assert list(iter_ndjson_rows(io.BytesIO(content.encode("utf-8")))) == BOOKS
+
+
+# CSV з лапками та багаторядковими полями
+def test_iter_csv_rows():
+    content = 'title,published_year,genre,author\n"Book A",2021,Fiction,Author A\n"Multi\nline",2020,Science,"Author, B"\n'
+    rows = list(iter_csv_rows(io.BytesIO(content.encode("utf-8"))))
+    assert rows == [
+        {"title": "Book A", "published_year": "2021", "genre": "Fiction", "author": "Author A"},
+        {"title": "Multi\nline", "published_year": "2020", "genre": "Science", "author": "Author, B"},
+    ]
+
+
+def test_iter_upload_rows_rejects_unknown_extension():
+    with pytest.raises(ValueError):
+        iter_upload_rows("books.xml", io.BytesIO(b""))
+
+
+def test_iter_batches():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(iter_batches([], 2)) == []
+
+
+# Помилка парсера: спершу віддаються вже прочитані рядки, потім сама помилка
+def test_iter_batches_yields_rows_before_parse_error():
+    def rows():
+        yield from range(3)
+        raise ValueError("bad line")
+
+    batches = iter_batches(rows(), 2)
+    assert next(batches) == [0, 1]
+    assert next(batches) == [2]
+    with pytest.raises(ValueError, match="bad line"):
+        next(batches)
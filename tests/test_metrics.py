@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from src.main import app
+from src.routes.metrics_routes import StatsCollector
+from src.utils.metrics import timed_query, count_rows
+
+client = TestClient(app)
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+# Декоратор рахує виклики, рядки та помилки функцій запитів
+def test_timed_query_sync_and_async():
+    @timed_query
+    def metrics_sync_query(count):
+        if count < 0:
+            raise ValueError("negative")
+        return [{"id": i} for i in range(count)]
+
+    @timed_query
+    async def metrics_async_query(book_id):
+        return {"id": book_id}
+
+    assert metrics_sync_query(3) == [{"id": 0}, {"id": 1}, {"id": 2}]
+    with pytest.raises(ValueError):
+        metrics_sync_query(-1)
+    assert asyncio.run(metrics_async_query(7)) == {"id": 7}
+
+    assert _sample("db_query_duration_seconds_count", query="metrics_sync_query") == 2
+    assert _sample("db_query_rows_sum", query="metrics_sync_query") == 3
+    assert _sample("db_query_errors_total", query="metrics_sync_query") == 1
+    assert _sample("db_query_rows_sum", query="metrics_async_query") == 1
+    assert metrics_sync_query.__name__ == "metrics_sync_query"
+
+
+def test_count_rows():
+    assert count_rows(None) == 0
+    assert count_rows([1, 2]) == 2
+    assert count_rows({5, 6, 7}) == 3
+    assert count_rows({"id": 1, "title": "A"}) == 1
+
+
+# Вкладені статистики стають мітками, нечислові значення пропускаються
+def test_stats_collector():
+    collector = StatsCollector([
+        ("pool", lambda: {"checkouts": 4, "backend": "redis", "enabled": True}, None),
+        ("cache", lambda: {"book": {"hits": 2}, "author": {"hits": 1}}, "cache"),
+        ("limits", lambda: {"rejected": 1, "groups": {"books": {"limit": 20}}}, None),
+        ("broken", lambda: 1 / 0, None),
+    ])
+
+    samples = {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in collector.collect()
+        for sample in family.samples
+    }
+    assert samples == {
+        ("pool_checkouts", ()): 4,
+        ("cache_hits", (("cache", "book"),)): 2,
+        ("cache_hits", (("cache", "author"),)): 1,
+        ("limits_rejected", ()): 1,
+        ("limits_limit", (("group", "books"),)): 20,
+    }
+
+
+# Затримка запитів мітиться шаблоном маршруту, а не шляхом
+def test_metrics_endpoint():
+    before = _sample("http_request_duration_seconds_count", method="GET", route="/api/v1/books/get_many", status="400")
+    client.get("api/v1/books/get_many?ids=abc")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert _sample("http_request_duration_seconds_count", method="GET", route="/api/v1/books/get_many", status="400") == before + 1
+    assert "concurrency_limit{group=\"books\"}" in response.text
+    assert "cache_hit_ratio{cache=\"book\"}" in response.text
@@ -0,0 +1,91 @@
+import psycopg2
+import pytest
+from alembic import command
+from alembic.script import ScriptDirectory
+from src.db.init_db import get_alembic_config
+
+# Схема, яку створював init_db() до появи міграцій
+BASELINE_SQL = """
+CREATE TABLE users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(255) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE authors (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(255) UNIQUE NOT NULL
+);
+
+CREATE TABLE books (
+    id SERIAL PRIMARY KEY,
+    title VARCHAR(255) UNIQUE NOT NULL,
+    published_year INT NOT NULL,
+    genre VARCHAR(50) NOT NULL CHECK (genre IN (
+        'Fiction', 'Non-Fiction', 'Science', 'History', 'Fantasy',
+        'Biography', 'Romance', 'Thriller', 'Mystery', 'Philosophy'
+    )),
+    author_id INTEGER NOT NULL REFERENCES authors(id)
+);
+
+CREATE TABLE user_history (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    book_id INTEGER NOT NULL REFERENCES books(id),
+    action VARCHAR(50) CHECK (action IN ('viewed')) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO authors (name) VALUES ('Baseline Author');
+INSERT INTO books (title, published_year, genre, author_id)
+VALUES ('Baseline Book', 1999, 'History', (SELECT id FROM authors WHERE name = 'Baseline Author'));
+"""
+
+TABLES = {
+    "users", "authors", "books", "user_history", "book_neighbours",
+    "user_profiles", "book_stats", "book_trending", "revoked_tokens",
+}
+
+
+def query(url, sql):
+    conn = psycopg2.connect(url)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql)
+            return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def assert_at_head(url):
+    head = ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+    assert query(url, "SELECT version_num FROM alembic_version") == [(head,)]
+    tables = {row[0] for row in query(url, "SELECT tablename FROM pg_tables WHERE schemaname = 'public'")}
+    assert TABLES <= tables
+
+
+# Міграції створюють схему з нуля, повторний запуск нічого не змінює
+def test_upgrade_empty_database(scratch_db_url):
+    command.upgrade(get_alembic_config(scratch_db_url), "head")
+    assert_at_head(scratch_db_url)
+
+    command.upgrade(get_alembic_config(scratch_db_url), "head")
+    assert_at_head(scratch_db_url)
+
+
+# Стара БД без alembic_version оновлюється, дані зберігаються
+def test_upgrade_baseline_database(scratch_db_url):
+    conn = psycopg2.connect(scratch_db_url)
+    with conn.cursor() as cursor:
+        cursor.execute(BASELINE_SQL)
+    conn.commit()
+    conn.close()
+
+    command.upgrade(get_alembic_config(scratch_db_url), "head")
+
+    assert_at_head(scratch_db_url)
+    rows = query(
+        scratch_db_url,
+        "SELECT title, search_vector IS NOT NULL FROM books WHERE search_vector @@ plainto_tsquery('simple', 'baseline')",
+    )
+    assert rows == [("Baseline Book", True)]
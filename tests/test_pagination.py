@@ -0,0 +1,117 @@
+import uuid
+import pytest
+from datetime import timedelta
+from fastapi.testclient import TestClient
+from src.main import app
+from src.db.init_db import init_db
+from src.db.connections import get_db_connection
+from src.utils.auth_utils import create_access_token
+from src.utils.rate_limit import limiter
+from src.utils.pagination import encode_cursor, decode_cursor, SEARCH_SORT_KEY
+
+client = TestClient(app)
+
+
+# Токен продовження зберігає ключ сортування та id останньої книги
+@pytest.mark.parametrize("sort_by, value", [("title", "Кобзар"), ("published_year", 1840), ("author_id", 7)])
+def test_cursor_round_trip(sort_by, value):
+    book = {"id": 42, "title": "Кобзар", "published_year": 1840, "author_id": 7}
+    token = encode_cursor(sort_by, book)
+    assert "=" not in token
+    assert decode_cursor(token, sort_by) == (value, 42)
+
+
+def test_cursor_for_other_sort_key_rejected():
+    token = encode_cursor("published_year", {"id": 1, "published_year": 2000})
+    with pytest.raises(ValueError):
+        decode_cursor(token, "title")
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "WyJ0aXRsZSIsMSwxXQ", "WyJ0aXRsZSIsIkEiXQ"])
+def test_malformed_cursor_rejected(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, "title")
+
+
+# Токен пошуку зберігає релевантність як число з плаваючою комою без втрат
+def test_search_cursor_round_trip():
+    rank = 0.0607927106320858
+    token = encode_cursor(SEARCH_SORT_KEY, {"id": 5, SEARCH_SORT_KEY: rank})
+    assert decode_cursor(token, SEARCH_SORT_KEY) == (rank, 5)
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("author_id", {"id": 5, "author_id": 3}), SEARCH_SORT_KEY)
+
+
+# Фікстура: книги з однаковими роками й авторами, щоб порядок вирішував id
+@pytest.fixture
+def paged_books(monkeypatch):
+    init_db(retries=1)
+    # Сторінок більше, ніж дозволяє ліміт запитів
+    monkeypatch.setattr(limiter, "enabled", False)
+    tag = f"pagetag{uuid.uuid4().hex[:8]}"
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            author_ids = []
+            for name in ("First", "Second"):
+                cursor.execute("INSERT INTO authors (name) VALUES (%s) RETURNING id", (f"{name} {tag}",))
+                author_ids.append(cursor.fetchone()[0])
+            book_ids = []
+            for number in range(8):
+                cursor.execute(
+                    "INSERT INTO books (title, published_year, genre, author_id) VALUES (%s, %s, 'History', %s) RETURNING id",
+                    (f"{tag} volume {number % 3}{number}", 1990 + number % 2, author_ids[number % 2]),
+                )
+                book_ids.append(cursor.fetchone()[0])
+            conn.commit()
+
+            yield tag, book_ids
+
+            cursor.execute("DELETE FROM books WHERE id = ANY(%s)", (book_ids,))
+            cursor.execute("DELETE FROM authors WHERE id = ANY(%s)", (author_ids,))
+            conn.commit()
+
+
+def ordered_ids(sort_by):
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM books ORDER BY {sort_by}, id")
+            return [row[0] for row in cursor.fetchall()]
+
+
+def follow(path, params, pages_of, headers=None):
+    """Ідемо за X-Next-Cursor до останньої сторінки."""
+    ids, cursor = [], None
+    for _ in range(1000):
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200
+        ids += [book["id"] for book in pages_of(response)]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+    raise AssertionError("cursor did not reach the end")
+
+
+# Кожна книга повертається рівно один раз, у порядку сортування
+@pytest.mark.parametrize("sort_by", ["title", "published_year", "author_id"])
+def test_get_all_books_follows_cursor(paged_books, sort_by):
+    ids = follow("/api/v1/books/get_all_books", {"limit": 3, "sort_by": sort_by}, lambda response: response.json())
+    assert ids == ordered_ids(sort_by)
+    assert len(ids) == len(set(ids))
+
+
+def test_search_follows_cursor(paged_books):
+    tag, book_ids = paged_books
+    ids = follow("/api/v1/books/search", {"q": tag, "limit": 3}, lambda response: response.json())
+    # Однакова релевантність, тому порядок визначає id
+    assert ids == sorted(book_ids)
+
+
+@pytest.mark.parametrize("sort_by", ["title", "published_year", "author_id"])
+def test_export_follows_cursor(paged_books, sort_by):
+    headers = {"Authorization": f"Bearer {create_access_token('exporter', 301, timedelta(minutes=5))}"}
+    ids = follow(
+        "/api/v1/books/export", {"format": "json", "limit": 3, "sort_by": sort_by},
+        lambda response: response.json()["books"], headers,
+    )
+    assert ids == ordered_ids(sort_by)
+    assert len(ids) == len(set(ids))
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import pytest
+from src.utils.password_pool import PasswordWorkerPool, PasswordPoolSaturated
+from src.utils.auth_utils import hash_password_async, verify_password_async
+
+
+# Хешування та перевірка пароля через пул воркерів
+def test_hash_and_verify_async():
+    async def scenario():
+        hashed = await hash_password_async("test_password")
+        assert await verify_password_async("test_password", hashed) is True
+        assert await verify_password_async("wrong_password", hashed) is False
+
+    asyncio.run(scenario())
+
+
+# Переповнений пул відхиляє нові задачі замість того, щоб ставити їх у чергу
+def test_saturated_pool_rejects_work():
+    pool = PasswordWorkerPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.create_task(pool.run("hash", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(PasswordPoolSaturated):
+            await pool.run("hash", release.wait)
+        assert pool.stats()["queued"] == 1
+        release.set()
+        await asyncio.gather(*running)
+
+    asyncio.run(scenario())
+    pool.shutdown()
+
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["pending"] == 0
+    assert stats["operations"]["hash"]["calls"] == 2
@@ -0,0 +1,85 @@
+import random
+import pytest
+import src.utils.prefix_index as prefix_index
+from src.utils.prefix_index import PrefixIndex, PrefixIndexBuilder
+
+
+def titles(results):
+    return [text for _, text in results]
+
+
+# Пошук за префіксом без урахування регістру, в алфавітному порядку
+def test_prefix_search_ignores_case():
+    index = PrefixIndex.from_items([(1, "Кобзар"), (2, "кобза і ліра"), (3, "Енеїда"), (4, "The Hobbit")])
+    assert titles(index.search("КОБ")) == ["кобза і ліра", "Кобзар"]
+    assert titles(index.search("the h")) == ["The Hobbit"]
+    assert index.search("x") == []
+    assert len(index.search("", limit=2)) == 2
+
+
+# Додані, перейменовані й видалені записи враховуються до злиття
+def test_changes_before_merge():
+    index = PrefixIndex.from_items([(1, "Alpha"), (2, "Alpine"), (3, "Beta")])
+    index.add(4, "Alps")
+    index.add(2, "Gamma")
+    index.remove(1)
+
+    assert titles(index.search("al")) == ["Alps"]
+    assert titles(index.search("g")) == ["Gamma"]
+    assert len(index) == 3
+
+
+# Після злиття дельти в масиви результати не змінюються
+def test_delta_merged_into_arrays():
+    index = PrefixIndex.from_items([(i, f"Book {i:03d}") for i in range(100)], merge_threshold=5)
+    for i in range(100, 110):
+        index.add(i, f"Book {i:03d}")
+    index.remove(0)
+
+    assert index.stats()["delta"] <= 5
+    assert titles(index.search("book 10")) == [f"Book {i:03d}" for i in range(100, 110)]
+    assert titles(index.search("book 00", limit=3)) == ["Book 001", "Book 002", "Book 003"]
+    assert len(index) == 109
+
+
+# Зміни під час перебудови не губляться
+def test_changes_during_rebuild_are_replayed():
+    index = PrefixIndex.from_items([(1, "Old")])
+    index.begin_rebuild()
+    index.add(2, "New")
+    index.remove(1)
+    index.finish_rebuild(PrefixIndex.from_items([(1, "Old"), (3, "Other")]))
+
+    assert titles(index.search("")) == ["New", "Other"]
+
+
+# Запис у масивах займає свою довжину в UTF-8 плюс 16 байтів
+def test_compact_memory_footprint():
+    index = PrefixIndex.from_items([(i, f"Title number {i}") for i in range(100000)])
+    text_bytes = sum(len(f"Title number {i}") for i in range(100000))
+    assert index.stats()["memory_bytes"] <= text_bytes + 16 * 100000 + 8
+
+
+# Побудова частинами дає той самий індекс, навіть якщо id йдуть не по порядку
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_build_from_chunks(monkeypatch, shuffle):
+    monkeypatch.setattr(prefix_index, "BUILD_CHUNK_SIZE", 7)
+    items = [(i, f"Book {(i * 37) % 100:03d} {i}") for i in range(1, 101)]
+    if shuffle:
+        random.Random(1).shuffle(items)
+    index = PrefixIndex.from_items(items)
+
+    expected = sorted(items, key=lambda item: (item[1].casefold(), item[0]))
+    assert index.search("", limit=200) == expected
+    assert list(index._sorted_ids) == list(range(1, 101))
+    index.remove(50)
+    index.add(101, "Book 999")
+    assert len(index) == 100
+    assert titles(index.search("book 999")) == ["Book 999"]
+
+
+# Порожня побудова дає порожній індекс
+def test_build_empty():
+    index = PrefixIndexBuilder().build()
+    assert index.search("") == []
+    assert len(index) == 0
@@ -0,0 +1,56 @@
+import pytest
+from datetime import timedelta
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from starlette.requests import Request as StarletteRequest
+from src.utils.auth_utils import create_access_token
+from src.utils.rate_limit import parse_route_limits, rate_limit_key
+
+
+def _request(headers=None):
+    return StarletteRequest({
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": ("10.0.0.1", 1234),
+    })
+
+
+def test_parse_route_limits():
+    assert parse_route_limits("") == {}
+    assert parse_route_limits('{"books.search": "30/minute;500/hour"}') == {"books.search": "30/minute;500/hour"}
+    with pytest.raises(ValueError):
+        parse_route_limits('["books.search"]')
+    with pytest.raises(ValueError):
+        parse_route_limits('{"books.search": 30}')
+
+
+# Запити з дійсним токеном рахуються на користувача, решта — на IP
+def test_rate_limit_key():
+    token = create_access_token("limited_user", 42, timedelta(minutes=5))
+
+    assert rate_limit_key(_request({"Authorization": f"Bearer {token}"})) == "user:42"
+    assert rate_limit_key(_request({"Authorization": "Bearer not-a-token"})) == "ip:10.0.0.1"
+    assert rate_limit_key(_request()) == "ip:10.0.0.1"
+
+
+# Ліміт маршруту спільний для всіх URL маршруту, але окремий для кожного користувача
+def test_limit_per_user_and_route():
+    limiter = Limiter(key_func=rate_limit_key, storage_uri="memory://", strategy="sliding-window-counter", key_style="endpoint")
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.get("/items/{item_id}")
+    @limiter.limit("3/minute")
+    async def get_item(request: Request, item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    first = {"Authorization": f"Bearer {create_access_token('first', 1, timedelta(minutes=5))}"}
+    second = {"Authorization": f"Bearer {create_access_token('second', 2, timedelta(minutes=5))}"}
+
+    assert [client.get(f"/items/{i}", headers=first).status_code for i in range(4)] == [200, 200, 200, 429]
+    assert client.get("/items/1", headers=second).status_code == 200
+    assert client.get("/items/1").status_code == 200
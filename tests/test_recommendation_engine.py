@@ -0,0 +1,66 @@
+import asyncio
+import uuid
+import pytest
+from src.db.init_db import init_db
+from src.db.connections import get_db_connection
+from src.db.recommendation_engine import refresh_book_neighbours
+from src.db.async_recommendations_queries import recommend_books_based_on_history
+from src.db.user_profiles import rebuild_user_profiles
+
+
+# Фікстура: користувачі, книги та історія переглядів
+@pytest.fixture
+def viewed_books():
+    init_db(retries=1)
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO authors (name) VALUES (%s) RETURNING id", (f"Author {uuid.uuid4()}",))
+            author_id = cursor.fetchone()[0]
+            books = {}
+            for name in "ABCD":
+                cursor.execute(
+                    "INSERT INTO books (title, published_year, genre, author_id) VALUES (%s, 2000, 'Fiction', %s) RETURNING id",
+                    (f"Book {name} {uuid.uuid4()}", author_id),
+                )
+                books[name] = cursor.fetchone()[0]
+            users = []
+            for _ in range(4):
+                cursor.execute("INSERT INTO users (username, password) VALUES (%s, 'x') RETURNING id", (str(uuid.uuid4()),))
+                users.append(cursor.fetchone()[0])
+            history = [(0, "A"), (0, "B"), (1, "A"), (1, "B"), (1, "C"), (2, "C"), (2, "D"), (3, "A")]
+            for user, name in history:
+                cursor.execute(
+                    "INSERT INTO user_history (user_id, book_id, action) VALUES (%s, %s, 'viewed')",
+                    (users[user], books[name]),
+                )
+            conn.commit()
+            rebuild_user_profiles()
+
+            yield users, books
+
+            cursor.execute("DELETE FROM user_history WHERE book_id = ANY(%s)", (list(books.values()),))
+            cursor.execute("DELETE FROM books WHERE author_id = %s", (author_id,))
+            cursor.execute("DELETE FROM authors WHERE id = %s", (author_id,))
+            conn.commit()
+
+
+# Рекомендації за історією беруться з таблиці сусідів у порядку схожості
+def test_history_recommendations_use_neighbours(viewed_books):
+    users, books = viewed_books
+    assert refresh_book_neighbours(k=5) > 0
+
+    recommended = [book["id"] for book in asyncio.run(recommend_books_based_on_history(users[3]))]
+    assert recommended[:2] == [books["B"], books["C"]]
+    assert books["A"] not in recommended
+
+
+# Без побудованих сусідів працює запасний варіант за жанром і автором
+def test_history_recommendations_fallback(viewed_books):
+    users, books = viewed_books
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM book_neighbours")
+            conn.commit()
+
+    recommended = {book["id"] for book in asyncio.run(recommend_books_based_on_history(users[3]))}
+    assert {books["B"], books["C"], books["D"]} <= recommended
@@ -0,0 +1,131 @@
+import json
+import asyncio
+from src.db.init_db import init_db
+from src.db.async_connections import get_async_connection
+from src.db.async_recommendations_queries import (
+    GENRE_RECOMMENDATIONS_SQL,
+    AUTHOR_RECOMMENDATIONS_SQL,
+    HISTORY_RECOMMENDATIONS_SQL,
+)
+
+BOOKS = 20000
+USERS = 1000
+VIEWS_PER_USER = 40
+HEAVY_USER_VIEWS = 2000
+
+# Великий набір даних; створюється в транзакції, яка відкочується після тесту
+SEED_SQL = [
+    "INSERT INTO authors (name) SELECT 'plan-author-' || g FROM generate_series(0, 199) g",
+    f"""
+    INSERT INTO books (title, published_year, genre, author_id)
+    SELECT 'plan-book-' || g,
+           1900 + g % 120,
+           (ARRAY['Fiction', 'Non-Fiction', 'Science', 'History', 'Fantasy',
+                  'Biography', 'Romance', 'Thriller', 'Mystery', 'Philosophy'])[1 + g % 10],
+           (SELECT MIN(id) FROM authors WHERE name LIKE 'plan-author-%') + g % 200
+    FROM generate_series(0, {BOOKS - 1}) g
+    """,
+    f"INSERT INTO users (username, password) SELECT 'plan-user-' || g, 'x' FROM generate_series(0, {USERS - 1}) g",
+    """
+    CREATE TEMP TABLE plan_ids ON COMMIT DROP AS
+    SELECT (SELECT MIN(id) FROM books WHERE title LIKE 'plan-book-%') AS first_book,
+           (SELECT MIN(id) FROM users WHERE username LIKE 'plan-user-%') AS first_user
+    """,
+    f"""
+    INSERT INTO user_history (user_id, book_id, action)
+    SELECT p.first_user + u, p.first_book + (u * 37 + k * 101) % {BOOKS}, 'viewed'
+    FROM plan_ids p, generate_series(1, {USERS - 1}) u, generate_series(1, {VIEWS_PER_USER}) k
+    """,
+    f"""
+    INSERT INTO user_history (user_id, book_id, action)
+    SELECT p.first_user, p.first_book + (k * 7) % {BOOKS}, 'viewed'
+    FROM plan_ids p, generate_series(1, {HEAVY_USER_VIEWS}) k
+    """,
+    """
+    INSERT INTO book_stats (book_id, view_count, last_viewed_at)
+    SELECT book_id, COUNT(*), MAX(created_at) FROM user_history GROUP BY book_id
+    ON CONFLICT (book_id) DO UPDATE SET view_count = EXCLUDED.view_count
+    """,
+    """
+    INSERT INTO user_profiles (user_id, genre_counts, author_counts, viewed_book_ids, view_count)
+    SELECT h.user_id,
+           (SELECT jsonb_object_agg(genre, n) FROM (
+               SELECT b.genre, COUNT(*) AS n FROM user_history x JOIN books b ON b.id = x.book_id
+               WHERE x.user_id = h.user_id GROUP BY b.genre) g),
+           (SELECT jsonb_object_agg(author_id::text, n) FROM (
+               SELECT b.author_id, COUNT(*) AS n FROM user_history x JOIN books b ON b.id = x.book_id
+               WHERE x.user_id = h.user_id GROUP BY b.author_id) a),
+           array_agg(h.book_id ORDER BY h.id),
+           COUNT(*)
+    FROM user_history h, plan_ids p
+    WHERE h.user_id = p.first_user
+    GROUP BY h.user_id
+    ON CONFLICT (user_id) DO NOTHING
+    """,
+    """
+    INSERT INTO book_trending (book_id, score_1h, score_24h, score_7d)
+    SELECT book_id, view_count * 0.01, view_count * 0.1, view_count FROM book_stats
+    ON CONFLICT (book_id) DO NOTHING
+    """,
+    f"""
+    INSERT INTO book_neighbours (book_id, neighbour_id, score)
+    SELECT p.first_book + g, p.first_book + (g + k) % {BOOKS}, 1.0 / k
+    FROM plan_ids p, generate_series(0, {BOOKS - 1}) g, generate_series(1, 5) k
+    """,
+    "ANALYZE authors, books, users, user_history, book_stats, book_trending, user_profiles, book_neighbours",
+]
+
+
+def plan_nodes(node, under_subplan=False):
+    """Yield every plan node with a flag telling whether it runs as a correlated SubPlan."""
+    under_subplan = under_subplan or node.get("Parent Relationship") == "SubPlan"
+    yield node, under_subplan
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child, under_subplan)
+
+
+async def explain_recommendations():
+    plans = {}
+    async with get_async_connection() as conn:
+        tx = conn.transaction()
+        await tx.start()
+        try:
+            for statement in SEED_SQL:
+                await conn.execute(statement)
+            first_user = await conn.fetchval("SELECT first_user FROM plan_ids")
+            queries = {
+                "genre": (GENRE_RECOMMENDATIONS_SQL, "Fantasy", first_user, 10),
+                "author": (AUTHOR_RECOMMENDATIONS_SQL, "plan-author-7", first_user, 10),
+                "history": (HISTORY_RECOMMENDATIONS_SQL, first_user, 50, 15),
+            }
+            for name, (sql, *args) in queries.items():
+                result = await conn.fetchval("EXPLAIN (ANALYZE, FORMAT JSON) " + sql, *args)
+                rows = await conn.fetch(sql, *args)
+                viewed = await conn.fetchval(
+                    "SELECT COUNT(*) FROM user_history WHERE user_id = $1 AND book_id = ANY($2::int[])",
+                    first_user, [row["id"] for row in rows],
+                )
+                plans[name] = (json.loads(result)[0]["Plan"], len(rows), viewed)
+        finally:
+            await tx.rollback()
+    return plans
+
+
+# Рекомендації виключають переглянуті книги анти-з'єднанням, а не NOT IN,
+# і не сканують user_history повністю на великому наборі даних
+def test_recommendation_plans_use_anti_joins():
+    init_db(retries=1)
+    plans = asyncio.run(explain_recommendations())
+
+    for name, limit in (("genre", 10), ("author", 10), ("history", 15)):
+        plan, returned, viewed = plans[name]
+        nodes = list(plan_nodes(plan))
+
+        assert any("Anti" in node.get("Join Type", "") for node, _ in nodes), name
+        history_scans = [(node, sub) for node, sub in nodes if node.get("Relation Name") == "user_history"]
+        assert history_scans, name
+        assert all(node["Node Type"] != "Seq Scan" for node, _ in history_scans), name
+        assert not any(sub for _, sub in history_scans), name
+
+        assert returned == limit, name
+        assert viewed == 0, name
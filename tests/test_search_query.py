@@ -0,0 +1,19 @@
+import pytest
+from src.utils.search_query import prefix_tsquery
+
+
+# Кожне слово запиту шукається як префікс
+def test_words_become_prefix_terms():
+    assert prefix_tsquery("Lord  of the RIN") == "lord:* & of:* & the:* & rin:*"
+    assert prefix_tsquery("кобза") == "кобза:*"
+
+
+# Оператори tsquery у тексті запиту ігноруються
+def test_operators_are_stripped():
+    assert prefix_tsquery("war & !peace | (x):*") == "war:* & peace:* & x:*"
+
+
+@pytest.mark.parametrize("text", ["", "   ", "&|!", None])
+def test_empty_query_rejected(text):
+    with pytest.raises(ValueError):
+        prefix_tsquery(text)
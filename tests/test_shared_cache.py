@@ -0,0 +1,168 @@
+import time
+import asyncio
+import threading
+import fakeredis
+from src.utils.shared_cache import SharedCache, CacheGroup, MemoryCacheBackend, RedisCacheBackend
+
+
+def make_worker(backend):
+    cache = SharedCache("book", max_size=10, ttl=60)
+    group = CacheGroup(cache)
+    group.attach(backend)
+    return cache, group
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+# Запис одного воркера читається іншим через спільний бекенд
+def test_value_shared_between_workers():
+    backend = MemoryCacheBackend()
+    first, _ = make_worker(backend)
+    second, _ = make_worker(backend)
+
+    first.set(1, {"id": 1, "title": "Dune"})
+    assert second.get(1) == {"id": 1, "title": "Dune"}
+    assert second.stats()["shared_hits"] == 1
+
+
+# Інвалідація в одному воркері видаляє локальну копію в інших
+def test_invalidation_broadcast_to_other_workers():
+    backend = MemoryCacheBackend()
+    first, _ = make_worker(backend)
+    second, _ = make_worker(backend)
+
+    first.set(1, {"id": 1})
+    assert second.get(1) == {"id": 1}
+
+    first.delete(1)
+    assert len(second.local) == 0
+    assert second.get(1) is None
+
+
+# Очищення простору імен скидає спільні та локальні записи
+def test_clear_drops_shared_and_local_entries():
+    backend = MemoryCacheBackend()
+    first, _ = make_worker(backend)
+    second, _ = make_worker(backend)
+    other = SharedCache("author", max_size=10, ttl=60, backend=backend)
+
+    first.set(1, {"id": 1})
+    second.get(1)
+    other.set("Frank Herbert", {"id": 7})
+
+    first.clear()
+    assert second.get(1) is None
+    assert other.get("Frank Herbert") == {"id": 7}
+
+
+# Redis-бекенд розсилає інвалідацію через pub/sub
+def test_redis_backend_invalidation():
+    server = fakeredis.FakeServer()
+    first, first_group = make_worker(RedisCacheBackend(fakeredis.FakeRedis(server=server), poll_interval=0.01))
+    second, second_group = make_worker(RedisCacheBackend(fakeredis.FakeRedis(server=server), poll_interval=0.01))
+    try:
+        first.set("Dune", {"id": 1, "title": "Dune"})
+        assert second.get("Dune") == {"id": 1, "title": "Dune"}
+
+        first.delete("Dune")
+        assert wait_for(lambda: len(second.local) == 0)
+        assert second.get("Dune") is None
+    finally:
+        first_group.detach()
+        second_group.detach()
+
+
+class BrokenBackend(MemoryCacheBackend):
+    def get(self, key):
+        raise ConnectionError("cache server is down")
+
+
+# Недоступний бекенд вважається промахом, а не помилкою запиту
+def test_backend_failure_is_a_miss():
+    cache = SharedCache("book", max_size=10, ttl=60, backend=BrokenBackend())
+    assert cache.get(1, "default") == "default"
+    assert cache.stats()["backend_errors"] == 1
+
+
+class SlowBackend(MemoryCacheBackend):
+    """Блокуючий бекенд, що відповідає із затримкою, як перевантажений Redis."""
+    blocking = True
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        return super().get(key)
+
+
+# Асинхронні операції не блокують цикл подій, поки бекенд відповідає
+def test_async_backend_calls_do_not_block_event_loop():
+    backend = SlowBackend(0.2)
+    cache = SharedCache("book", max_size=10, ttl=60, backend=backend)
+    cache.set(1, {"id": 1})
+    cache.local.clear()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        value = await cache.aget(1)
+        task.cancel()
+        return value, ticks
+
+    value, ticks = asyncio.run(scenario())
+    assert value == {"id": 1}
+    assert ticks >= 5
+    assert all(name.startswith("shared-cache") for name in backend.threads)
+    # Значення з бекенду кешується локально
+    assert asyncio.run(cache.aget(1)) == {"id": 1}
+    assert cache.stats()["shared_hits"] == 1
+
+
+# Асинхронні запис, інвалідація й очищення поводяться як синхронні
+def test_async_operations_shared_between_workers():
+    server = fakeredis.FakeServer()
+    first, first_group = make_worker(RedisCacheBackend(fakeredis.FakeRedis(server=server), poll_interval=0.01))
+    second, second_group = make_worker(RedisCacheBackend(fakeredis.FakeRedis(server=server), poll_interval=0.01))
+
+    async def scenario():
+        await first.aset("Dune", {"id": 1})
+        assert await second.aget("Dune") == {"id": 1}
+        await first.adelete("Dune")
+        assert wait_for(lambda: len(second.local) == 0)
+        assert await second.aget("Dune") is None
+
+        await first.aset("Emma", {"id": 2})
+        await first.aclear()
+        assert await second.aget("Emma") is None
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        first_group.detach()
+        second_group.detach()
+
+
+def test_async_backend_failure_is_a_miss():
+    backend = BrokenBackend()
+    backend.blocking = True
+    cache = SharedCache("book", max_size=10, ttl=60, backend=backend)
+    assert asyncio.run(cache.aget(1, "default")) == "default"
+    assert cache.stats()["backend_errors"] == 1
@@ -0,0 +1,118 @@
+import json
+import logging
+from datetime import timedelta
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+from src.main import app
+from src.dependencies import DATABASE_URL
+from src.db.slow_query_log import SlowQueryLog, InstrumentedConnection, redact, explainable, normalize_statement, slow_query_log
+from src.routes import admin_routes
+from src.utils.auth_utils import create_access_token
+
+client = TestClient(app)
+
+
+def _headers(username, user_id):
+    return {"Authorization": f"Bearer {create_access_token(username, user_id, timedelta(minutes=5))}"}
+
+
+# Значення параметрів замінюються їхніми типами
+def test_redact():
+    assert redact(None) is None
+    assert redact(("secret", 5, None)) == ["<str>", "<int>", None]
+    assert redact({"password": "hunter2", "ids": [1, 2, 3]}) == {"password": "<str>", "ids": "<list[3]>"}
+
+
+# EXPLAIN ANALYZE виконує запит, тому пояснюються лише читання
+def test_explainable():
+    assert explainable("SELECT * FROM books WHERE id = %s")
+    assert explainable("WITH recent AS (SELECT 1) SELECT * FROM recent")
+    assert not explainable("UPDATE books SET title = %s")
+    assert not explainable("WITH gone AS (DELETE FROM books RETURNING id) SELECT * FROM gone")
+    assert not explainable("SELECT * FROM books FOR UPDATE")
+    assert normalize_statement(b"SELECT  1\n  FROM books") == "SELECT 1 FROM books"
+
+
+# Повільні запити агрегуються за текстом, швидкі ігноруються
+def test_aggregation_and_top(caplog):
+    log = SlowQueryLog(threshold_ms=100, sample_rate=0)
+    with caplog.at_level(logging.WARNING, logger="service.slow_queries"):
+        log.observe("SELECT * FROM books WHERE id = %s", (1,), 0.05, "psycopg2")
+        log.observe("SELECT * FROM books WHERE id = %s", (1,), 0.3, "psycopg2")
+        log.observe("SELECT * FROM books  WHERE id = %s", (2,), 0.5, "psycopg2")
+        log.observe("SELECT * FROM authors", None, 0.7, "asyncpg")
+
+    top = log.top()
+    assert [entry["statement"] for entry in top] == ["SELECT * FROM books WHERE id = %s", "SELECT * FROM authors"]
+    assert top[0]["calls"] == 2
+    assert top[0]["total_ms"] == pytest.approx(800)
+    assert top[0]["mean_ms"] == pytest.approx(400)
+    assert top[0]["last_params"] == ["<int>"]
+    assert log.top(order_by="max_ms")[0]["statement"] == "SELECT * FROM authors"
+    assert len(log.top(limit=1)) == 1
+    with pytest.raises(ValueError):
+        log.top(order_by="title")
+
+    events = [json.loads(record.getMessage()) for record in caplog.records if record.name == "service.slow_queries"]
+    assert len(events) == 3
+    assert events[0]["params"] == ["<int>"]
+
+
+# Найдешевші записи витісняються, коли досягнуто max_statements
+def test_max_statements():
+    log = SlowQueryLog(threshold_ms=0, sample_rate=0, max_statements=2)
+    log.observe("SELECT 1", None, 0.3, "psycopg2")
+    log.observe("SELECT 2", None, 0.1, "psycopg2")
+    log.observe("SELECT 3", None, 0.2, "psycopg2")
+    assert {entry["statement"] for entry in log.top()} == {"SELECT 1", "SELECT 3"}
+
+
+# Курсори інструментованого з'єднання звітують про запити
+def test_instrumented_connection(monkeypatch):
+    monkeypatch.setattr(slow_query_log, "threshold_ms", 0)
+    monkeypatch.setattr(slow_query_log, "sample_rate", 0)
+    slow_query_log.clear()
+    conn = psycopg2.connect(DATABASE_URL, connection_factory=InstrumentedConnection)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT %s::int + 1", (41,))
+            assert cursor.fetchone()[0] == 42
+    finally:
+        conn.close()
+        statements = slow_query_log.top()
+        slow_query_log.clear()
+
+    assert statements[0]["statement"] == "SELECT %s::int + 1"
+    assert statements[0]["source"] == "psycopg2"
+    assert statements[0]["last_params"] == ["<int>"]
+
+
+# План зберігається для запису; плейсхолдери asyncpg підтримуються
+def test_explain():
+    log = SlowQueryLog(threshold_ms=0, sample_rate=0)
+    log.observe("SELECT $1::int AS answer", (42,), 0.5, "asyncpg", paramstyle="numeric")
+    entry = log.top()[0]
+
+    plan = log.explain(entry["fingerprint"], "SELECT $1::int AS answer", (42,), paramstyle="numeric")
+    assert "actual time" in plan
+    assert log.top()[0]["explain"] == plan
+
+
+# Ендпоінт доступний лише адміністраторам
+def test_admin_endpoint(monkeypatch):
+    monkeypatch.setattr(admin_routes, "ADMIN_USERNAMES", {"slow_admin"})
+    monkeypatch.setattr(slow_query_log, "sample_rate", 0)
+    slow_query_log.clear()
+    slow_query_log.observe("SELECT * FROM books", None, 10, "psycopg2")
+
+    response = client.get("/api/v1/admin/slow_queries", headers=_headers("reader", 1))
+    assert response.status_code == 403
+
+    response = client.get("/api/v1/admin/slow_queries?order_by=title", headers=_headers("slow_admin", 2))
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/admin/slow_queries?limit=5", headers=_headers("slow_admin", 2))
+    slow_query_log.clear()
+    assert response.status_code == 200
+    assert response.json()["statements"][0]["statement"] == "SELECT * FROM books"
@@ -0,0 +1,98 @@
+import asyncio
+import time
+import uuid
+import pytest
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from src.main import app
+from src.db.init_db import init_db
+import src.db.token_denylist as token_denylist_module
+from src.db.token_denylist import TokenDenylist
+from src.utils.auth_utils import create_access_token, get_current_user, hash_token, token_cache
+
+client = TestClient(app)
+
+
+# Після виходу токен відхиляється, навіть якщо він уже був у кеші перевірених
+def test_logout_revokes_token():
+    init_db(retries=1)
+    token = create_access_token("logout_user", 1, timedelta(minutes=5))
+    other = create_access_token("logout_user", 1, timedelta(minutes=5))
+
+    assert get_current_user(token) == {"username": "logout_user", "id": 1}
+    assert token_cache.get(hash_token(token)) is not None
+
+    response = client.post("/api/v1/auth/logout", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(token)
+    assert exc.value.status_code == 401
+    # Інші токени того ж користувача лишаються дійсними
+    assert get_current_user(other)["username"] == "logout_user"
+
+
+def test_logout_with_invalid_token():
+    response = client.post("/api/v1/auth/logout", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+
+
+# Перезавантаження будує фільтр з БД і видаляє прострочені записи
+def test_load_purges_expired_tokens():
+    init_db(retries=1)
+    denylist = TokenDenylist(capacity=100, refresh_interval=0)
+    active, expired, unknown = (hash_token(uuid.uuid4().hex) for _ in range(3))
+
+    async def scenario():
+        await denylist.revoke(active, time.time() + 300)
+        await denylist.revoke(expired, time.time() - 1)
+        await denylist.load()
+
+    asyncio.run(scenario())
+
+    assert denylist.is_revoked(active) is True
+    assert denylist.is_revoked(expired) is False
+    assert denylist.is_revoked(unknown) is False
+    stats = denylist.stats()
+    assert stats["checks"] == 3
+    assert stats["revoked_hits"] == 1
+    assert stats["loads"] == 1
+
+
+# Токен, відкликаний під час перезавантаження, не губиться при заміні фільтра
+def test_revoke_during_load_is_kept(monkeypatch):
+    init_db(retries=1)
+    denylist = TokenDenylist(capacity=100, refresh_interval=0)
+    late = hash_token(uuid.uuid4().hex)
+    connect = token_denylist_module.get_async_connection
+
+    class RacingConnection:
+        def __init__(self, conn):
+            self.conn = conn
+
+        async def execute(self, *args):
+            return await self.conn.execute(*args)
+
+        async def fetch(self, *args):
+            rows = await self.conn.fetch(*args)
+            # Інший запит виходить із системи, поки фільтр перебудовується
+            await denylist.revoke(late, time.time() + 300)
+            return rows
+
+    @asynccontextmanager
+    async def racing_connection():
+        async with connect() as conn:
+            yield RacingConnection(conn)
+
+    monkeypatch.setattr(token_denylist_module, "get_async_connection", racing_connection)
+
+    async def scenario():
+        await denylist.load()
+
+    asyncio.run(scenario())
+    monkeypatch.setattr(token_denylist_module, "get_async_connection", connect)
+    denylist._confirmed.clear()
+    assert late in denylist._filter
+    assert denylist.is_revoked(late) is True
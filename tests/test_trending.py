@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+from src.db.init_db import init_db
+from src.db.connections import get_db_connection
+from src.db.trending import TrendingTracker
+from src.db.async_recommendations_queries import add_book_views, recommend_books_by_author
+import src.db.async_recommendations_queries as async_recommendations
+
+
+def create_books(count):
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO authors (name) VALUES (%s) RETURNING id", (f"Author {uuid.uuid4()}",))
+            author_id = cursor.fetchone()[0]
+            book_ids = []
+            for _ in range(count):
+                cursor.execute(
+                    "INSERT INTO books (title, published_year, genre, author_id) VALUES (%s, 2000, 'History', %s) RETURNING id",
+                    (f"Book {uuid.uuid4()}", author_id),
+                )
+                book_ids.append(cursor.fetchone()[0])
+            conn.commit()
+    return author_id, book_ids
+
+
+def drop_books(author_id, book_ids):
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM user_history WHERE book_id = ANY(%s)", (book_ids,))
+            cursor.execute("DELETE FROM books WHERE id = ANY(%s)", (book_ids,))
+            cursor.execute("DELETE FROM authors WHERE id = %s", (author_id,))
+            conn.commit()
+
+
+# Контрольні точки двох воркерів додаються, а не перезаписують одна одну
+def test_checkpoints_from_workers_are_merged():
+    init_db(retries=1)
+    author_id, (first, second) = create_books(2)
+
+    async def scenario():
+        worker_a, worker_b = TrendingTracker(), TrendingTracker()
+        worker_a.record([first, first, second])
+        worker_b.record([first])
+        await worker_a.checkpoint()
+        await worker_b.checkpoint()
+        await worker_a.load()
+        return worker_a.top("24h", 10), worker_a.stats()
+
+    try:
+        top, stats = asyncio.run(scenario())
+        scores = dict(top)
+        assert [book_id for book_id, _ in top if book_id in (first, second)] == [first, second]
+        assert round(scores[first], 3) == 3
+        assert round(scores[second], 3) == 1
+        assert stats["pending"] == 0
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT ROUND(score_7d::numeric, 3) FROM book_trending WHERE book_id = %s", (first,))
+                assert cursor.fetchone()[0] == 3
+    finally:
+        drop_books(author_id, [first, second])
+
+
+# Нові перегляди з пакетного запису потрапляють у трендові лічильники без додаткових запитів
+def test_new_views_feed_trending(monkeypatch):
+    init_db(retries=1)
+    author_id, (book_id,) = create_books(1)
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO users (username, password) VALUES (%s, 'x') RETURNING id", (str(uuid.uuid4()),))
+            user_id = cursor.fetchone()[0]
+            conn.commit()
+
+    tracker = TrendingTracker()
+    monkeypatch.setattr(async_recommendations, "trending", tracker)
+
+    async def scenario():
+        await add_book_views([(user_id, book_id)])
+        await add_book_views([(user_id, book_id)])
+
+    try:
+        asyncio.run(scenario())
+        assert round(dict(tracker.top("1h", 10))[book_id], 3) == 1
+        assert tracker.stats()["recorded"] == 1
+    finally:
+        drop_books(author_id, [book_id])
+
+
+# Рекомендації ранжуються за трендовою оцінкою, а не лише за загальною популярністю
+def test_recommendations_ranked_by_trending():
+    init_db(retries=1)
+    author_id, (popular, trending_now, quiet) = create_books(3)
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO users (username, password) VALUES (%s, 'x') RETURNING id", (str(uuid.uuid4()),))
+            user_id = cursor.fetchone()[0]
+            cursor.execute("SELECT name FROM authors WHERE id = %s", (author_id,))
+            author_name = cursor.fetchone()[0]
+            cursor.execute("INSERT INTO book_stats (book_id, view_count) VALUES (%s, 100), (%s, 5)", (popular, trending_now))
+            cursor.execute("""
+                INSERT INTO book_trending (book_id, score_1h, score_24h, score_7d, updated_at)
+                VALUES (%s, 0, 0.5, 40, LOCALTIMESTAMP - INTERVAL '3 days'),
+                       (%s, 5, 5, 5, LOCALTIMESTAMP)
+            """, (popular, trending_now))
+            conn.commit()
+
+    try:
+        books = asyncio.run(recommend_books_by_author(user_id, author_name))
+        assert [book["id"] for book in books] == [trending_now, popular, quiet]
+    finally:
+        drop_books(author_id, [popular, trending_now, quiet])
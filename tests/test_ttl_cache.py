@@ -0,0 +1,44 @@
+import time
+from src.utils.ttl_cache import TTLCache
+
+
+# Найдавніше використаний запис витісняється при переповненні
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+# Записи застарівають після ttl
+def test_entries_expire():
+    cache = TTLCache(max_size=10, ttl=0.01)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_delete_and_counters():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.delete("a") is True
+    assert cache.delete("a") is False
+    assert cache.get("a", "default") == "default"
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["invalidations"] == 1
+    assert stats["size"] == 0
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+import pytest
+from src.db.init_db import init_db
+from src.db.connections import get_db_connection
+from src.db.async_recommendations_queries import add_book_view, recommend_books_by_genre
+from src.db.user_profiles import rebuild_user_profiles
+
+
+# Фікстура: користувач, автор і три книги різних жанрів
+@pytest.fixture
+def library():
+    init_db(retries=1)
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO users (username, password) VALUES (%s, 'x') RETURNING id", (str(uuid.uuid4()),))
+            user_id = cursor.fetchone()[0]
+            cursor.execute("INSERT INTO authors (name) VALUES (%s) RETURNING id", (f"Author {uuid.uuid4()}",))
+            author_id = cursor.fetchone()[0]
+            books = []
+            for genre in ("Fantasy", "Fantasy", "History"):
+                cursor.execute(
+                    "INSERT INTO books (title, published_year, genre, author_id) VALUES (%s, 2000, %s, %s) RETURNING id",
+                    (f"Book {uuid.uuid4()}", genre, author_id),
+                )
+                books.append(cursor.fetchone()[0])
+            conn.commit()
+
+            yield user_id, author_id, books
+
+            cursor.execute("DELETE FROM user_history WHERE book_id = ANY(%s)", (books,))
+            cursor.execute("DELETE FROM books WHERE author_id = %s", (author_id,))
+            cursor.execute("DELETE FROM authors WHERE id = %s", (author_id,))
+            conn.commit()
+
+
+def fetch_profile(user_id):
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT genre_counts, author_counts, viewed_book_ids, view_count
+                FROM user_profiles WHERE user_id = %s
+            """, (user_id,))
+            return cursor.fetchone()
+
+
+# Кожен новий перегляд інкрементально оновлює профіль, повторний — ні
+def test_add_book_view_updates_profile(library):
+    user_id, author_id, books = library
+    async def scenario():
+        await add_book_view(user_id, books[0])
+        await add_book_view(user_id, books[2])
+        await add_book_view(user_id, books[0])
+
+    asyncio.run(scenario())
+
+    genres, authors, viewed, view_count = fetch_profile(user_id)
+    assert genres == {"Fantasy": 1, "History": 1}
+    assert authors == {str(author_id): 2}
+    assert viewed == [books[0], books[2]]
+    assert view_count == 2
+
+
+# Перебудова з історії дає той самий профіль, що й інкрементальні оновлення
+def test_rebuild_matches_incremental_profile(library):
+    user_id, _, books = library
+    async def scenario():
+        for book_id in books:
+            await add_book_view(user_id, book_id)
+
+    asyncio.run(scenario())
+    incremental = fetch_profile(user_id)
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("DELETE FROM user_profiles WHERE user_id = %s", (user_id,))
+            conn.commit()
+    assert rebuild_user_profiles(user_id) == 1
+    assert fetch_profile(user_id) == incremental
+
+
+# Рекомендації за жанром виключають книги з профілю
+def test_genre_recommendations_skip_viewed_books(library):
+    user_id, _, books = library
+    async def scenario():
+        await add_book_view(user_id, books[0])
+        return await recommend_books_by_genre(user_id, "Fantasy")
+
+    recommended = [book["id"] for book in asyncio.run(scenario())]
+    assert books[0] not in recommended
+    assert books[1] in recommended
+
@@ -0,0 +1,116 @@
+import asyncio
+import uuid
+import pytest
+from src.db.init_db import init_db
+from src.db.connections import get_db_connection
+from src.db.view_tracker import ViewTracker
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, views):
+        self.batches.append(list(views))
+        return []
+
+
+# Перегляди записуються пакетами, а не по одному
+def test_views_written_in_batches():
+    writer = RecordingWriter()
+
+    async def scenario():
+        tracker = ViewTracker(max_queue=100, batch_size=3, flush_interval=0.01, writer=writer)
+        await tracker.start()
+        for book_id in range(7):
+            tracker.record(1, book_id)
+        await asyncio.sleep(0.1)
+        await tracker.stop()
+        return tracker.stats()
+
+    stats = asyncio.run(scenario())
+    assert [len(batch) for batch in writer.batches] == [3, 3, 1]
+    assert stats["flushed"] == 7
+    assert stats["flushes"] == 3
+    assert stats["queued"] == 0
+
+
+# Переповнена черга відкидає нові перегляди і рахує їх
+def test_full_queue_drops_views():
+    tracker = ViewTracker(max_queue=2, batch_size=10, flush_interval=0.01, writer=RecordingWriter())
+    assert tracker.record(1, 1) is True
+    assert tracker.record(1, 2) is True
+    assert tracker.record(1, 3) is False
+    assert tracker.stats()["dropped"] == 1
+    assert tracker.stats()["queued"] == 2
+
+
+# Під час зупинки записуються всі перегляди, що ще в черзі
+def test_stop_flushes_queued_views():
+    writer = RecordingWriter()
+
+    async def scenario():
+        tracker = ViewTracker(max_queue=100, batch_size=100, flush_interval=60, writer=writer)
+        await tracker.start()
+        tracker.record(1, 1)
+        tracker.record(2, 1)
+        await asyncio.sleep(0.01)
+        await tracker.stop()
+
+    asyncio.run(scenario())
+    assert writer.batches == [[(1, 1), (2, 1)]]
+
+
+# Помилка запису не зупиняє трекер, а рахується як втрачені перегляди
+def test_failed_flush_is_counted():
+    async def failing_writer(views):
+        raise RuntimeError("database is down")
+
+    async def scenario():
+        tracker = ViewTracker(max_queue=100, batch_size=10, flush_interval=0.01, writer=failing_writer)
+        tracker.record(1, 1)
+        await tracker.flush()
+        return tracker.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["flush_errors"] == 1
+    assert stats["lost"] == 1
+
+
+# Пакет з дублікатами записує кожен перегляд один раз і оновлює профіль
+def test_batch_written_to_database():
+    init_db(retries=1)
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO users (username, password) VALUES (%s, 'x') RETURNING id", (str(uuid.uuid4()),))
+            user_id = cursor.fetchone()[0]
+            cursor.execute("INSERT INTO authors (name) VALUES (%s) RETURNING id", (f"Author {uuid.uuid4()}",))
+            author_id = cursor.fetchone()[0]
+            cursor.execute(
+                "INSERT INTO books (title, published_year, genre, author_id) VALUES (%s, 2000, 'Science', %s) RETURNING id",
+                (f"Book {uuid.uuid4()}", author_id),
+            )
+            book_id = cursor.fetchone()[0]
+            conn.commit()
+
+    async def scenario():
+        tracker = ViewTracker(max_queue=100, batch_size=10, flush_interval=0.01)
+        tracker.record(user_id, book_id)
+        tracker.record(user_id, book_id)
+        await tracker.flush()
+
+    try:
+        asyncio.run(scenario())
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM user_history WHERE user_id = %s", (user_id,))
+                assert cursor.fetchone()[0] == 1
+                cursor.execute("SELECT view_count, genre_counts FROM user_profiles WHERE user_id = %s", (user_id,))
+                assert cursor.fetchone() == (1, {"Science": 1})
+    finally:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM user_history WHERE book_id = %s", (book_id,))
+                cursor.execute("DELETE FROM books WHERE id = %s", (book_id,))
+                cursor.execute("DELETE FROM authors WHERE id = %s", (author_id,))
+                conn.commit()